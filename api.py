@@ -7,11 +7,15 @@ from typing import List, Optional
 
 import pdfplumber
 import psycopg2
-from fastapi import FastAPI, File, Form, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from psycopg2.extras import RealDictCursor
 
 from data_sources import _load_settings, _compute_embedding
+from planner_db import get_planner_store
+from planner_query import DEFAULT_LIMIT, query_planner
+from resilience import resilience_metrics
+from session_manager import session_manager
 
 
 app = FastAPI(title="SPA Backend", version="0.1.0")
@@ -192,6 +196,45 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/sessions/memory")
+def sessions_memory():
+    """세션별 메모리 사용량 리포트."""
+    return session_manager.report()
+
+
+@app.get("/metrics/resilience")
+def resilience_status():
+    """LLM/임베딩 호출 보호 정책 상태 (서킷 상태, 타임아웃/재시도/헤지 횟수, 지연)."""
+    return resilience_metrics()
+
+
+@app.get("/planner/query")
+def planner_query(
+    scope: Optional[str] = None,
+    status: Optional[str] = None,
+    owner: Optional[str] = None,
+    item_type: Optional[str] = Query(None, alias="type"),
+    due_before: Optional[str] = None,
+    due_after: Optional[str] = None,
+    overdue: Optional[bool] = None,
+    q: Optional[str] = None,
+    today: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=1000),
+):
+    """플래너 필터 + 집계 (상태별 건수, 담당자별/하위 서브트리별 완료율, 마감 지난 항목).
+
+    scope: 항목 id/제목/최상위 구분, status/owner/type: 쉼표로 여러 값, q: 제목/담당/상태 검색어.
+    """
+    try:
+        return query_planner(get_planner_store(), scope=scope, status=status, owner=owner, item_type=item_type,
+                             due_before=due_before, due_after=due_after, overdue=overdue, text=q,
+                             today=today, limit=limit)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/upload")
 async def upload_files(
     files: List[UploadFile] = File(...),
@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from data_sources import GraphDataSource, _load_settings, get_asset_catalog
+
+logger = logging.getLogger(__name__)
+
+# 자산명의 일부로 보는 문자 (한글 조사 등은 경계로 취급)
+_NAME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-_.")
+
+
+def _sentence_dot(text: str, pos: int) -> bool:
+    """pos 의 '.' 이 자산명의 일부가 아니라 문장 끝 마침표인지."""
+    return text[pos] == "." and (pos + 1 == len(text) or text[pos + 1] not in _NAME_CHARS)
+
+
+class AhoCorasick:
+    """소문자 패턴 -> 값 사전을 위한 Aho-Corasick 오토마톤.
+
+    패턴 추가는 trie 에 바로 반영되고, 실패 링크는 다음 검색 때 한 번에 다시 계산합니다.
+    제거된 패턴은 출력에서만 빠지므로 재빌드 없이 즉시 반영됩니다.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self._values: Dict[str, str] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, pattern: str, value: str):
+        pattern = pattern.lower()
+        if not pattern:
+            return
+        with self._lock:
+            if self._values.get(pattern) == value:
+                return
+            self._values[pattern] = value
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            if pattern not in self._out[state]:
+                self._out[state].append(pattern)
+            self._dirty = True
+
+    def remove(self, pattern: str):
+        with self._lock:
+            self._values.pop(pattern.lower(), None)
+
+    def _build(self):
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                cand = self._goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+        self._fail = fail
+        self._dirty = False
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """(start, end, pattern) 목록을 텍스트 길이(+매치 수)에 선형으로 계산."""
+        matches = []
+        with self._lock:
+            if self._dirty:
+                self._build()
+            goto, fail, out, values = self._goto, self._fail, self._out, self._values
+            state = 0
+            for i, ch in enumerate(text):
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                s = state
+                while s:
+                    for pat in out[s]:
+                        if pat in values:
+                            matches.append((i - len(pat) + 1, i + 1, pat))
+                    s = fail[s]
+        return matches
+
+    def value(self, pattern: str) -> Optional[str]:
+        return self._values.get(pattern)
+
+
+class AssetRecognizer:
+    """질의문에서 알려진 자산명/IP/별칭을 모두 추출.
+
+    asset_configs(AssetCatalog) 와 Neo4j 노드 이름으로 사전을 만들고,
+    카탈로그 변경 알림과 주기적인 그래프 이름 재조회로 점진 갱신합니다.
+    """
+
+    def __init__(self, catalog=None, graph_ds=None, aliases: Optional[Dict[str, str]] = None,
+                 graph_refresh_interval: float = 600):
+        self._ac = AhoCorasick()
+        self.catalog = catalog
+        self.graph_ds = graph_ds
+        self.graph_refresh_interval = graph_refresh_interval
+        self._graph_loaded_at = 0.0
+        self._graph_loading = threading.Lock()
+        # 자산별로 등록한 패턴(이름/IP/별칭)과 카탈로그 IP: 제거/IP 변경 시 함께 지우기 위함
+        self._patterns: Dict[str, Set[str]] = {}
+        self._ips: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for alias, name in (aliases or {}).items():
+            self.add_asset(name, aliases=[alias])
+        if catalog is not None:
+            self.on_assets_changed(catalog.assets(), [])
+            catalog.add_listener(self.on_assets_changed)
+
+    def __len__(self):
+        return len(self._ac)
+
+    def add_asset(self, name: str, ip: Optional[str] = None, aliases: Iterable[str] = ()):
+        if not name:
+            return
+        with self._lock:
+            patterns = self._patterns.setdefault(name.lower(), set())
+            for pat in (name, ip, *aliases):
+                if pat:
+                    self._ac.add(str(pat), name)
+                    patterns.add(str(pat).lower())
+
+    def _drop_pattern(self, name: str, pattern: str):
+        # 다른 자산이 같은 패턴(예: 재사용된 IP)을 가져갔으면 건드리지 않음
+        if (self._ac.value(pattern) or "").lower() == name.lower():
+            self._ac.remove(pattern)
+
+    def remove_asset(self, name: str):
+        """자산과 함께 등록된 모든 패턴(이름/IP/별칭)을 제거."""
+        with self._lock:
+            for pat in self._patterns.pop(name.lower(), set()):
+                self._drop_pattern(name, pat)
+            self._ips.pop(name.lower(), None)
+
+    def on_assets_changed(self, changed: List[dict], removed: List[str]):
+        """AssetCatalog 리스너: 바뀐 자산만 사전에 반영 (IP 가 바뀌면 이전 IP 는 제거)."""
+        for asset in changed:
+            name, ip = asset.get("name"), str(asset.get("ip") or "")
+            if not name:
+                continue
+            key = name.lower()
+            with self._lock:
+                old_ip = self._ips.get(key)
+                if old_ip and old_ip != ip.lower():
+                    self._patterns.get(key, set()).discard(old_ip)
+                    self._drop_pattern(name, old_ip)
+                if ip:
+                    self._ips[key] = ip.lower()
+            self.add_asset(name, ip or None)
+        for name in removed:
+            self.remove_asset(name)
+
+    def refresh_graph_names(self):
+        if self.graph_ds is None:
+            return
+        try:
+            for name in self.graph_ds.list_node_names():
+                self.add_asset(name)
+        except Exception as e:
+            logger.warning("AssetRecognizer graph 이름 로드 실패 (%s)", e)
+        self._graph_loaded_at = time.monotonic()
+
+    def _maybe_refresh_graph(self):
+        if self.graph_ds is None or time.monotonic() - self._graph_loaded_at < self.graph_refresh_interval:
+            return
+        if not self._graph_loading.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.refresh_graph_names()
+            finally:
+                self._graph_loading.release()
+
+        threading.Thread(target=run, name="asset-recognizer-graph", daemon=True).start()
+
+    def extract(self, text: str) -> List[str]:
+        """텍스트에 언급된 자산명을 등장 순서대로(중복 제거) 반환.
+
+        자산명 경계에서만 매칭하고, 겹치면 가장 왼쪽-가장 긴 매치를 택합니다.
+        """
+        self._maybe_refresh_graph()
+        lowered = text.lower()
+        n = len(lowered)
+        best: Dict[int, Tuple[int, str]] = {}
+        for start, end, pat in self._ac.find_all(lowered):
+            if start > 0 and lowered[start - 1] in _NAME_CHARS:
+                continue
+            if end < n and lowered[end] in _NAME_CHARS and not _sentence_dot(lowered, end):
+                continue
+            if start not in best or end > best[start][0]:
+                best[start] = (end, pat)
+        names: List[str] = []
+        covered = 0
+        for start in sorted(best):
+            end, pat = best[start]
+            if start < covered:
+                continue
+            covered = end
+            name = self._ac.value(pat)
+            if name and name not in names:
+                names.append(name)
+        return names
+
+
+_recognizer: Optional[AssetRecognizer] = None
+_recognizer_lock = threading.Lock()
+
+
+def get_asset_recognizer() -> AssetRecognizer:
+    """AssetCatalog + Neo4j 노드 이름으로 만든 프로세스 공용 인식기."""
+    global _recognizer
+    if _recognizer is None:
+        with _recognizer_lock:
+            if _recognizer is None:
+                aliases = _load_settings().get("recognizer", {}).get("aliases", {})
+                _recognizer = AssetRecognizer(get_asset_catalog(), GraphDataSource(), aliases=aliases)
+    return _recognizer
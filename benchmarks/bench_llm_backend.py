@@ -0,0 +1,79 @@
+"""가짜 LLM 백엔드로 오케스트레이터 전체 경로 부하 테스트 (네트워크 불필요).
+
+    python benchmarks/bench_llm_backend.py [--sessions 32] [--requests 4] [--latency-ms 50]
+
+동시 세션 수만큼 스레드를 띄워 route_and_answer 를 호출하고,
+마이크로배칭 on/off 에서 처리량, 지연(p50/p95), 평균 배치 크기를 비교한다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orchestrator  # noqa: E402
+from llm_backend import build_llm  # noqa: E402
+
+QUERIES = [
+    "a812dpt 서버 구성 알려줘",
+    "a812dpt cpu 사용률 추세 보여줘",
+    "a812dpt 장애 조치 매뉴얼",
+    "a812dpt 연결 구성도",
+]
+
+
+def run(label, llm, sessions, requests):
+    # 같은 설정으로 SharedResources 를 만들고 LLM 만 교체
+    orig = orchestrator.build_llm
+    orchestrator.build_llm = lambda: llm
+    try:
+        shared = orchestrator.SharedResources()
+    finally:
+        orchestrator.build_llm = orig
+
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(i):
+        bot = orchestrator.AIOpsOrchestrator(shared=shared)
+        for r in range(requests):
+            start = time.perf_counter()
+            bot.route_and_answer(QUERIES[(i + r) % len(QUERIES)])
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<12} req={len(latencies):<5} {len(latencies) / elapsed:7.1f} req/s "
+          f"p50={statistics.median(latencies):8.1f}ms p95={p95:8.1f}ms")
+    batcher = getattr(getattr(llm, "inner", llm), "batcher", None)
+    if batcher is not None:
+        print(f"{'':<12} batcher: {batcher.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    cfg = {"backend": "fake", "fake_latency_ms": args.latency_ms, "max_concurrency": args.max_concurrency}
+    run("unbatched", build_llm({**cfg, "batching": False}), args.sessions, args.requests)
+    run("batched", build_llm(cfg), args.sessions, args.requests)
+
+
+if __name__ == "__main__":
+    main()
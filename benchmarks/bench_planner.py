@@ -0,0 +1,130 @@
+"""PlannerStore 규모 벤치마크 (기본 50k 항목).
+
+    python benchmarks/bench_planner.py [--items 50000] [--fanout 8] [--ops 200] [--compact-every 500]
+
+임의의 계층(부모당 평균 fanout 개 자식)을 가진 planner.json 을 임시 디렉터리에 만들고
+- load   : 파일 로드 + 인덱스 구성
+- tree   : to_tree_rows() / build_table_rows() / parent_options() (+ generation 캐시 적중)
+- lazy   : 최상위만 펼친 지연 트리 / 한 노드 펼치기 / 색인 검색
+- query  : subtree_index() 구성, 전체/서브트리 범위 집계 (query_planner)
+- crud   : get_item / update_item / add_item / delete_item 지연 (p50/p95, 저장 포함)
+을 측정한다. CRUD 에는 저널 append + fsync 가, max 에는 스냅샷 compaction 이 함께 잡힌다.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner_query import query_planner  # noqa: E402
+from project_planner import PlannerStore  # noqa: E402
+
+TYPES = ["Architecture", "Data", "Feature", "UI", "Schedule"]
+STATUSES = ["Planned", "In Progress", "Done", "Hold"]
+
+
+def make_items(count: int, fanout: int, seed: int = 7):
+    rnd = random.Random(seed)
+    items = []
+    for i in range(count):
+        # 앞쪽 항목 중 하나를 부모로 골라 평균 fanout 개 자식이 되도록 함
+        parent = None if i < fanout else items[rnd.randrange(max(1, i // fanout))]["id"]
+        items.append({
+            "id": f"p{i:06d}", "parent_id": parent, "title": f"Item {i}",
+            "type": rnd.choice(TYPES), "status": rnd.choice(STATUSES),
+            "owner": f"owner{rnd.randrange(20)}", "due": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            "notes": "", "order": str(rnd.randrange(100)),
+        })
+    return items
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _line(name, seconds):
+    print(f"{name:<22} {seconds * 1000:10.1f}ms")
+
+
+def _latency(name, samples):
+    samples.sort()
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(f"{name:<22} n={len(samples):<5} p50={statistics.median(samples) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms "
+          f"max={samples[-1] * 1000:8.2f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=50000)
+    ap.add_argument("--fanout", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=200)
+    ap.add_argument("--compact-every", type=int, default=500)
+    args = ap.parse_args()
+
+    items = make_items(args.items, args.fanout)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "planner.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False)
+
+        print(f"items={args.items} fanout={args.fanout} ops={args.ops} compact_every={args.compact_every}")
+        store, t = timed(PlannerStore, path, compact_every=args.compact_every)
+        _line("load", t)
+        rows, t = timed(store.to_tree_rows)
+        _line("to_tree_rows", t)
+        _, t = timed(store.build_table_rows)
+        _line("build_table_rows", t)
+        _, t = timed(store.parent_options)
+        _line("parent_options", t)
+        _, t = timed(store.build_table_rows)
+        _line("build_table_rows (hit)", t)
+        lazy, t = timed(store.expanded_rows, set())
+        _line(f"lazy roots ({len(lazy)})", t)
+        first = lazy[0][0]["id"]
+        _, t = timed(store.expanded_rows, {first})
+        _line("lazy expand one", t)
+        (_, total), t = timed(store.search, "item 1")
+        _line(f"search ({total})", t)
+        (_, total), t = timed(store.search, "status:done owner:owner1")
+        _line(f"search field ({total})", t)
+        _, t = timed(store.subtree_index)
+        _line("subtree_index", t)
+        _, t = timed(query_planner, store, today="2025-07-01")
+        _line("rollup all", t)
+        _, t = timed(query_planner, store, scope=first, overdue=True, today="2025-07-01")
+        _line("rollup subtree", t)
+
+        rnd = random.Random(1)
+        ids = [it["id"] for it in items]
+        gets, updates, adds, deletes = [], [], [], []
+        for _ in range(args.ops):
+            target = rnd.choice(ids)
+            _, t = timed(store.get_item, target)
+            gets.append(t)
+        for i in range(args.ops):
+            _, t = timed(store.update_item, rnd.choice(ids), {"status": rnd.choice(STATUSES), "order": str(i)})
+            updates.append(t)
+        added = []
+        for i in range(args.ops):
+            item, t = timed(store.add_item, rnd.choice(ids), f"New {i}", "Feature", "Planned", "bench", "", "")
+            added.append(item["id"])
+            adds.append(t)
+        for item_id in added:
+            _, t = timed(store.delete_item, item_id)
+            deletes.append(t)
+        _latency("get_item", gets)
+        _latency("update_item", updates)
+        _latency("add_item", adds)
+        _latency("delete_item", deletes)
+        assert len(store.list_items()) == args.items
+
+
+if __name__ == "__main__":
+    main()
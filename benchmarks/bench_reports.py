@@ -0,0 +1,131 @@
+"""PDF 리포트 처리량 벤치마크 (동시 요청).
+
+    python benchmarks/bench_reports.py [--users 8] [--sections 6] [--workers 2]
+
+- inline   : 요청 스레드에서 바로 렌더링 (기존 FileDownload 콜백 방식)
+- service  : ReportService 프로세스 풀 + 폴링
+사용자마다 내용이 다른 리포트를 동시에 요청해 처리량과 지연(p50/p95), 그리고
+렌더링 중 서버 스레드 지연(lag: 10ms 주기 작업이 밀린 최대 시간)을 비교한다.
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+
+from report_builder import ReportRenderer  # noqa: E402
+from report_service import ReportService  # noqa: E402
+
+
+def make_sections(user: int, count: int, points: int = 1000):
+    rnd = random.Random(user)
+    sections = []
+    for i in range(count):
+        if i % 3 == 2:
+            nodes = [{"id": f"N{user}-{k}"} for k in range(12)]
+            edges = [(nodes[k]["id"], nodes[rnd.randrange(k)]["id"]) for k in range(1, 12)]
+            sections.append({"kind": "topology", "title": f"Topology {i}", "spec": {"graph": {"nodes": nodes, "edges": edges}}})
+        else:
+            values = [50 + 30 * math.sin(k / 40) + rnd.random() * 10 for k in range(points)]
+            times = [f"{(k // 60) % 24:02d}:{k % 60:02d}" for k in range(points)]
+            sections.append({"kind": "chart", "title": f"Chart {i}",
+                             "spec": {"asset": f"a{user}", "metric": "cpu", "period": "1d", "times": times, "values": values}})
+    return sections
+
+
+class LagMonitor:
+    """서버 스레드에서 도는 주기 작업이 얼마나 밀리는지 측정."""
+
+    def __init__(self, period: float = 0.01):
+        self.period = period
+        self.max_lag = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        expected = time.perf_counter() + self.period
+        while not self._stop.is_set():
+            time.sleep(self.period)
+            now = time.perf_counter()
+            self.max_lag = max(self.max_lag, now - expected)
+            expected = now + self.period
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _report(name, latencies, elapsed, lag):
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{name:<10} reports={len(latencies):<4} {len(latencies) / elapsed:6.2f} rep/s "
+          f"p50={statistics.median(latencies) * 1000:8.1f}ms p95={p95 * 1000:8.1f}ms "
+          f"max-lag={lag * 1000:7.1f}ms")
+
+
+def run_inline(all_sections):
+    renderer = ReportRenderer()
+    latencies = []
+
+    def worker(sections):
+        start = time.perf_counter()
+        renderer.render(sections)
+        latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in all_sections]
+    with LagMonitor() as lag:
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    _report("inline", latencies, elapsed, lag.max_lag)
+
+
+def run_service(all_sections, workers):
+    service = ReportService(workers=workers, per_user_limit=1)
+    # 워커 프로세스 기동 비용은 제외
+    warm = service.submit("warmup", make_sections(-1, 1, points=10))
+    while not warm.done:
+        time.sleep(0.05)
+    with LagMonitor() as lag:
+        start = time.perf_counter()
+        jobs = [service.submit(f"user{i}", s) for i, s in enumerate(all_sections)]
+        while not all(j.done for j in jobs):
+            time.sleep(0.02)
+        elapsed = time.perf_counter() - start
+    errors = [j.error for j in jobs if j.error]
+    if errors:
+        print("errors:", errors[:3])
+    _report("service", [j.finished - j.submitted for j in jobs], elapsed, lag.max_lag)
+    service.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    all_sections = [make_sections(u, args.sections) for u in range(args.users)]
+    run_inline(all_sections)
+    run_service(all_sections, args.workers)
+
+
+if __name__ == "__main__":
+    main()
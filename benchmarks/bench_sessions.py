@@ -0,0 +1,63 @@
+"""세션 생성 / 메시지당 오케스트레이터 오버헤드 벤치마크.
+
+    python benchmarks/bench_sessions.py [--sessions 200] [--messages 500]
+
+- per-session  : 세션마다 SharedResources 를 새로 만드는 기존 방식
+- shared       : 공유 SharedResources 를 참조하는 현재 방식
+- 메시지 오버헤드는 RunnableWithMessageHistory 를 매번 구성하는 비용과
+  공유 체인을 재사용하는 비용을 비교 (LLM 호출/데이터소스 지연은 제외)
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.runnables.history import RunnableWithMessageHistory  # noqa: E402
+
+from orchestrator import AIOpsOrchestrator, SharedResources, get_session_history, get_shared_resources  # noqa: E402
+
+
+def _timeit(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+    print(f"{name:<28} n={len(samples):<5} mean={statistics.mean(samples):8.3f}ms "
+          f"p50={statistics.median(samples):8.3f}ms p95={p95:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=500)
+    args = parser.parse_args()
+
+    shared = get_shared_resources()  # 최초 1회 생성 비용은 제외
+
+    print("== session creation ==")
+    _report("per-session resources", _timeit(lambda: AIOpsOrchestrator(shared=SharedResources()), args.sessions))
+    _report("shared resources", _timeit(AIOpsOrchestrator, args.sessions))
+
+    print("== per-message chain overhead ==")
+    runnable = shared.chain or shared.base_prompt
+
+    def rebuild():
+        RunnableWithMessageHistory(runnable, get_session_history,
+                                   input_messages_key="input", history_messages_key="history")
+
+    _report("rebuild chain per message", _timeit(rebuild, args.messages))
+    _report("reuse shared chain", _timeit(lambda: shared.chain_with_history, args.messages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""라우팅 평가 하니스.
+
+    python benchmarks/eval_router.py [--eval assets/router_eval.json]
+
+라벨된 질의 세트에서 키워드 라우터(기존 _decide_modes)와 기본 라우팅 엔진을 비교:
+- exact: 모드 집합이 정답과 정확히 같은 비율
+- precision / recall: 모드 단위
+- calls: 호출된 데이터소스 수 합계, wasted: 정답에 없는 호출 수, missed: 빠진 정답 모드 수
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from query_router import (  # noqa: E402
+    DEFAULT_MODES, EXAMPLES_PATH, CentroidRouter, KeywordRouter, RoutingEngine, build_default_engine,
+    mask_entities,
+)
+
+# 평가 세트에 등장하는 자산명 (운영에서는 AssetRecognizer 가 찾아 줌)
+EVAL_ASSETS = ["a812dpt", "db-master", "was-01", "web-01", "sw-core-01"]
+
+
+def evaluate(name, route, dataset):
+    exact = tp = fp = fn = calls = 0
+    start = time.perf_counter()
+    for ex in dataset:
+        pred, gold = set(route(ex["query"])), set(ex["modes"])
+        exact += pred == gold
+        tp += len(pred & gold)
+        fp += len(pred - gold)
+        fn += len(gold - pred)
+        calls += len(pred)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    n = len(dataset)
+    row = {
+        "name": name,
+        "exact": exact / n,
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "calls": calls,
+        "wasted": fp,
+        "missed": fn,
+        "ms_per_query": elapsed_ms / n,
+    }
+    print(f"{name:<12} exact={row['exact']:.2f} P={row['precision']:.2f} R={row['recall']:.2f} "
+          f"calls={calls} wasted={fp} missed={fn} {row['ms_per_query']:.3f}ms/q")
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--eval", default=os.path.join("assets", "router_eval.json"))
+    parser.add_argument("--examples", default=EXAMPLES_PATH)
+    args = parser.parse_args()
+
+    with open(args.eval, "r", encoding="utf-8") as f:
+        dataset = json.load(f)
+
+    keyword = RoutingEngine([KeywordRouter()])
+    centroid = CentroidRouter.from_file(args.examples)
+    print(f"eval set: {len(dataset)} queries (default modes: {DEFAULT_MODES})")
+    base = evaluate("keyword", keyword.route, dataset)
+    evaluate("centroid", lambda q: centroid.route(mask_entities(q, EVAL_ASSETS)) or DEFAULT_MODES, dataset)
+    engine = build_default_engine(examples_path=args.examples)
+    tuned = evaluate("engine", lambda q: engine.route(q, EVAL_ASSETS), dataset)
+    print(f"data-source calls saved vs keyword: {base['calls'] - tuned['calls']} "
+          f"(wasted {base['wasted']} -> {tuned['wasted']}, missed {base['missed']} -> {tuned['missed']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,87 +1,20 @@
-import io
+import json
 import os
-import time
-import uuid
 import html
 
 import panel as pn
-import matplotlib.pyplot as plt
-import networkx as nx
-import pandas as pd
-from pyvis.network import Network
-
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as PDFImage, Table, TableStyle
 
+from data_sources import _load_settings
+from metric_chart import DEMO_METRIC, decimate, make_metric_figure
 from orchestrator import AIOpsOrchestrator
-from data_sources import GraphDataSource
-
-
-def generate_pdf_report(topo_buffer, chart_buffer):
-    """토폴로지, 차트, 표를 모두 포함한 PDF 생성"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4,
-                            rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-    story = []
-    styles = getSampleStyleSheet()
-
-    story.append(Paragraph("<b>SPA System Report</b>", styles['Title']))
-    story.append(Spacer(1, 20))
-    story.append(Paragraph(f"Date: {time.strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Spacer(1, 20))
+from report_builder import ReportSections
+from topology_layout import layout_service
+from topology_render import render_topology_iframe
+from ui.event_table import build_event_table, events_to_frame
+from session_manager import deep_sizeof
 
-    story.append(Paragraph("<b>1. Executive Summary</b>", styles['Heading2']))
-    story.append(Paragraph("Integrated analysis report including topology status, performance trends, and incident logs.", styles['Normal']))
-    story.append(Spacer(1, 20))
-
-    story.append(Paragraph("<b>2. Network Topology</b>", styles['Heading2']))
-    story.append(Spacer(1, 10))
-    if topo_buffer is not None:
-        try:
-            topo_buffer.seek(0)
-            img = PDFImage(topo_buffer, width=400, height=250)
-            story.append(img)
-        except Exception:
-            story.append(Paragraph("(Image Error)", styles['Normal']))
-    else:
-        story.append(Paragraph("(No topology generated)", styles['Italic']))
-    story.append(Spacer(1, 20))
-
-    story.append(Paragraph("<b>3. Performance Trends</b>", styles['Heading2']))
-    story.append(Spacer(1, 10))
-    if chart_buffer is not None:
-        try:
-            chart_buffer.seek(0)
-            img = PDFImage(chart_buffer, width=400, height=200)
-            story.append(img)
-        except Exception:
-            story.append(Paragraph("(Image Error)", styles['Normal']))
-    else:
-        story.append(Paragraph("(No trend chart generated)", styles['Italic']))
-    story.append(Spacer(1, 20))
-
-    story.append(Paragraph("<b>4. Incident Logs</b>", styles['Heading2']))
-    story.append(Spacer(1, 10))
-    data = [
-        ['Time', 'Device', 'Event', 'Severity'],
-        ['13:00', 'SW-Core-01', 'Link Flapping', 'CRITICAL'],
-        ['13:01', 'WAS-01', 'High Latency', 'WARNING'],
-    ]
-    table = Table(data, colWidths=[80, 100, 120, 80])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-    ]))
-    story.append(table)
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+MAX_LOGGED_SESSIONS = 20
+INCIDENT_PAGE_SIZE = 20
 
 
 class AIOpsChatbot:
@@ -95,98 +28,136 @@ class AIOpsChatbot:
         self.orchestrator = AIOpsOrchestrator()
         self.session_id = self.orchestrator.session_id
         self.logs = {}  # 히스토리 저장(UI 복원용)
-        self.last_topo_buffer = None
-        self.last_chart_buffer = None
+        # PDF 리포트용 섹션 spec (이미지는 다운로드 요청 시에만 report_builder 가 렌더링)
+        self.report = ReportSections()
+        self.chart_max_points = int(_load_settings().get("metric", {}).get("chart_max_points", 1000))
 
-    def _log(self, role: str, kind: str, content):
-        self.logs.setdefault(self.session_id, []).append({
+        self._spill_path = None
+
+    def _log(self, role: str, kind: str, content, **extra):
+        self.logs.setdefault(self.session_id, []).append(dict({
             "role": role,
             "kind": kind,
             "content": content
-        })
+        }, **extra))
+
+    def record_exchange(self, question: str, result):
+        """질문/답변 한 쌍을 UI 복원용 로그에 기록.
+
+        route_and_answer 결과 전체(시계열 배열, 토폴로지 등)가 아니라 복원에 필요한 JSON 값만 남겨
+        spill/restore 후에도 그대로 되돌아오게 한다.
+        """
+        self._log("user", "text", question)
+        manuals = [
+            {"title": str(m.get("title") or ""), "link": str(m.get("link") or ""), "page": m.get("page"),
+             "score": float(m["score"]) if m.get("score") is not None else None}
+            for m in result.get("manuals") or []
+        ]
+        self._log("assistant", "text", str(result.get("answer_text") or ""),
+                  assets=[str(a) for a in result.get("assets") or []], manuals=manuals)
+
+    def get_logs(self, session_id: str):
+        if self._spill_path:
+            self.restore_logs()
+        return self.logs.get(session_id, [])
 
     def reset_memory(self):
+        if self.session_id in self.logs:
+            # 방금 닫은(다시 불러왔던 것 포함) 대화를 가장 최근으로 옮겨 사이드바 버튼 순서와 맞춤
+            self.logs[self.session_id] = self.logs.pop(self.session_id)
         self.orchestrator.reset_session()
         self.session_id = self.orchestrator.session_id
-        self.last_topo_buffer = None
-        self.last_chart_buffer = None
-
-    def build_table_panel(self):
-        df = pd.DataFrame({
-            'Time': ['13:00', '13:01', '13:05'],
-            'Device': ['SW-Core-01', 'WAS-01', 'DB-Master'],
-            'Status': ['🚨 Critical', '⚠️ Warning', '✅ Normal'],
-            'Metric': ['Link Down', 'Latency 2s', 'CPU 40%']
-        })
-        table_widget = pn.widgets.Tabulator(
-            df, show_index=False, sizing_mode='stretch_width', theme='site', height=150
-        )
+        self.report.clear()
+        # 오래된 대화 로그부터 제거해 세션당 보관량을 제한
+        while len(self.logs) > MAX_LOGGED_SESSIONS:
+            self.logs.pop(next(iter(self.logs)))
+
+    # --- 세션 수명 주기 (SessionManager 에서 호출) ---
+    def memory_usage(self) -> int:
+        return deep_sizeof(self.logs) + deep_sizeof(self.report.snapshot())
+
+    def spill_logs(self, path: str):
+        """대화 로그를 디스크로 내보내고 메모리의 로그를 해제 (리포트 섹션 spec 은 작으므로 유지)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            # record_exchange 가 JSON 값만 남기므로 문자열 변환 없이 그대로 왕복된다
+            json.dump(self.logs, f, ensure_ascii=False)
+        self._spill_path = path
+        self.logs = {}
+
+    def restore_logs(self):
+        path, self._spill_path = self._spill_path, None
+        if not path:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                spilled = json.load(f)
+            spilled.update(self.logs)
+            self.logs = spilled
+            os.remove(path)
+        except Exception:
+            pass
+
+    def close(self):
+        if self._spill_path:
+            try:
+                os.remove(self._spill_path)
+            except Exception:
+                pass
+            self._spill_path = None
+        self.logs = {}
+        self.report.clear()
+
+    def build_table_panel(self, asset=None):
+        def record(rows):
+            df = events_to_frame(rows)
+            self.report.add("table", "Incident Status Table",
+                            {"columns": list(df.columns), "rows": df.astype(str).values.tolist()})
+
         return pn.Column(
             pn.pane.Markdown("**📅 Incident Status Table**", styles={'font-size': '12px', 'font-weight': 'bold'}),
-            table_widget, sizing_mode='stretch_width'
+            build_event_table(self.orchestrator.event_ds, asset=asset, page_size=INCIDENT_PAGE_SIZE, on_page=record),
+            sizing_mode='stretch_width'
         )
 
-    def build_line_chart_panel(self, metric_info=None):
-        if metric_info:
-            times, values = metric_info["times"], metric_info["values"]
-            title = f"{metric_info['asset']} - {metric_info['metric']} ({metric_info['period']})"
-        else:
-            times, values = ['09:00', '10:00', '11:00', '12:00', '13:00'], [20, 35, 45, 30, 95]
-            title = 'CPU Trend Analysis'
-
-        fig, ax = plt.subplots(figsize=(5, 3))
-        ax.plot(times, values, 'o-')
-        ax.set_title(title, fontsize=10)
-        ax.set_ylabel('Value')
-        ax.grid(True, linestyle='--', alpha=0.5)
-
-        img_buffer = io.BytesIO()
-        fig.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-        img_buffer.seek(0)
-        self.last_chart_buffer = img_buffer
-        plt.close(fig)
+    def report_sections(self):
+        """리포트 섹션 spec + 마지막에 최근 이벤트 표."""
+        page = self.orchestrator.event_ds.get_events(page_size=INCIDENT_PAGE_SIZE)
+        df = events_to_frame(page["rows"])
+        incidents = {"kind": "table", "title": "Incident Logs",
+                     "spec": {"columns": list(df.columns), "rows": df.astype(str).values.tolist()}}
+        return self.report.snapshot() + [incidents]
 
+    def build_line_chart_panel(self, metric_info=None):
+        metric_info = metric_info or DEMO_METRIC
+        # 리포트에는 차트에 그린 만큼(축약된 점)만 보관
+        times, values, _ = decimate(metric_info, self.chart_max_points)
+        spec = {k: metric_info[k] for k in ("asset", "metric", "period")}
+        spec.update(times=times, values=values)
+        self.report.add("chart", f"Performance Trend: {spec['asset']} {spec['metric']} ({spec['period']})", spec)
+
+        fig = make_metric_figure(metric_info, max_points=self.chart_max_points)
         return pn.Column(
-            pn.pane.PNG(img_buffer, width=400),
+            pn.pane.Bokeh(fig, sizing_mode='stretch_width'),
             pn.pane.Markdown("📈 **Timeseries Trend**", styles={'font-size': '11px', 'color': 'gray'}),
             sizing_mode='stretch_width'
         )
 
     def build_topology_panel(self, graph_info=None):
         if not graph_info:
-            graph_info = GraphDataSource().get_topology_for_asset("default")
-
-        G = nx.DiGraph()
-        for node in graph_info["nodes"]:
-            G.add_node(node["id"], label=node["label"], title=node["label"], shape="icon",
-                       icon={"face": "Font Awesome 5 Free", "code": chr(int(node["icon"], 16)),
-                             "weight": "bold", "color": node["color"]})
-        for edge in graph_info["edges"]:
-            G.add_edge(edge[0], edge[1])
-
-        nt = Network(height="350px", width="100%", bgcolor="#ffffff", font_color="black", notebook=True, cdn_resources='remote')
-        nt.from_nx(G)
-        nt.force_atlas_2based(gravity=-50, spring_length=100, damping=0.4)
-
-        tmp_html = f"topo_{uuid.uuid4().hex}.html"
-        nt.save_graph(tmp_html)
-        with open(tmp_html, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        try:
-            os.remove(tmp_html)
-        except Exception:
-            pass
+            graph_info = self.orchestrator.graph_ds.get_topology_for_asset("default")
 
-        iframe_html = f'<iframe srcdoc="{html.escape(html_content)}" style="width:100%; height:350px; border:1px solid #ddd;"></iframe>'
+        # 좌표는 토폴로지 해시 단위로 한 번만 계산해 인터랙티브 뷰와 PDF가 공유
+        pos = layout_service.positions(graph_info)
+        pixel_pos = layout_service.to_pixels(pos)
 
-        plt.figure(figsize=(6, 4))
-        pos = nx.spring_layout(G)
-        nx.draw(G, pos, with_labels=True, node_color='lightblue', node_size=1200, font_size=8, edge_color='gray')
-        pdf_buffer = io.BytesIO()
-        plt.savefig(pdf_buffer, format='png', dpi=100)
-        pdf_buffer.seek(0)
-        self.last_topo_buffer = pdf_buffer
-        plt.close()
+        iframe_html = render_topology_iframe(graph_info, pixel_pos, height=350)
+
+        center = graph_info["nodes"][0]["id"] if graph_info.get("nodes") else "-"
+        self.report.add("topology", f"Network Topology: {center}", {
+            "graph": graph_info,
+            "positions": {node: [x, y] for node, (x, y) in pos.items()},
+        })
 
         return pn.Column(
             pn.pane.HTML(iframe_html, height=360, sizing_mode='stretch_width'),
@@ -194,28 +165,13 @@ class AIOpsChatbot:
             sizing_mode='stretch_width'
         )
 
-    def answer(self, contents: str):
-        self._log("user", "text", contents)
-        result = self.orchestrator.route_and_answer(contents)
-
-        answer_text = result["answer_text"]
-        metric_info = result["metric"]
-        graph_info = result["graph"]
-        manuals = result["manuals"]
-
+    def build_result_views(self, contents: str, result) -> list:
+        """route_and_answer 결과의 차트/토폴로지/이벤트 표 패널 (채팅 탭과 answer() 공용)."""
+        metric_info = result.get("metric")
+        graph_info = result.get("graph")
         q = contents.lower()
         composite_views = []
 
-        composite_views.append(
-            pn.pane.Markdown(f'<div class="bot-msg-box">{html.escape(answer_text)}</div>', sizing_mode='stretch_width')
-        )
-
-        if manuals:
-            links_md = "\n".join(f"- [{m['title']}]({m['link']})" for m in manuals)
-            composite_views.append(
-                pn.pane.Markdown(f'<div class="bot-msg-box">📚 관련 매뉴얼<br/>{links_md}</div>', sizing_mode='stretch_width')
-            )
-
         common_styles = {
             'float': 'left', 'clear': 'both', 'background-color': '#f0f0f0',
             'border-radius': '0 15px 15px 15px', 'padding': '10px', 'margin': '5px 10px'
@@ -234,10 +190,28 @@ class AIOpsChatbot:
             )
 
         if any(k in q for k in ["표", "테이블", "incident", "이벤트"]):
-            table_panel = self.build_table_panel()
+            assets = result.get("assets") or [None]
+            table_panel = self.build_table_panel(assets[0])
             composite_views.append(
                 pn.Column(table_panel, css_classes=['bot-msg-box'], styles=common_styles)
             )
+        return composite_views
+
+    def answer(self, contents: str):
+        result = self.orchestrator.route_and_answer(contents)
+
+        answer_text = result["answer_text"]
+        manuals = result["manuals"]
+        composite_views = [
+            pn.pane.Markdown(f'<div class="bot-msg-box">{html.escape(answer_text)}</div>', sizing_mode='stretch_width')
+        ]
+
+        if manuals:
+            links_md = "\n".join(f"- [{m['title']}]({m['link']})" for m in manuals)
+            composite_views.append(
+                pn.pane.Markdown(f'<div class="bot-msg-box">📚 관련 매뉴얼<br/>{links_md}</div>', sizing_mode='stretch_width')
+            )
+        composite_views.extend(self.build_result_views(contents, result))
 
-        self._log("assistant", "composite", result)
+        self.record_exchange(contents, result)
         return pn.Column(*composite_views, sizing_mode='stretch_width')
\ No newline at end of file
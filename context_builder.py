@@ -0,0 +1,188 @@
+import logging
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCounter:
+    """tiktoken 이 있으면 사용하고, 없으면 ASCII 4자당 1토큰 + 비ASCII 1자당 1토큰으로 보수적으로 근사."""
+
+    def __init__(self, encoding: str = "o200k_base"):
+        self._enc = None
+        if tiktoken is not None:
+            try:
+                self._enc = tiktoken.get_encoding(encoding)
+            except Exception as e:
+                logger.warning("tiktoken 인코딩 로드 실패, 근사 카운터 사용 (%s)", e)
+
+    def __call__(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._enc is not None:
+            return len(self._enc.encode(text, disallowed_special=()))
+        non_ascii = sum(1 for ch in text if ord(ch) > 127)
+        return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+def _fmt_value(v: Any) -> str:
+    if isinstance(v, float):
+        return f"{v:.4g}"
+    return str(v)
+
+
+def compress_config(config_info) -> List[str]:
+    """구성정보 dict(또는 dict 목록)를 'k=v' 한 줄씩으로 축약."""
+    configs = config_info if isinstance(config_info, list) else [config_info]
+    lines = []
+    for cfg in configs:
+        if not cfg:
+            continue
+        name = cfg.get("name", "?")
+        attrs = ", ".join(f"{k}={v}" for k, v in cfg.items() if k != "name" and v not in (None, ""))
+        lines.append(f"- {name}: {attrs}")
+    return lines
+
+
+def compress_metric(metric_info) -> List[str]:
+    """원시 배열 대신 요약 통계(최소/최대/평균/마지막/추세/피크 시각)만 전달."""
+    times = metric_info.get("times", [])
+    # 결측(None)은 시각과 함께 빼야 피크 시각이 다른 샘플로 밀리지 않음
+    points = [(times[i] if i < len(times) else "?", v)
+              for i, v in enumerate(metric_info.get("values", [])) if v is not None]
+    head = f"- {metric_info.get('asset')} {metric_info.get('metric')} ({metric_info.get('period')})"
+    if not points:
+        return [f"{head}: 데이터 없음"]
+    values = [v for _, v in points]
+    n = len(values)
+    peak_at = max(points, key=lambda p: p[1])[0]
+    delta = values[-1] - values[0]
+    trend = "상승" if delta > 0 else ("하락" if delta < 0 else "유지")
+    return [
+        f"{head}: n={n}, min={_fmt_value(min(values))}, max={_fmt_value(max(values))} @ {peak_at}, "
+        f"avg={_fmt_value(sum(values) / n)}, last={_fmt_value(values[-1])}, 추세={trend}({delta:+.4g})"
+    ]
+
+
+def compress_manuals(manuals, snippet_chars: int = 160) -> List[str]:
+    """제목/스니펫 기준으로 중복 제거 후 스니펫을 자름."""
+    seen = set()
+    lines = []
+    for m in manuals:
+        snippet = " ".join((m.get("snippet") or "").split())[:snippet_chars]
+        key = (m.get("title"), snippet[:60])
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(f"- {m.get('title')}: {snippet} (link: {m.get('link')})")
+    return lines
+
+
+def compress_history(history_hits, hit_chars: int = 240) -> List[str]:
+    seen = set()
+    lines = []
+    for h in history_hits:
+        text = " ".join(h.split())[:hit_chars]
+        if text in seen:
+            continue
+        seen.add(text)
+        lines.append(f"- {text}")
+    return lines
+
+
+def compress_planner(planner_info) -> List[str]:
+    """query_planner 집계 결과를 범위/완료율/담당자별/지연 항목 줄로 축약."""
+    from planner_query import summarize_planner_result
+    return summarize_planner_result(planner_info)
+
+
+class ContextBuilder:
+    """소스별 우선순위에 따라 토큰 예산을 배분해 LLM 컨텍스트를 조립.
+
+    1) 각 소스를 압축(compress_*)해 줄 목록으로 만들고
+    2) 우선순위 순서로 max_share 까지 할당한 뒤, 남은 예산을 잘린 소스에 다시 배분
+    3) 예산을 넘는 소스는 뒤쪽 줄부터 버리고, 한 줄도 안 들어가면 글자 단위로 자름
+    build() 는 (context_text, report) 를 반환하며 report 에 소스별 토큰 수가 담긴다.
+    """
+
+    # (key, 제목, 압축 함수, 우선순위(작을수록 먼저), 최대 비율)
+    SOURCES: Sequence[Tuple[str, str, Callable, int, float]] = (
+        ("metric", "[시계열 요약]", compress_metric, 0, 0.25),
+        ("config", "[구성정보]", compress_config, 1, 0.25),
+        ("planner", "[플래너 집계]", compress_planner, 1, 0.35),
+        ("manuals", "[매뉴얼 검색 결과]", compress_manuals, 2, 0.5),
+        ("history_hits", "[이전 대화 히스토리]", compress_history, 3, 0.35),
+    )
+
+    def __init__(self, budget_tokens: int = 1500, counter: Optional[Callable[[str], int]] = None):
+        self.budget_tokens = budget_tokens
+        self.count = counter or TokenCounter()
+
+    def _fit(self, title: str, lines: List[str], budget: int) -> Tuple[str, int, bool]:
+        """budget 안에 들어가는 만큼만 남긴 섹션 텍스트와 토큰 수."""
+        kept: List[str] = []
+        used = self.count(title) + 1
+        for line in lines:
+            cost = self.count(line) + 1
+            if used + cost > budget:
+                break
+            kept.append(line)
+            used += cost
+        truncated = len(kept) < len(lines)
+        if not kept and lines and budget > used:
+            # 첫 줄조차 안 들어가면 글자 단위로 자름
+            line = lines[0]
+            lo, hi = 0, len(line)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if used + self.count(line[:mid] + "…") + 1 <= budget:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            if lo:
+                kept.append(line[:lo] + "…")
+                used += self.count(kept[0]) + 1
+        if not kept:
+            return "", 0, bool(lines)
+        return "\n".join([title] + kept), used, truncated
+
+    def build(self, **sources) -> Tuple[str, Dict[str, Any]]:
+        prepared = []
+        for key, title, compress, priority, share in sorted(self.SOURCES, key=lambda s: s[3]):
+            data = sources.get(key)
+            if not data:
+                continue
+            lines = compress(data)
+            need = self.count(title) + 1 + sum(self.count(ln) + 1 for ln in lines)
+            prepared.append({"key": key, "title": title, "lines": lines, "need": need,
+                             "cap": int(self.budget_tokens * share)})
+
+        remaining = self.budget_tokens
+        for p in prepared:
+            p["alloc"] = min(p["need"], p["cap"], remaining)
+            remaining -= p["alloc"]
+        # 남은 예산을 우선순위 순으로 잘린 소스에 재배분
+        for p in prepared:
+            if remaining <= 0:
+                break
+            extra = min(p["need"] - p["alloc"], remaining)
+            p["alloc"] += extra
+            remaining -= extra
+
+        parts = []
+        report: Dict[str, Any] = {"budget": self.budget_tokens, "sections": {}, "truncated": []}
+        for p in prepared:
+            text, used, truncated = self._fit(p["title"], p["lines"], p["alloc"])
+            report["sections"][p["key"]] = {"tokens": used, "raw_tokens": p["need"]}
+            if truncated:
+                report["truncated"].append(p["key"])
+            if text:
+                parts.append(text)
+        context_text = "\n\n".join(parts) if parts else "관련 데이터 없음"
+        report["total"] = self.count(context_text)
+        return context_text, report
@@ -1,12 +1,21 @@
 import json
 import logging
 import os
+import re
+import select
+import threading
+import time
+from contextlib import contextmanager
 from functools import lru_cache
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from psycopg2.extras import RealDictCursor
-from neo4j import GraphDatabase
+from psycopg2.pool import ThreadedConnectionPool
+
+from graph_client import GraphClient
+from resilience import CircuitOpenError, ResiliencePolicy, get_policy
 
 try:
     from openai import OpenAI
@@ -62,8 +71,96 @@ def _load_settings():
             "uri": "bolt://115.21.12.151:7687",
             "user": "neo4j",
             "password": "wemb1!",
+            "database": None,
+            "max_connection_pool_size": 50,
+            "connection_acquisition_timeout": 10,
+            "fetch_size": 1000,
+            "query_timeout": 10,
         },
         "embed_model": "text-embedding-3-small",
+        "graph": {
+            "node_label": "Asset",
+            "max_depth": 2,
+            "max_fanout": 25,
+            "max_nodes": 200,
+            "cache_ttl": 60,
+        },
+        "catalog": {
+            "refresh_interval": 300,
+            "notify_channel": "asset_configs_changed",
+            "pool_maxconn": 5,
+        },
+        "recognizer": {
+            "aliases": {},
+        },
+        "history": {
+            "path": os.path.join("data", "history.db"),
+            "retention_days": 90,
+            "max_rows": 100000,
+            "working_set": 40,
+            "semantic": False,
+            "summarize_after": 12,
+            "keep_recent": 6,
+            "max_summary_chars": 1500,
+            # True 면 다른 세션의 질문/답변까지 검색 (다른 사용자 대화가 LLM 컨텍스트에 들어감)
+            "search_all_sessions": False,
+        },
+        "router": {
+            "llm_fallback": False,
+        },
+        "context": {
+            "budget_tokens": 1500,
+            "history_tokens": 500,
+        },
+        "metric": {
+            "cache_ttl": 30,
+            "chart_max_points": 1000,
+        },
+        "embedding_cache": {
+            "ttl": 600,
+            "maxsize": 1024,
+        },
+        "prefetch": {
+            "enabled": True,
+            "debounce_ms": 400,
+            "min_chars": 4,
+            "workers": 4,
+        },
+        "report": {
+            "workers": 2,
+            "per_user_limit": 1,
+            "job_ttl": 600,
+            "use_processes": True,
+            "font_family": "Malgun Gothic",
+        },
+        "planner": {
+            "backend": "json",
+            "path": os.path.join("assets", "planner.json"),
+            "compact_every": 500,
+            "sqlite_path": os.path.join("data", "planner.db"),
+            "poll_interval": 2,
+            "notify_channel": "planner_changed",
+            "change_retention": 10000,
+        },
+        "resilience": {
+            # llm.max_workers 는 llm.max_concurrency * llm.max_batch_size 이상
+            "llm": {"timeout": 60, "retries": 1, "hedge_percentile": None,
+                    "failure_threshold": 5, "reset_timeout": 30, "max_workers": 32},
+            "embedding": {"timeout": 10, "retries": 2, "hedge_percentile": 95,
+                          "failure_threshold": 3, "reset_timeout": 30, "max_workers": 16},
+        },
+        "llm": {
+            "backend": "auto",
+            "model": "gpt-4o-mini",
+            "base_url": None,
+            "api_key": None,
+            "timeout": 120,
+            "batching": True,
+            "max_batch_size": 8,
+            "batch_window_ms": 10,
+            "max_concurrency": 4,
+            "fake_latency_ms": 50,
+        },
     }
     try:
         with open(DEFAULT_CONFIG_PATH, "r", encoding="utf-8-sig") as f:
@@ -71,6 +168,20 @@ def _load_settings():
         # 얕은 병합
         cfg["postgres"].update(file_cfg.get("postgres", {}))
         cfg["neo4j"].update(file_cfg.get("neo4j", {}))
+        cfg["graph"].update(file_cfg.get("graph", {}))
+        cfg["catalog"].update(file_cfg.get("catalog", {}))
+        cfg["recognizer"].update(file_cfg.get("recognizer", {}))
+        cfg["history"].update(file_cfg.get("history", {}))
+        cfg["router"].update(file_cfg.get("router", {}))
+        cfg["context"].update(file_cfg.get("context", {}))
+        cfg["llm"].update(file_cfg.get("llm", {}))
+        cfg["metric"].update(file_cfg.get("metric", {}))
+        cfg["embedding_cache"].update(file_cfg.get("embedding_cache", {}))
+        cfg["prefetch"].update(file_cfg.get("prefetch", {}))
+        cfg["report"].update(file_cfg.get("report", {}))
+        cfg["planner"].update(file_cfg.get("planner", {}))
+        for kind, params in file_cfg.get("resilience", {}).items():
+            cfg["resilience"].setdefault(kind, {}).update(params)
         if "embed_model" in file_cfg:
             cfg["embed_model"] = file_cfg["embed_model"]
     except Exception as e:
@@ -94,6 +205,16 @@ def _load_settings():
     for k, v in neo_env.items():
         if v:
             cfg["neo4j"][k] = v
+    llm_env = {
+        "backend": os.getenv("LLM_BACKEND"),
+        "model": os.getenv("LLM_MODEL"),
+        "base_url": os.getenv("LLM_BASE_URL"),
+    }
+    for k, v in llm_env.items():
+        if v:
+            cfg["llm"][k] = v
+    if os.getenv("PLANNER_BACKEND"):
+        cfg["planner"]["backend"] = os.getenv("PLANNER_BACKEND")
     embed_env = os.getenv("EMBED_MODEL")
     if embed_env:
         cfg["embed_model"] = embed_env
@@ -105,19 +226,75 @@ def _pg_conn():
     return psycopg2.connect(**cfg, connect_timeout=5)
 
 
-_neo4j_driver = None
+_pg_pool: Optional[ThreadedConnectionPool] = None
+_pg_pool_lock = threading.Lock()
 
 
-def _get_neo4j_driver():
-    global _neo4j_driver
-    if _neo4j_driver is None:
-        neo_cfg = _load_settings()["neo4j"]
-        _neo4j_driver = GraphDatabase.driver(
-            neo_cfg["uri"],
-            auth=(neo_cfg["user"], neo_cfg["password"]),
-            connection_timeout=5,
-        )
-    return _neo4j_driver
+@contextmanager
+def _pg_pooled():
+    """풀에서 커넥션을 빌려 트랜잭션 단위로 사용하고 반납.
+
+    예외가 나도 항상 반납하며(with conn 이 롤백), 연결 자체가 끊긴 경우에만 닫고 버린다.
+    """
+    global _pg_pool
+    if _pg_pool is None:
+        with _pg_pool_lock:
+            if _pg_pool is None:
+                maxconn = int(_load_settings()["catalog"].get("pool_maxconn", 5))
+                _pg_pool = ThreadedConnectionPool(1, maxconn, **_load_settings()["postgres"], connect_timeout=5)
+    conn = _pg_pool.getconn()
+    broken = False
+    try:
+        with conn:
+            yield conn
+    except (psycopg2.InterfaceError, psycopg2.OperationalError):
+        broken = True
+        raise
+    finally:
+        _pg_pool.putconn(conn, close=broken or bool(conn.closed))
+
+
+_graph_client: Optional[GraphClient] = None
+_graph_client_lock = threading.Lock()
+
+
+def get_graph_client() -> GraphClient:
+    """프로세스 전체에서 공유하는 GraphClient (스레드 안전 지연 생성)."""
+    global _graph_client
+    if _graph_client is None:
+        with _graph_client_lock:
+            if _graph_client is None:
+                _graph_client = GraphClient(_load_settings()["neo4j"])
+    return _graph_client
+
+
+def set_graph_client(client: Optional[GraphClient]):
+    """GraphClient 교체 (LocalGraphDriver 기반 테스트 클라이언트 주입 등). None 이면 초기화."""
+    global _graph_client
+    with _graph_client_lock:
+        old, _graph_client = _graph_client, client
+    if old is not None and old is not client:
+        old.close()
+
+
+def get_resilience_policy(kind: str) -> ResiliencePolicy:
+    """resilience.<kind> 설정으로 만든 공용 보호 정책 (llm, embedding)."""
+    return get_policy(kind, **_load_settings().get("resilience", {}).get(kind, {}))
+
+
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+
+def _embedding_client():
+    global _openai_client
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                timeout = _load_settings().get("resilience", {}).get("embedding", {}).get("timeout", 10)
+                # 재시도/타임아웃은 ResiliencePolicy 가 담당
+                _openai_client = OpenAI(timeout=timeout, max_retries=0)
+    return _openai_client
 
 
 def _compute_embedding(text: str) -> Optional[List[float]]:
@@ -128,47 +305,351 @@ def _compute_embedding(text: str) -> Optional[List[float]]:
     if not os.getenv("OPENAI_API_KEY"):
         logger.error("OPENAI_API_KEY not set. Embedding unavailable.")
         return None
-    try:
-        client = OpenAI()
-        model_name = _load_settings().get("embed_model", "text-embedding-3-small")
-        resp = client.embeddings.create(model=model_name, input=text)
+    model_name = _load_settings().get("embed_model", "text-embedding-3-small")
+    cache = _get_embedding_cache()
+    key = (model_name, text)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    def embed():
+        resp = _embedding_client().embeddings.create(model=model_name, input=text)
         return resp.data[0].embedding
+
+    try:
+        embedding = get_resilience_policy("embedding").call(embed)
+        cache.set(key, embedding)
+        return embedding
+    except CircuitOpenError:
+        logger.info("임베딩 서킷 open, 데모/어휘 검색 fallback 사용")
+        return None
     except Exception as e:
         logger.warning("임베딩 생성 실패, 데모 fallback 사용: %s", e)
         return None
 
 
+class _TTLCache:
+    """스레드 안전한 단순 TTL 캐시 (key -> (만료시각, 값))."""
+
+    def __init__(self, ttl: float, maxsize: int = 512):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._items) >= self.maxsize and key not in self._items:
+                # 가장 먼저 만료되는 항목부터 제거
+                oldest = min(self._items, key=lambda k: self._items[k][0])
+                del self._items[oldest]
+            self._items[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, predicate=None):
+        """predicate(key)가 참인 항목만, 없으면 전체를 무효화."""
+        with self._lock:
+            if predicate is None:
+                self._items.clear()
+                return
+            for key in [k for k in self._items if predicate(k)]:
+                del self._items[key]
+
+
+_embedding_cache: Optional[_TTLCache] = None
+
+
+def _get_embedding_cache() -> _TTLCache:
+    """(모델, 텍스트) -> 임베딩. 프리페치와 실제 질의, 근거 검색이 같은 임베딩을 재사용."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        cfg = _load_settings().get("embedding_cache", {})
+        _embedding_cache = _TTLCache(ttl=float(cfg.get("ttl", 600)), maxsize=int(cfg.get("maxsize", 1024)))
+    return _embedding_cache
+
+
+ASSET_NOTIFY_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION notify_asset_configs_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(TG_ARGV[0], COALESCE(NEW.asset_name, OLD.asset_name, ''));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS asset_configs_notify ON asset_configs;
+CREATE TRIGGER asset_configs_notify
+AFTER INSERT OR UPDATE OR DELETE ON asset_configs
+FOR EACH ROW EXECUTE FUNCTION notify_asset_configs_changed(%s);
+"""
+
+_ASSET_COLUMNS = "asset_name AS name, ip, type, location, os"
+
+
+class AssetCatalog:
+    """asset_configs 전체를 메모리 맵(lower(name) -> config)으로 유지하는 카탈로그.
+
+    - refresh_interval 마다 전체 재적재, LISTEN/NOTIFY 로 변경된 자산만 즉시 반영
+    - 맵에 없는 이름은 lower(asset_name) 함수 인덱스를 타는 쿼리로 한 번에 조회
+    - 없는 이름도 기억해 다음 전체 적재 전까지 DB 를 다시 치지 않음
+    - add_listener(callback(changed, removed)) 로 변경 사항을 구독 가능
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None, channel: Optional[str] = None):
+        cat_cfg = _load_settings().get("catalog", {})
+        self.refresh_interval = float(refresh_interval or cat_cfg.get("refresh_interval", 300))
+        self.channel = channel or cat_cfg.get("notify_channel", "asset_configs_changed")
+        if not _LABEL_RE.match(self.channel):
+            raise ValueError(f"잘못된 NOTIFY 채널: {self.channel!r}")
+        self._assets: Dict[str, Dict[str, Any]] = {}
+        self._misses: set = set()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[Dict[str, Any]], List[str]], None]] = []
+        self._loaded_at = 0.0
+        self._last_attempt = 0.0
+        self._index_ready = False
+        self._index_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # --- 적재/무효화 ---
+    def _ensure_index(self):
+        """lower(asset_name) 인덱스를 한 번만 시도. 별도 커넥션/트랜잭션이라 실패(권한 없음 등)해도 적재는 계속."""
+        if self._index_ready:
+            return
+        with self._index_lock:
+            if self._index_ready:
+                return
+            try:
+                with _pg_pooled() as conn, conn.cursor() as cur:
+                    cur.execute("CREATE INDEX IF NOT EXISTS asset_configs_lower_name_idx "
+                                "ON asset_configs (lower(asset_name))")
+            except Exception as e:
+                logger.warning("asset_configs 인덱스 생성 실패, 인덱스 없이 조회 (%s)", e)
+            self._index_ready = True
+
+    def refresh(self) -> bool:
+        """전체 재적재. 실패 시 기존 맵을 유지하고 False 반환."""
+        self._last_attempt = time.monotonic()
+        self._ensure_index()
+        try:
+            with _pg_pooled() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(f"SELECT {_ASSET_COLUMNS} FROM asset_configs")
+                rows = [dict(r) for r in cur.fetchall()]
+        except Exception as e:
+            logger.warning("AssetCatalog refresh 실패 (%s)", e)
+            return False
+        assets = {r["name"].lower(): r for r in rows if r.get("name")}
+        with self._lock:
+            removed = [k for k in self._assets if k not in assets]
+            self._assets = assets
+            self._misses.clear()
+            self._loaded_at = time.monotonic()
+        logger.info("AssetCatalog loaded %d assets", len(assets))
+        self._notify(list(assets.values()), removed)
+        return True
+
+    def _maybe_refresh(self):
+        # start() 이후에는 백그라운드 스레드가 주기적 재적재를 맡음 (시작 시 중복 적재 방지)
+        if self._threads:
+            return
+        if time.monotonic() - self._last_attempt >= self.refresh_interval:
+            self.refresh()
+
+    def invalidate(self, asset_name: Optional[str] = None):
+        """NOTIFY payload 처리: 이름이 있으면 해당 자산만 다시 읽고, 없으면 전체 재적재."""
+        if not asset_name:
+            self.refresh()
+            return
+        key = asset_name.lower()
+        try:
+            rows = self._fetch([key])
+        except Exception as e:
+            logger.warning("AssetCatalog invalidate 실패 (%s)", e)
+            return
+        with self._lock:
+            self._misses.discard(key)
+            if key in rows:
+                self._assets[key] = rows[key]
+            else:
+                self._assets.pop(key, None)
+        if key in rows:
+            self._notify([rows[key]], [])
+        else:
+            self._notify([], [key])
+
+    def _fetch(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        with _pg_pooled() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                f"SELECT {_ASSET_COLUMNS} FROM asset_configs WHERE lower(asset_name) = ANY(%s)",
+                (keys,),
+            )
+            return {r["name"].lower(): dict(r) for r in cur.fetchall()}
+
+    # --- 조회 ---
+    def get(self, asset_name: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([asset_name]).get(asset_name.lower())
+
+    def get_many(self, asset_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 자산을 한 번에 조회. 반환 키는 소문자 자산명."""
+        self._maybe_refresh()
+        keys = list(dict.fromkeys(n.lower() for n in asset_names if n))
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        with self._lock:
+            for k in keys:
+                if k in self._assets:
+                    found[k] = self._assets[k]
+                elif k not in self._misses:
+                    missing.append(k)
+        if missing:
+            rows = self._fetch(missing)
+            with self._lock:
+                self._assets.update(rows)
+                self._misses.update(k for k in missing if k not in rows)
+            found.update(rows)
+        return found
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return [a["name"] for a in self._assets.values()]
+
+    def assets(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._assets.values())
+
+    # --- 변경 구독 ---
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]], List[str]], None]):
+        self._listeners.append(callback)
+
+    def _notify(self, changed: List[Dict[str, Any]], removed: List[str]):
+        for cb in list(self._listeners):
+            try:
+                cb(changed, removed)
+            except Exception as e:
+                logger.warning("AssetCatalog listener 오류 (%s)", e)
+
+    # --- 백그라운드 스레드 ---
+    def start(self):
+        """주기적 재적재 + LISTEN 스레드 시작 (데몬)."""
+        if self._threads:
+            return
+        for target, name in ((self._refresh_loop, "asset-catalog-refresh"),
+                             (self._listen_loop, "asset-catalog-listen")):
+            t = threading.Thread(target=target, name=name, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+
+    def _listen_loop(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = _pg_conn()
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.invalidate(conn.notifies.pop(0).payload)
+            except Exception as e:
+                logger.warning("AssetCatalog LISTEN 실패, 재시도 예정 (%s)", e)
+                self._stop.wait(self.refresh_interval)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def install_notify_trigger(self):
+        """asset_configs 변경 시 NOTIFY 를 보내는 트리거 설치 (관리자용 1회 실행)."""
+        with _pg_pooled() as conn, conn.cursor() as cur:
+            cur.execute(ASSET_NOTIFY_TRIGGER_SQL, (self.channel,))
+
+
+_asset_catalog: Optional[AssetCatalog] = None
+_asset_catalog_lock = threading.Lock()
+
+
+def get_asset_catalog() -> AssetCatalog:
+    """프로세스 공용 AssetCatalog (첫 사용 시 백그라운드 스레드 시작)."""
+    global _asset_catalog
+    if _asset_catalog is None:
+        with _asset_catalog_lock:
+            if _asset_catalog is None:
+                catalog = AssetCatalog()
+                catalog.start()
+                _asset_catalog = catalog
+    return _asset_catalog
+
+
+_DEMO_ASSETS = {
+    "a812dpt": {"name": "a812dpt", "ip": "10.1.2.3", "type": "server", "location": "IDC-1 Rack-12", "os": "Linux"},
+    "db-master": {"name": "db-master", "ip": "10.2.0.10", "type": "db", "location": "IDC-1-Rack-05", "os": "Linux"},
+}
+
+
 class ConfigDataSource:
-    """구성정보 (Postgres) 조회. 실패 시 데모 반환."""
+    """구성정보 (Postgres) 조회. AssetCatalog 메모리 맵 우선, 실패 시 데모 반환."""
+
+    def __init__(self, catalog: Optional[AssetCatalog] = None):
+        self._catalog = catalog
+
+    @property
+    def catalog(self) -> AssetCatalog:
+        if self._catalog is None:
+            self._catalog = get_asset_catalog()
+        return self._catalog
 
     def get_asset_config(self, asset_name: str):
-        demo = {
-            "a812dpt": {"name": "a812dpt", "ip": "10.1.2.3", "type": "server", "location": "IDC-1 Rack-12", "os": "Linux"},
-            "db-master": {"name": "db-master", "ip": "10.2.0.10", "type": "db", "location": "IDC-1-Rack-05", "os": "Linux"},
-        }
+        return self.get_asset_configs([asset_name]).get(asset_name.lower())
+
+    def get_asset_configs(self, asset_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 자산 구성을 한 번에 조회. 반환 키는 소문자 자산명."""
+        asset_names = [n for n in asset_names if n]
         try:
-            with _pg_conn() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT asset_name AS name, ip, type, location, os
-                    FROM asset_configs
-                    WHERE lower(asset_name) = lower(%s)
-                    LIMIT 1
-                    """,
-                    (asset_name,),
-                )
-                row = cur.fetchone()
-                if row:
-                    return dict(row)
+            found = self.catalog.get_many(asset_names)
         except Exception as e:
             logger.warning("ConfigDataSource fallback 사용 (%s)", e)
-        return demo.get(asset_name.lower())
+            found = {}
+        for name in asset_names:
+            key = name.lower()
+            if key not in found and key in _DEMO_ASSETS:
+                found[key] = _DEMO_ASSETS[key]
+        return found
 
 
 class MetricDataSource:
-    """메트릭(Timescale/Postgres) 조회. 실패 시 데모 반환."""
+    """메트릭(Timescale/Postgres) 조회. 실패 시 데모 반환.
+
+    (asset, metric, period) 단위로 짧은 TTL 캐시 (프리페치 결과를 실제 질의에서 재사용).
+    """
+
+    def __init__(self, cache_ttl: Optional[float] = None):
+        ttl = cache_ttl if cache_ttl is not None else _load_settings().get("metric", {}).get("cache_ttl", 30)
+        self._cache = _TTLCache(ttl=float(ttl))
 
     def get_metric_timeseries(self, asset_name: str, metric: str, period: str = "1h"):
+        key = (asset_name, metric, period)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
         try:
             with _pg_conn() as conn, conn.cursor() as cur:
                 cur.execute(
@@ -184,7 +665,10 @@ class MetricDataSource:
                 if rows:
                     times = [r[0].strftime("%H:%M") for r in rows]
                     values = [r[1] for r in rows]
-                    return {"asset": asset_name, "metric": metric, "period": period, "times": times, "values": values}
+                    result = {"asset": asset_name, "metric": metric, "period": period, "times": times, "values": values,
+                              "timestamps": [int(r[0].timestamp() * 1000) for r in rows]}
+                    self._cache.set(key, result)
+                    return result
         except Exception as e:
             logger.warning("MetricDataSource fallback 사용 (%s)", e)
 
@@ -193,39 +677,304 @@ class MetricDataSource:
         return {"asset": asset_name, "metric": metric, "period": period, "times": times, "values": values}
 
 
-class GraphDataSource:
-    """연결성(Neo4j) 조회. 실패 시 데모 반환."""
+EVENTS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS events (
+    id bigserial PRIMARY KEY,
+    ts timestamptz NOT NULL DEFAULT now(),
+    asset_name text NOT NULL,
+    event text NOT NULL,
+    severity text NOT NULL,
+    message text
+);
+CREATE INDEX IF NOT EXISTS events_ts_id ON events (ts DESC, id DESC);
+CREATE INDEX IF NOT EXISTS events_asset_ts_id ON events (asset_name, ts DESC, id DESC);
+CREATE INDEX IF NOT EXISTS events_severity_ts_id ON events (severity, ts DESC, id DESC);
+"""
+
+EventCursor = Tuple[str, int]
+
+
+class EventDataSource:
+    """장애/이벤트(events 테이블) 조회. 실패 시 데모 반환.
+
+    - 서버측 필터(자산, 심각도, 시간 창, 문구) + (ts, id) keyset 페이지네이션
+      OFFSET 없이 커서 다음/이전 page_size 건만 읽으므로 수십만 건에서도 페이지 비용이 일정
+    - 정렬은 최신순(ts DESC, id DESC), 커서는 (ts ISO 문자열, id)
+    """
 
-    def get_topology_for_asset(self, asset_name: str):
+    SEVERITIES = ("CRITICAL", "WARNING", "INFO", "NORMAL")
+
+    @staticmethod
+    def ensure_schema():
+        with _pg_pooled() as conn, conn.cursor() as cur:
+            cur.execute(EVENTS_SCHEMA_SQL)
+
+    @staticmethod
+    def _where(asset: Optional[str], severities: Optional[Iterable[str]], window_hours: Optional[float],
+               search: Optional[str]) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        if asset:
+            clauses.append("asset_name = %s")
+            params.append(asset)
+        if severities:
+            clauses.append("severity = ANY(%s)")
+            params.append(list(severities))
+        if window_hours:
+            clauses.append("ts >= now() - %s * interval '1 hour'")
+            params.append(float(window_hours))
+        if search:
+            clauses.append("(event ILIKE %s OR message ILIKE %s)")
+            params.extend([f"%{search}%", f"%{search}%"])
+        return clauses, params
+
+    def get_events(self, asset: Optional[str] = None, severities: Optional[Iterable[str]] = None,
+                   window_hours: Optional[float] = None, search: Optional[str] = None,
+                   page_size: int = 50, cursor: Optional[EventCursor] = None,
+                   direction: str = "next") -> Dict[str, Any]:
+        """한 페이지 조회. direction="next" 는 cursor 보다 오래된 쪽, "prev" 는 최신 쪽.
+
+        반환: {"rows": [...], "next": 커서|None, "prev": 커서|None}
+        """
         try:
-            driver = _get_neo4j_driver()
-            with driver.session() as session:
-                records = session.run(
-                    """
-                    MATCH p=(n {name:$asset})-[r*1..2]-(m)
-                    RETURN nodes(p) AS ns, relationships(p) AS rs
-                    LIMIT 5
-                    """,
-                    {"asset": asset_name},
+            clauses, params = self._where(asset, severities, window_hours, search)
+            newer = direction == "prev"
+            if cursor is not None:
+                clauses.append("(ts, id) > (%s::timestamptz, %s)" if newer else "(ts, id) < (%s::timestamptz, %s)")
+                params.extend(cursor)
+            where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+            order = "ts ASC, id ASC" if newer else "ts DESC, id DESC"
+            with _pg_pooled() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    f"SELECT id, ts, asset_name, event, severity, message FROM events {where} "
+                    f"ORDER BY {order} LIMIT %s",
+                    (*params, page_size + 1),
                 )
-                nodes = {}
-                edges = set()
-                for rec in records:
-                    for n in rec["ns"]:
-                        name = n.get("name") or n.id
-                        nodes[name] = {
-                            "id": name,
-                            "label": n.get("label", name),
-                            "icon": "f233",
-                            "color": "#3498db",
-                        }
-                    for rel in rec["rs"]:
-                        edges.add((rel.start_node.get("name", rel.start_node.id), rel.end_node.get("name", rel.end_node.id)))
-                if nodes:
-                    return {"nodes": list(nodes.values()), "edges": list(edges)}
+                rows = cur.fetchall()
+            more = len(rows) > page_size
+            rows = rows[:page_size]
+            if newer:
+                rows.reverse()
+            page = [self._to_row(r) for r in rows]
+            return self._page(page, has_older=more if not newer else cursor is not None,
+                              has_newer=cursor is not None if not newer else more)
+        except Exception as e:
+            logger.warning("EventDataSource fallback 사용 (%s)", e)
+        return self._demo_page(asset, severities, search, page_size, cursor, direction)
+
+    @staticmethod
+    def _to_row(r) -> Dict[str, Any]:
+        ts = r["ts"]
+        return {
+            "id": r["id"],
+            "ts": ts.isoformat() if hasattr(ts, "isoformat") else str(ts),
+            "device": r["asset_name"],
+            "event": r["event"],
+            "severity": r["severity"],
+            "message": r.get("message") or "",
+        }
+
+    @staticmethod
+    def _page(rows: List[Dict[str, Any]], has_older: bool, has_newer: bool) -> Dict[str, Any]:
+        return {
+            "rows": rows,
+            "next": (rows[-1]["ts"], rows[-1]["id"]) if rows and has_older else None,
+            "prev": (rows[0]["ts"], rows[0]["id"]) if rows and has_newer else None,
+        }
+
+    def _demo_page(self, asset, severities, search, page_size, cursor, direction) -> Dict[str, Any]:
+        rows = self._demo_events()
+        if asset:
+            rows = [r for r in rows if r["device"].lower() == asset.lower()]
+        if severities:
+            wanted = set(severities)
+            rows = [r for r in rows if r["severity"] in wanted]
+        if search:
+            rows = [r for r in rows if search.lower() in (r["event"] + r["message"]).lower()]
+        key = (lambda r: (r["ts"], r["id"]))
+        if cursor is None:
+            older, newer = rows, []
+        else:
+            older = [r for r in rows if key(r) < tuple(cursor)]
+            newer = [r for r in rows if key(r) > tuple(cursor)]
+        if direction == "prev" and cursor is not None:
+            page = newer[-page_size:]
+            return self._page(page, has_older=True, has_newer=len(newer) > page_size)
+        page = older[:page_size]
+        return self._page(page, has_older=len(older) > page_size, has_newer=cursor is not None)
+
+    @staticmethod
+    def _demo_events() -> List[Dict[str, Any]]:
+        today = time.strftime("%Y-%m-%d")
+        return [
+            {"id": 3, "ts": f"{today}T13:05:00", "device": "DB-Master", "event": "CPU 40%", "severity": "NORMAL", "message": ""},
+            {"id": 2, "ts": f"{today}T13:01:00", "device": "WAS-01", "event": "High Latency", "severity": "WARNING", "message": "Latency 2s"},
+            {"id": 1, "ts": f"{today}T13:00:00", "device": "SW-Core-01", "event": "Link Flapping", "severity": "CRITICAL", "message": "Link Down"},
+        ]
+
+
+_LABEL_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class GraphDataSource:
+    """연결성(Neo4j) 조회. 실패 시 데모 반환.
+
+    - 라벨 + name 인덱스로 시작 노드를 찾고, 깊이/팬아웃/노드 수를 제한해 확장
+    - 레벨별 frontier 확장을 한 번의 집계 쿼리로 수행해 중복 없는 서브그래프 반환
+    - (asset, depth) 단위로 TTL 캐시
+    """
+
+    _index_ready = False
+    _index_lock = threading.Lock()
+
+    def __init__(self, node_label: Optional[str] = None, max_depth: Optional[int] = None,
+                 max_fanout: Optional[int] = None, max_nodes: Optional[int] = None,
+                 cache_ttl: Optional[float] = None):
+        graph_cfg = _load_settings().get("graph", {})
+        label = node_label or graph_cfg.get("node_label", "Asset")
+        if not _LABEL_RE.match(label):
+            raise ValueError(f"잘못된 Neo4j 라벨: {label!r}")
+        self.node_label = label
+        self.max_depth = int(max_depth or graph_cfg.get("max_depth", 2))
+        self.max_fanout = int(max_fanout or graph_cfg.get("max_fanout", 25))
+        self.max_nodes = int(max_nodes or graph_cfg.get("max_nodes", 200))
+        ttl = cache_ttl if cache_ttl is not None else graph_cfg.get("cache_ttl", 60)
+        self._cache = _TTLCache(ttl=float(ttl))
+
+    def _index_query(self) -> str:
+        return f"CREATE INDEX {self.node_label.lower()}_name IF NOT EXISTS FOR (n:{self.node_label}) ON (n.name)"
+
+    def _ensure_index(self, client: GraphClient):
+        cls = type(self)
+        if cls._index_ready:
+            return
+        with cls._index_lock:
+            if cls._index_ready:
+                return
+            try:
+                client.write(self._index_query(), name="topology_index")
+            except Exception as e:
+                logger.warning("Neo4j 인덱스 생성 실패 (%s)", e)
+            cls._index_ready = True
+
+    async def _ensure_index_async(self, client: GraphClient):
+        # IF NOT EXISTS 라 동시에 두 번 실행돼도 무해 -> 이벤트 루프를 막는 스레드 락은 쓰지 않음
+        cls = type(self)
+        if cls._index_ready:
+            return
+        try:
+            await client.write_async(self._index_query(), name="topology_index")
+        except Exception as e:
+            logger.warning("Neo4j 인덱스 생성 실패 (%s)", e)
+        cls._index_ready = True
+
+    def _subgraph_query(self, depth: int) -> str:
+        """depth 만큼 frontier를 확장하는 Cypher를 생성 (노드당 최대 $fanout 관계)."""
+        parts = [
+            f"MATCH (root:{self.node_label} {{name: $asset}})",
+            "WITH root, [root] AS seen, [root] AS frontier, [] AS rels",
+        ]
+        for _ in range(depth):
+            parts.append(
+                """CALL {
+  WITH frontier
+  UNWIND frontier AS f
+  CALL {
+    WITH f
+    MATCH (f)-[r]-(m)
+    RETURN r, m LIMIT $fanout
+  }
+  RETURN collect(r) AS lvl_rels, collect(DISTINCT m) AS lvl_nodes
+}
+WITH root, rels + lvl_rels AS rels,
+     seen + [x IN lvl_nodes WHERE NOT x IN seen][..$max_nodes] AS seen,
+     [x IN lvl_nodes WHERE NOT x IN seen][..$max_nodes] AS frontier"""
+            )
+        parts.append("RETURN seen[..$max_nodes] AS ns, rels AS rs")
+        return "\n".join(parts)
+
+    @staticmethod
+    def _node_key(node):
+        return node.get("name") or getattr(node, "element_id", None) or node.id
+
+    def invalidate(self, asset_name: Optional[str] = None):
+        """토폴로지 변경 시 캐시 무효화 (asset 미지정 시 전체)."""
+        if asset_name is None:
+            self._cache.invalidate()
+        else:
+            self._cache.invalidate(lambda k: k[0] == asset_name)
+
+    def list_node_names(self) -> List[str]:
+        """라벨이 붙은 모든 노드 이름 (자산명 인식 사전 구축용)."""
+        records = get_graph_client().read(
+            f"MATCH (n:{self.node_label}) WHERE n.name IS NOT NULL RETURN n.name AS name",
+            name="node_names",
+        )
+        return [r["name"] for r in records]
+
+    def _query_params(self, asset_name: str, depth: Optional[int]):
+        depth = max(1, min(int(depth or self.max_depth), self.max_depth))
+        params = {"asset": asset_name, "fanout": self.max_fanout, "max_nodes": self.max_nodes}
+        # Cypher {name: $asset} 일치는 대소문자를 구분하므로 캐시 키도 이름 그대로 사용
+        return (asset_name, depth), self._subgraph_query(depth), params
+
+    def _to_topology(self, records) -> Optional[Dict[str, Any]]:
+        record = records[0] if records else None
+        if not record or not record["ns"]:
+            return None
+        nodes = {}
+        for n in record["ns"]:
+            name = self._node_key(n)
+            nodes[name] = {
+                "id": name,
+                "label": n.get("label", name),
+                "icon": "f233",
+                "color": "#3498db",
+            }
+        edges = set()
+        for rel in record["rs"]:
+            src, dst = self._node_key(rel.start_node), self._node_key(rel.end_node)
+            # max_nodes 로 잘린 노드에 걸린 관계는 제외
+            if src in nodes and dst in nodes:
+                edges.add((src, dst))
+        return {"nodes": list(nodes.values()), "edges": sorted(edges)}
+
+    def get_topology_for_asset(self, asset_name: str, depth: Optional[int] = None):
+        cache_key, query, params = self._query_params(asset_name, depth)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            client = get_graph_client()
+            self._ensure_index(client)
+            topology = self._to_topology(client.read(query, params, name="topology"))
+            if topology:
+                self._cache.set(cache_key, topology)
+                return topology
+        except Exception as e:
+            logger.warning("GraphDataSource fallback 사용 (%s)", e)
+        return self._demo_topology()
+
+    async def get_topology_for_asset_async(self, asset_name: str, depth: Optional[int] = None):
+        """비동기 오케스트레이터용: 비동기 드라이버로 같은 쿼리를 실행."""
+        cache_key, query, params = self._query_params(asset_name, depth)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            client = get_graph_client()
+            await self._ensure_index_async(client)
+            topology = self._to_topology(await client.read_async(query, params, name="topology"))
+            if topology:
+                self._cache.set(cache_key, topology)
+                return topology
         except Exception as e:
             logger.warning("GraphDataSource fallback 사용 (%s)", e)
+        return self._demo_topology()
 
+    @staticmethod
+    def _demo_topology():
         nodes = [
             {"id": "FW-01", "label": "Firewall", "icon": "f132", "color": "#e74c3c"},
             {"id": "SW-Core-01", "label": "Switch A", "icon": "f233", "color": "#3498db"},
@@ -245,12 +994,47 @@ class GraphDataSource:
 
 
 class ManualVectorSource:
-    """매뉴얼(pgvector) 검색. 실패 시 데모 반환."""
+    """매뉴얼(pgvector) 검색. 임베딩을 못 만들면 어휘 검색, 그것도 실패하면 데모 반환."""
+
+    @staticmethod
+    def _to_hits(rows) -> List[Dict[str, Any]]:
+        return [
+            {
+                "title": r.get("title", "문서"),
+                "snippet": (r.get("content") or "")[:200],
+                "link": (r.get("converted_pdf") or r.get("source_path") or ""),
+                "page": r.get("page_num"),
+                "score": r.get("score"),
+            }
+            for r in rows
+        ]
+
+    def _lexical_search(self, question: str, top_k: int) -> List[Dict[str, Any]]:
+        """임베딩 서비스 장애 시 쓰는 ILIKE 기반 검색 (일치 용어 수 순)."""
+        terms = [t for t in re.findall(r"\w+", question.lower()) if len(t) > 1][:8]
+        if not terms:
+            return []
+        patterns = [f"%{t}%" for t in terms]
+        score_sql = " + ".join(["(dc.content ILIKE %s)::int"] * len(patterns))
+        with _pg_conn() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                f"""
+                SELECT d.title, d.converted_pdf, dc.page_num, dc.content, dc.source_path,
+                       ({score_sql})::float / %s AS score
+                FROM doc_chunks dc
+                JOIN documents d ON d.id = dc.document_id
+                WHERE dc.content ILIKE ANY(%s)
+                ORDER BY score DESC
+                LIMIT %s
+                """,
+                (*patterns, len(patterns), patterns, top_k),
+            )
+            return self._to_hits(cur.fetchall())
 
     def search_manuals(self, question: str, top_k: int = 3):
         embedding = _compute_embedding(question)
-        if embedding:
-            try:
+        try:
+            if embedding:
                 with _pg_conn() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
                     cur.execute(
                         """
@@ -268,25 +1052,15 @@ class ManualVectorSource:
                         """,
                         (embedding, embedding, top_k),
                     )
-                    rows = cur.fetchall()
-                    results = []
-                    for r in rows:
-                        results.append(
-                            {
-                                "title": r.get("title", "문서"),
-                                "snippet": (r.get("content") or "")[:200],
-                                "link": (r.get("converted_pdf") or r.get("source_path") or ""),
-                                "page": r.get("page_num"),
-                                "score": r.get("score"),
-                            }
-                        )
-                    logger.info("ManualVectorSource hit %d rows for query '%s'", len(results), question[:80])
-                    if results:
-                        return results
-            except Exception as e:
-                logger.warning("ManualVectorSource fallback 사용 (%s)", e)
-        else:
-            logger.error("ManualVectorSource embedding unavailable for query '%s'", question[:80])
+                    results = self._to_hits(cur.fetchall())
+                logger.info("ManualVectorSource hit %d rows for query '%s'", len(results), question[:80])
+            else:
+                logger.warning("ManualVectorSource embedding unavailable, 어휘 검색 사용 '%s'", question[:80])
+                results = self._lexical_search(question, top_k)
+            if results:
+                return results
+        except Exception as e:
+            logger.warning("ManualVectorSource fallback 사용 (%s)", e)
 
         return [
             {
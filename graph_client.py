@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import neo4j
+    from neo4j import AsyncGraphDatabase, GraphDatabase
+except Exception:
+    neo4j = None
+    AsyncGraphDatabase = GraphDatabase = None
+
+logger = logging.getLogger(__name__)
+
+
+class QueryMetrics:
+    """쿼리 이름별 호출 수/누적·최대 지연(ms)/오류 수를 집계."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ms: float, ok: bool = True):
+        with self._lock:
+            st = self._stats.setdefault(name, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+            st["count"] += 1
+            st["total_ms"] += elapsed_ms
+            st["max_ms"] = max(st["max_ms"], elapsed_ms)
+            st["last_ms"] = elapsed_ms
+            if not ok:
+                st["errors"] += 1
+
+    @contextmanager
+    def timed(self, name: str):
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.record(name, elapsed_ms, ok)
+            logger.debug("graph query %s %.1fms ok=%s", name, elapsed_ms, ok)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            out = {}
+            for name, st in self._stats.items():
+                row = dict(st)
+                row["avg_ms"] = st["total_ms"] / st["count"] if st["count"] else 0.0
+                out[name] = row
+            return out
+
+
+class GraphClient:
+    """Neo4j 드라이버를 한 번만 만들어 공유하는 관리형 클라이언트.
+
+    - 동기/비동기 드라이버 모두 락으로 보호된 지연 초기화
+    - 커넥션 풀 크기, fetch size, 쿼리 타임아웃 설정
+    - read()는 READ 모드 세션으로 실행되어 neo4j:// 클러스터에서 read replica로 라우팅
+    - 쿼리 이름별 실행 시간 집계(metrics)
+    - driver/async_driver 를 주입하면 로컬 대체 드라이버로 테스트 가능
+    """
+
+    def __init__(self, cfg: Dict[str, Any], driver=None, async_driver=None):
+        self.cfg = dict(cfg)
+        self.fetch_size = int(self.cfg.get("fetch_size", 1000))
+        self.query_timeout = self.cfg.get("query_timeout")
+        self.database = self.cfg.get("database") or None
+        self.metrics = QueryMetrics()
+        self._driver = driver
+        self._async_driver = async_driver
+        self._lock = threading.Lock()
+
+    def _driver_kwargs(self) -> Dict[str, Any]:
+        return {
+            "auth": (self.cfg["user"], self.cfg["password"]),
+            "connection_timeout": self.cfg.get("connection_timeout", 5),
+            "max_connection_pool_size": int(self.cfg.get("max_connection_pool_size", 50)),
+            "connection_acquisition_timeout": self.cfg.get("connection_acquisition_timeout", 10),
+        }
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            with self._lock:
+                if self._driver is None:
+                    if GraphDatabase is None:
+                        raise RuntimeError("neo4j 드라이버가 설치되어 있지 않습니다.")
+                    self._driver = GraphDatabase.driver(self.cfg["uri"], **self._driver_kwargs())
+        return self._driver
+
+    @property
+    def async_driver(self):
+        if self._async_driver is None:
+            with self._lock:
+                if self._async_driver is None:
+                    if AsyncGraphDatabase is None:
+                        raise RuntimeError("neo4j 드라이버가 설치되어 있지 않습니다.")
+                    self._async_driver = AsyncGraphDatabase.driver(self.cfg["uri"], **self._driver_kwargs())
+        return self._async_driver
+
+    def _session_kwargs(self, read: bool) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"fetch_size": self.fetch_size}
+        if self.database:
+            kwargs["database"] = self.database
+        if neo4j is not None:
+            kwargs["default_access_mode"] = neo4j.READ_ACCESS if read else neo4j.WRITE_ACCESS
+        return kwargs
+
+    def _with_timeout(self, work):
+        """트랜잭션 함수에 쿼리 타임아웃 지정 (neo4j.Query 객체는 session.run 에서만 허용됨)."""
+        if neo4j is not None and self.query_timeout:
+            return neo4j.unit_of_work(timeout=float(self.query_timeout))(work)
+        return work
+
+    def _run(self, text: str, params: Optional[Dict[str, Any]], name: str, read: bool) -> List[Any]:
+        @self._with_timeout
+        def work(tx):
+            return list(tx.run(text, params or {}))
+
+        with self.metrics.timed(name):
+            with self.driver.session(**self._session_kwargs(read)) as session:
+                if read:
+                    return session.execute_read(work)
+                return session.execute_write(work)
+
+    def read(self, text: str, params: Optional[Dict[str, Any]] = None, name: str = "read") -> List[Any]:
+        return self._run(text, params, name, read=True)
+
+    def write(self, text: str, params: Optional[Dict[str, Any]] = None, name: str = "write") -> List[Any]:
+        return self._run(text, params, name, read=False)
+
+    async def _run_async(self, text: str, params: Optional[Dict[str, Any]], name: str, read: bool) -> List[Any]:
+        @self._with_timeout
+        async def work(tx):
+            result = await tx.run(text, params or {})
+            return [rec async for rec in result]
+
+        with self.metrics.timed(name):
+            async with self.async_driver.session(**self._session_kwargs(read)) as session:
+                if read:
+                    return await session.execute_read(work)
+                return await session.execute_write(work)
+
+    async def read_async(self, text: str, params: Optional[Dict[str, Any]] = None, name: str = "read") -> List[Any]:
+        return await self._run_async(text, params, name, read=True)
+
+    async def write_async(self, text: str, params: Optional[Dict[str, Any]] = None, name: str = "write") -> List[Any]:
+        return await self._run_async(text, params, name, read=False)
+
+    def _take_drivers(self):
+        with self._lock:
+            drivers = (self._driver, self._async_driver)
+            self._driver = self._async_driver = None
+        return drivers
+
+    def close(self):
+        """동기/비동기 드라이버 모두 닫음. 이벤트 루프 안에서 호출되면 비동기 드라이버는 태스크로 닫는다."""
+        driver, async_driver = self._take_drivers()
+        if driver is not None:
+            driver.close()
+        if async_driver is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            try:
+                if loop is not None:
+                    loop.create_task(async_driver.close())
+                else:
+                    asyncio.run(async_driver.close())
+            except Exception as e:
+                logger.warning("Neo4j 비동기 드라이버 종료 실패 (%s)", e)
+
+    async def aclose(self):
+        driver, async_driver = self._take_drivers()
+        if driver is not None:
+            driver.close()
+        if async_driver is not None:
+            await async_driver.close()
+
+
+class _LocalTx:
+    def __init__(self, handler):
+        self._handler = handler
+
+    def run(self, query, params=None):
+        # 실제 드라이버와 같이 트랜잭션 안에서는 문자열 쿼리만 허용
+        if not isinstance(query, str):
+            raise ValueError("Query object is only supported for session.run")
+        return iter(self._handler(query, params or {}))
+
+
+class _LocalSession(_LocalTx):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_read(self, work):
+        return work(self)
+
+    def execute_write(self, work):
+        return work(self)
+
+
+class LocalGraphDriver:
+    """테스트/오프라인용 대체 드라이버.
+
+    handler(query_text, params) 가 레코드(dict) 목록을 반환하면 실제 Neo4j 없이
+    GraphClient 전체 경로(세션, read/write, 메트릭)를 그대로 실행할 수 있습니다.
+    """
+
+    def __init__(self, handler: Optional[Callable[[str, Dict[str, Any]], List[Dict[str, Any]]]] = None):
+        self.handler = handler or (lambda query, params: [])
+        self.queries: List[tuple] = []
+
+    def _record(self, query, params):
+        self.queries.append((query, params))
+        return self.handler(query, params)
+
+    def session(self, **kwargs):
+        return _LocalSession(self._record)
+
+    def close(self):
+        pass
+
+
+class _LocalAsyncResult:
+    def __init__(self, records):
+        self._it = iter(records)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _LocalAsyncSession:
+    def __init__(self, handler):
+        self._handler = handler
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, params=None):
+        if not isinstance(query, str):
+            raise ValueError("Query object is only supported for session.run")
+        return _LocalAsyncResult(self._handler(query, params or {}))
+
+    async def execute_read(self, work):
+        return await work(self)
+
+    async def execute_write(self, work):
+        return await work(self)
+
+
+class LocalAsyncGraphDriver(LocalGraphDriver):
+    """LocalGraphDriver 의 비동기 버전 (GraphClient.read_async 테스트용)."""
+
+    def session(self, **kwargs):
+        return _LocalAsyncSession(self._record)
+
+    async def close(self):
+        pass
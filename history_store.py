@@ -0,0 +1,301 @@
+import json
+import logging
+import math
+import os
+import heapq
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, SystemMessage, messages_from_dict, message_to_dict
+
+from data_sources import _compute_embedding, _load_settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS qa (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT,
+    ts REAL NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    embedding BLOB
+);
+CREATE INDEX IF NOT EXISTS qa_session_ts ON qa (session_id, ts);
+CREATE INDEX IF NOT EXISTS qa_ts ON qa (ts);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session_id ON messages (session_id, id);
+CREATE INDEX IF NOT EXISTS messages_ts ON messages (ts);
+CREATE TABLE IF NOT EXISTS summaries (
+    session_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    upto_id INTEGER NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS qa_fts USING fts5(
+    question, answer, content='qa', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS qa_ai AFTER INSERT ON qa BEGIN
+    INSERT INTO qa_fts(rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS qa_ad AFTER DELETE ON qa BEGIN
+    INSERT INTO qa_fts(qa_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+END;
+"""
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _format_hit(question: str, answer: str) -> str:
+    return f"Q: {question}\nA: {answer}"
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a))
+    nb = math.sqrt(sum(y * y for y in b))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+class SQLiteHistoryStore:
+    """Q/A 이력과 세션 대화 메시지를 SQLite 에 영구 저장.
+
+    - FTS5 전문 검색(bm25 순), FTS5 미지원 빌드에서는 LIKE 검색으로 대체
+    - embed_fn 을 주면 임베딩을 함께 저장하고, 최근 embedding_scan_limit 건을 선형으로 훑는
+      코사인 유사도 결과를 병합 (ANN 인덱스 아님: 비용은 질의당 O(embedding_scan_limit × dim))
+    - retention_days / max_rows 보존 정책(Q/A, 세션 메시지 각각 max_rows 행)을 purge_every 건마다 적용
+    - 메모리에는 아무것도 쌓지 않고, 세션 히스토리는 최근 working_set 건만 읽어 옴
+    """
+
+    def __init__(self, path: Optional[str] = None, retention_days: Optional[float] = None,
+                 max_rows: Optional[int] = None, working_set: Optional[int] = None,
+                 embed_fn: Optional[Callable[[str], Optional[List[float]]]] = None,
+                 embedding_scan_limit: int = 2000, purge_every: int = 200):
+        cfg = _load_settings().get("history", {})
+        self.path = path or cfg.get("path", os.path.join("data", "history.db"))
+        self.retention_days = float(retention_days if retention_days is not None else cfg.get("retention_days", 90))
+        self.max_rows = int(max_rows if max_rows is not None else cfg.get("max_rows", 100000))
+        self.working_set = int(working_set if working_set is not None else cfg.get("working_set", 40))
+        self.embed_fn = embed_fn
+        self.embedding_scan_limit = embedding_scan_limit
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite FTS5 미지원, LIKE 검색 사용 (%s)", e)
+            self.fts = False
+        self._conn.commit()
+
+    # --- Q/A 이력 ---
+    def add_qa(self, question: str, answer: str, session_id: Optional[str] = None):
+        embedding = None
+        if self.embed_fn:
+            try:
+                vec = self.embed_fn(f"{question}\n{answer}")
+                embedding = array("f", vec).tobytes() if vec else None
+            except Exception as e:
+                logger.warning("history 임베딩 실패 (%s)", e)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO qa (session_id, ts, question, answer, embedding) VALUES (?, ?, ?, ?, ?)",
+                (session_id, time.time(), question, answer, embedding),
+            )
+            self._conn.commit()
+        self._after_write()
+
+    def _fts_query(self, query: str) -> str:
+        terms = [t for t in _TERM_RE.findall(query.lower()) if len(t) > 1]
+        return " OR ".join(f'"{t}"' for t in terms)
+
+    def search_history(self, query: str, session_id: Optional[str] = None, limit: int = 3) -> List[str]:
+        """전체(또는 session_id 한정) 이력 검색. 'Q: ...\\nA: ...' 문자열 목록 반환."""
+        scope = " AND qa.session_id = ?" if session_id else ""
+        scope_args = (session_id,) if session_id else ()
+        hits: List[tuple] = []
+        with self._lock:
+            match = self._fts_query(query) if self.fts else ""
+            if match:
+                hits = self._conn.execute(
+                    "SELECT qa.id, qa.question, qa.answer FROM qa_fts JOIN qa ON qa.id = qa_fts.rowid "
+                    f"WHERE qa_fts MATCH ?{scope} ORDER BY bm25(qa_fts) LIMIT ?",
+                    (match, *scope_args, limit),
+                ).fetchall()
+            elif not self.fts:
+                hits = self._conn.execute(
+                    f"SELECT qa.id, qa.question, qa.answer FROM qa WHERE "
+                    f"(lower(question) LIKE ? OR lower(answer) LIKE ?){scope} ORDER BY ts DESC LIMIT ?",
+                    (f"%{query.lower()}%", f"%{query.lower()}%", *scope_args, limit),
+                ).fetchall()
+        if self.embed_fn and len(hits) < limit:
+            seen = {h[0] for h in hits}
+            hits.extend(h for h in self._semantic_search(query, scope, scope_args, limit) if h[0] not in seen)
+        return [_format_hit(q, a) for _, q, a in hits[:limit]]
+
+    def _semantic_search(self, query: str, scope: str, scope_args: tuple, limit: int) -> List[tuple]:
+        """최근 embedding_scan_limit 건을 순서대로 비교하는 제한된 선형 탐색."""
+        try:
+            qvec = self.embed_fn(query)
+        except Exception as e:
+            logger.warning("history 질의 임베딩 실패 (%s)", e)
+            return []
+        if not qvec:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT qa.id, qa.question, qa.answer, qa.embedding FROM qa "
+                f"WHERE qa.embedding IS NOT NULL{scope} ORDER BY qa.ts DESC LIMIT ?",
+                (*scope_args, self.embedding_scan_limit),
+            ).fetchall()
+        scored = []
+        for rid, q, a, blob in rows:
+            vec = array("f")
+            vec.frombytes(blob)
+            scored.append((_cosine(qvec, vec), rid, q, a))
+        return [(rid, q, a) for _, rid, q, a in heapq.nlargest(limit, scored)]
+
+    # --- 세션 메시지 ---
+    def load_messages(self, session_id: str, limit: Optional[int] = None,
+                      after_id: int = 0) -> List[BaseMessage]:
+        return [m for _, m in self.load_messages_with_ids(session_id, limit, after_id)]
+
+    def load_messages_with_ids(self, session_id: str, limit: Optional[int] = None,
+                               after_id: int = 0) -> List[Tuple[int, BaseMessage]]:
+        """after_id 이후 메시지 중 최근 limit 건을 (id, message) 로 반환 (오래된 순)."""
+        limit = limit or self.working_set
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM (SELECT id, payload FROM messages WHERE session_id = ? AND id > ? "
+                "ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (session_id, after_id, limit),
+            ).fetchall()
+        messages = messages_from_dict([json.loads(r[1]) for r in rows])
+        return [(r[0], m) for r, m in zip(rows, messages)]
+
+    def count_messages(self, session_id: str, after_id: int = 0) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE session_id = ? AND id > ?", (session_id, after_id)
+            ).fetchone()[0]
+
+    def append_messages(self, session_id: str, messages: Sequence[BaseMessage]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, ts, payload) VALUES (?, ?, ?)",
+                [(session_id, now, json.dumps(message_to_dict(m), ensure_ascii=False)) for m in messages],
+            )
+            self._conn.commit()
+        self._after_write()
+
+    def clear_session(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM summaries WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    # --- 세션 요약 ---
+    def get_summary(self, session_id: str) -> Tuple[str, int]:
+        """(요약문, 요약에 반영된 마지막 메시지 id). 요약이 없으면 ("", 0)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, upto_id FROM summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row else ("", 0)
+
+    def set_summary(self, session_id: str, summary: str, upto_id: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO summaries (session_id, ts, upto_id, summary) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET ts = excluded.ts, upto_id = excluded.upto_id, "
+                "summary = excluded.summary WHERE excluded.upto_id > summaries.upto_id",
+                (session_id, time.time(), upto_id, summary),
+            )
+            self._conn.commit()
+
+    # --- 보존 정책 ---
+    def _after_write(self):
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.purge_every == 0
+        if due:
+            self.purge()
+
+    def purge(self):
+        """retention_days 보다 오래된 행과, 테이블별 max_rows 를 넘는 오래된 Q/A·세션 메시지 삭제."""
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock:
+            self._conn.execute("DELETE FROM qa WHERE ts < ?", (cutoff,))
+            self._conn.execute("DELETE FROM messages WHERE ts < ?", (cutoff,))
+            self._conn.execute("DELETE FROM summaries WHERE ts < ?", (cutoff,))
+            for table in ("qa", "messages"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE id <= (SELECT id FROM {table} ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_rows,),
+                )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PersistentChatMessageHistory(BaseChatMessageHistory):
+    """SQLiteHistoryStore 에 저장되는 세션 대화 이력 (메모리에 누적하지 않음).
+
+    세션 요약이 있으면 [요약 SystemMessage] + 요약 이후 최근 메시지만 돌려준다.
+    """
+
+    def __init__(self, session_id: str, store: SQLiteHistoryStore):
+        self.session_id = session_id
+        self.store = store
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        summary, upto_id = self.store.get_summary(self.session_id)
+        recent = self.store.load_messages(self.session_id, after_id=upto_id)
+        if not summary:
+            return recent
+        return [SystemMessage(content=f"[이전 대화 요약]\n{summary}")] + recent
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.store.append_messages(self.session_id, messages)
+
+    def clear(self) -> None:
+        self.store.clear_session(self.session_id)
+
+
+_history_store: Optional[SQLiteHistoryStore] = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store() -> SQLiteHistoryStore:
+    """프로세스 공용 이력 저장소."""
+    global _history_store
+    if _history_store is None:
+        with _history_store_lock:
+            if _history_store is None:
+                semantic = _load_settings().get("history", {}).get("semantic", False)
+                _history_store = SQLiteHistoryStore(embed_fn=_compute_embedding if semantic else None)
+    return _history_store
@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from data_sources import _load_settings, get_resilience_policy
+
+logger = logging.getLogger(__name__)
+
+
+class FakeChatModel(BaseChatModel):
+    """네트워크 없이 동작하는 결정적 가짜 모델 (부하 테스트용).
+
+    같은 입력에는 항상 같은 답을 돌려주고, latency_ms 만큼 지연한다.
+    generate_batch() 는 배치 전체에 지연을 한 번만 적용해 GPU 배치 추론을 흉내낸다.
+    """
+
+    latency_ms: float = 50.0
+    per_item_ms: float = 2.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "aiops-fake"
+
+    def _answer(self, messages: Sequence[BaseMessage]) -> str:
+        last = str(messages[-1].content) if messages else ""
+        digest = hashlib.sha1("\n".join(str(m.content) for m in messages).encode("utf-8")).hexdigest()[:8]
+        question = last.split("\n", 1)[0][:120]
+        return f"[FAKE:{digest}] {question} 에 대한 점검 결과, 구성/시계열 데이터 기준 특이사항이 없습니다."
+
+    def generate_batch(self, batch: Sequence[Sequence[BaseMessage]], stop=None, **kwargs) -> List[ChatResult]:
+        time.sleep((self.latency_ms + self.per_item_ms * len(batch)) / 1000)
+        results = []
+        for m in batch:
+            text = self._answer(m)
+            for token in stop or ():
+                text = text.split(token, 1)[0]
+            results.append(ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))]))
+        return results
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self.generate_batch([messages], stop=stop, **kwargs)[0]
+
+
+class _Request:
+    __slots__ = ("messages", "kwargs", "key", "future")
+
+    def __init__(self, messages, kwargs):
+        self.messages = messages
+        self.kwargs = kwargs
+        # 호출 인자(stop 등)가 같은 요청끼리만 한 배치로 묶음
+        self.key = repr(sorted(kwargs.items()))
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """여러 세션의 동시 요청을 window_ms 동안 모아 한 번에 백엔드로 보냄.
+
+    - max_batch_size 건이 차거나 window_ms 가 지나면 배치를 내보냄
+    - max_concurrency 로 백엔드에 동시에 떠 있는 배치 수를 제한
+    - 백엔드에 generate_batch() 가 있으면 배치 단위로, 없으면 batch() 로 병렬 호출
+    - 호출 인자(stop 등)가 다른 요청은 같은 창에 모여도 인자별로 나눠 보냄
+    """
+
+    def __init__(self, model, max_batch_size: int = 8, window_ms: float = 10, max_concurrency: int = 4):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self.max_concurrency = max_concurrency
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, messages: List[BaseMessage], **kwargs) -> Future:
+        self._start()
+        req = _Request(messages, kwargs)
+        self._queue.put(req)
+        return req.future
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="llm-batcher", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            groups: Dict[str, List[_Request]] = {}
+            for req in batch:
+                groups.setdefault(req.key, []).append(req)
+            self.requests += len(batch)
+            for group in groups.values():
+                self.batches += 1
+                self._slots.acquire()
+                threading.Thread(target=self._dispatch, args=(group,), daemon=True).start()
+
+    def _dispatch(self, batch: List[_Request]):
+        kwargs = batch[0].kwargs
+        try:
+            if hasattr(self.model, "generate_batch"):
+                results = self.model.generate_batch([r.messages for r in batch], **kwargs)
+            else:
+                outputs = self.model.batch([r.messages for r in batch], config={"max_concurrency": len(batch)},
+                                           return_exceptions=True, **kwargs)
+                results = [o if isinstance(o, Exception) else
+                           ChatResult(generations=[ChatGeneration(message=o)]) for o in outputs]
+            for req, res in zip(batch, results):
+                if isinstance(res, Exception):
+                    req.future.set_exception(res)
+                else:
+                    req.future.set_result(res)
+        except Exception as e:
+            for req in batch:
+                if not req.future.done():
+                    req.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+class BatchedChatModel(BaseChatModel):
+    """MicroBatcher 를 통해 호출하는 채팅 모델 래퍼 (체인에서는 일반 모델처럼 사용)."""
+
+    inner: Any
+    batcher: Any
+    timeout: float = 120.0
+
+    @property
+    def _llm_type(self) -> str:
+        return f"batched-{getattr(self.inner, '_llm_type', 'chat')}"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if stop is not None:
+            kwargs["stop"] = stop
+        return self.batcher.submit(messages, **kwargs).result(timeout=self.timeout)
+
+
+class ResilientChatModel(BaseChatModel):
+    """ResiliencePolicy(deadline, 재시도, 헤지, 서킷 브레이커)를 거쳐 호출하는 채팅 모델 래퍼.
+
+    서킷이 열려 있으면 CircuitOpenError 로 즉시 실패하므로 호출 측에서 MOCK 답변 등으로 대체한다.
+    """
+
+    inner: Any
+    policy: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return getattr(self.inner, "_llm_type", "chat")
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        # run_manager 를 넘겨 콜백(토큰 스트리밍, 트레이싱)이 내부 모델 호출까지 이어지게 함
+        return self.policy.call(self.inner._generate, messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def _create_backend(cfg: dict):
+    backend = cfg.get("backend", "auto")
+    model = cfg.get("model", "gpt-4o-mini")
+    if backend == "auto":
+        backend = "openai" if os.getenv("OPENAI_API_KEY") else "none"
+    if backend == "none":
+        return None
+    if backend == "fake":
+        return FakeChatModel(latency_ms=float(cfg.get("fake_latency_ms", 50)))
+    from langchain_openai import ChatOpenAI
+    if backend == "local":
+        # vLLM / llama.cpp / Ollama 등 OpenAI 호환 서버
+        return ChatOpenAI(temperature=0, model=model, base_url=cfg.get("base_url"),
+                          api_key=cfg.get("api_key") or "EMPTY", timeout=cfg.get("timeout", 120))
+    if backend == "openai":
+        return ChatOpenAI(temperature=0, model=model, timeout=cfg.get("timeout", 120))
+    raise ValueError(f"알 수 없는 LLM backend: {backend}")
+
+
+def build_llm(cfg: Optional[dict] = None):
+    """설정(llm 섹션)에 따라 채팅 모델을 만든다. 사용할 백엔드가 없으면 None (MOCK 답변)."""
+    cfg = cfg if cfg is not None else _load_settings().get("llm", {})
+    try:
+        model = _create_backend(cfg)
+    except Exception as e:
+        logger.warning("LLM backend 생성 실패, MOCK 답변 사용 (%s)", e)
+        return None
+    if model is None:
+        return None
+    if cfg.get("batching", True):
+        batcher = MicroBatcher(
+            model,
+            max_batch_size=int(cfg.get("max_batch_size", 8)),
+            window_ms=float(cfg.get("batch_window_ms", 10)),
+            max_concurrency=int(cfg.get("max_concurrency", 4)),
+        )
+        model = BatchedChatModel(inner=model, batcher=batcher, timeout=float(cfg.get("timeout", 120)))
+    if not cfg.get("resilience", True):
+        return model
+    return ResilientChatModel(inner=model, policy=get_resilience_policy("llm"))
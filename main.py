@@ -1,13 +1,17 @@
+import uuid
 import warnings
 
 import matplotlib
 import matplotlib.pyplot as plt
 import panel as pn
 
-from chatbot import AIOpsChatbot, generate_pdf_report
+from chatbot import AIOpsChatbot
 from api import app as rest_app
-from project_planner import PlannerStore
+from planner_db import get_planner_store
+from report_service import ReportLimitError, get_report_service
+from session_manager import session_manager
 from styles import CHAT_CSS, PLANNER_CSS
+from topology_render import check_vis_network
 from ui.admin_tab import build_admin_editor
 from ui.chat_tab import build_chat_ui
 from ui.planner_tab import build_planner_tab
@@ -25,24 +29,80 @@ plt.rcParams['font.family'] = 'Malgun Gothic'
 plt.rcParams['axes.unicode_minus'] = False
 
 
+def _session_key():
+    ctx = getattr(pn.state.curdoc, "session_context", None) if pn.state.curdoc else None
+    return getattr(ctx, "id", None) or uuid.uuid4().hex
+
+
 def create_app():
     bot = AIOpsChatbot()
-    planner_store = PlannerStore()
+    planner_store = get_planner_store()
 
-    chat_sidebar, chat_tab = build_chat_ui(bot)
+    session_key = _session_key()
+    session_manager.register(session_key, bot)
+    pn.state.on_session_destroyed(lambda ctx: session_manager.destroy(session_key))
+
+    chat_sidebar, chat_tab = build_chat_ui(
+        bot,
+        on_activity=lambda: session_manager.touch(session_key),
+        register_cleanup=lambda fn: session_manager.add_cleanup(session_key, fn),
+    )
     upload_tab = build_upload_tab()
-    planner_panel = build_planner_tab(planner_store)
+    planner_panel = build_planner_tab(
+        planner_store,
+        register_cleanup=lambda fn: session_manager.add_cleanup(session_key, fn),
+    )
     editor_box = build_admin_editor()
 
-    btn_pdf = pn.widgets.FileDownload(
-        callback=pn.bind(lambda: generate_pdf_report(bot.last_topo_buffer, bot.last_chart_buffer), watch=False),
-        filename="Report.pdf",
-        label="PDF",
+    # PDF 는 리포트 워커 풀에서 렌더링하고, 완료될 때까지 작업 핸들을 폴링
+    report_service = get_report_service()
+    report_user = pn.state.user or session_key
+    btn_pdf = pn.widgets.Button(
+        name="PDF",
         button_type="success",
         width=50,
         height=26,
         styles={'font-size': '10px'}
     )
+    dl_pdf = pn.widgets.FileDownload(
+        filename="Report.pdf",
+        label="⬇ PDF",
+        button_type="success",
+        visible=False,
+        width=60,
+        height=26,
+        styles={'font-size': '10px'}
+    )
+    pending = {"job": None, "poller": None}
+
+    def poll_report():
+        job = pending["job"]
+        if job is None or not job.done:
+            return
+        pending["poller"].stop()
+        pending["job"] = pending["poller"] = None
+        btn_pdf.disabled = False
+        if job.status == job.DONE:
+            btn_pdf.name = "PDF"
+            dl_pdf.file = job.result()
+            dl_pdf.visible = True
+        else:
+            btn_pdf.name = "PDF ⚠"
+
+    def request_report(event=None):
+        session_manager.touch(session_key)
+        try:
+            job = report_service.submit(report_user, bot.report_sections())
+        except ReportLimitError:
+            btn_pdf.name = "대기중"
+            return
+        pending["job"] = job
+        dl_pdf.visible = False
+        btn_pdf.disabled = True
+        btn_pdf.name = "..."
+        pending["poller"] = pn.state.add_periodic_callback(poll_report, period=300)
+
+    btn_pdf.on_click(request_report)
 
     sw_mode = pn.widgets.Switch(name="Admin", width=40, align='center')
     toolbar = pn.Row(
@@ -53,6 +113,7 @@ def create_app():
         ),
         pn.Spacer(),
         btn_pdf,
+        dl_pdf,
         styles={'background': '#f8f9fa', 'padding': '4px', 'border-bottom': '1px solid #ddd'},
         sizing_mode='stretch_width'
     )
@@ -98,6 +159,7 @@ def create_app():
 
 
 if __name__ == "__main__":
+    check_vis_network()
     pn.serve(
         create_app,
         port=5006,
@@ -0,0 +1,118 @@
+import io
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from bokeh.models import ColumnDataSource, HoverTool
+from bokeh.plotting import figure
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_POINTS = 1000
+DEMO_METRIC = {
+    "asset": "demo", "metric": "cpu_usage", "period": "1h",
+    "times": ["09:00", "10:00", "11:00", "12:00", "13:00"],
+    "values": [20, 35, 45, 30, 95],
+}
+
+
+def lttb_indices(values: Sequence[float], threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 다운샘플링. 선택된 점의 인덱스를 반환.
+
+    구간별로 이전 선택점/다음 구간 평균과 이루는 삼각형 면적이 가장 큰 점을 남겨
+    피크/급변 구간의 모양을 유지한다. x 는 등간격(인덱스)으로 본다.
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    y = np.asarray(values, dtype=float)
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def decimate(metric_info: Dict, max_points: int = DEFAULT_MAX_POINTS) -> Tuple[List, List, List[int]]:
+    """(times, values, 원본 인덱스). None 값은 제외하고 max_points 이하로 줄임."""
+    pairs = [(i, t, v) for i, (t, v) in enumerate(zip(metric_info["times"], metric_info["values"])) if v is not None]
+    if not pairs:
+        return [], [], []
+    idx = lttb_indices([v for _, _, v in pairs], max_points)
+    chosen = [pairs[i] for i in idx]
+    return [t for _, t, _ in chosen], [v for _, _, v in chosen], [i for i, _, _ in chosen]
+
+
+def _title(metric_info: Dict) -> str:
+    return f"{metric_info['asset']} - {metric_info['metric']} ({metric_info['period']})"
+
+
+def make_metric_figure(metric_info: Optional[Dict] = None, max_points: int = DEFAULT_MAX_POINTS,
+                       width: int = 420, height: int = 240):
+    """ColumnDataSource 기반 Bokeh 라인 차트 (브라우저에서 확대/이동).
+
+    timestamps(epoch ms) 가 있으면 datetime 축, 없으면 인덱스 축에 times 라벨을 붙인다.
+    """
+    metric_info = metric_info or DEMO_METRIC
+    times, values, idx = decimate(metric_info, max_points)
+    stamps = metric_info.get("timestamps")
+    data = {"value": values, "label": times}
+    if stamps:
+        data["x"] = [datetime.fromtimestamp(stamps[i] / 1000) for i in idx]
+    else:
+        data["x"] = idx
+    source = ColumnDataSource(data)
+
+    fig = figure(
+        title=_title(metric_info), width=width, height=height,
+        x_axis_type="datetime" if stamps else "linear",
+        tools="xpan,xwheel_zoom,box_zoom,reset,save", active_scroll="xwheel_zoom",
+        sizing_mode="stretch_width",
+    )
+    fig.line("x", "value", source=source, line_width=2)
+    if len(values) <= 200:
+        fig.scatter("x", "value", source=source, size=4)
+    fig.add_tools(HoverTool(tooltips=[("time", "@label"), ("value", "@value{0.[00]}")]))
+    if not stamps:
+        step = max(1, len(idx) // 8)
+        fig.xaxis.ticker = idx[::step]
+        fig.xaxis.major_label_overrides = {i: t for i, t in zip(idx[::step], times[::step])}
+    fig.title.text_font_size = "10pt"
+    fig.yaxis.axis_label = "Value"
+    fig.toolbar.logo = None
+    if len(times) < len(metric_info["times"]):
+        logger.info("metric chart decimated %d -> %d points", len(metric_info["times"]), len(times))
+    return fig
+
+
+def render_metric_png(metric_info: Optional[Dict] = None, max_points: int = DEFAULT_MAX_POINTS,
+                      dpi: int = 100) -> io.BytesIO:
+    """PDF 리포트용 정적 PNG. 리포트를 요청할 때만 호출한다."""
+    import matplotlib.pyplot as plt
+
+    metric_info = metric_info or DEMO_METRIC
+    times, values, _ = decimate(metric_info, max_points)
+    fig, ax = plt.subplots(figsize=(5, 3))
+    try:
+        ax.plot(range(len(values)), values, "o-" if len(values) <= 200 else "-")
+        step = max(1, len(times) // 8)
+        ax.set_xticks(range(0, len(times), step))
+        ax.set_xticklabels(times[::step], fontsize=7)
+        ax.set_title(_title(metric_info), fontsize=10)
+        ax.set_ylabel("Value")
+        ax.grid(True, linestyle="--", alpha=0.5)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    buffer.seek(0)
+    return buffer
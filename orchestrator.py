@@ -1,17 +1,30 @@
 import os
+import threading
 import uuid
 import logging
+from operator import itemgetter
+from typing import Optional
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import trim_messages
+from langchain_core.runnables import RunnablePassthrough
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
 
-from data_sources import ConfigDataSource, MetricDataSource, GraphDataSource, ManualVectorSource
+from asset_recognizer import get_asset_recognizer
+from context_builder import ContextBuilder, TokenCounter
+from data_sources import (
+    ConfigDataSource, EventDataSource, GraphDataSource, ManualVectorSource, MetricDataSource, _load_settings,
+)
+from history_store import PersistentChatMessageHistory, get_history_store
+from llm_backend import build_llm
+from planner_db import get_planner_store
+from planner_query import parse_planner_question, query_planner, summarize_planner_result
+from query_router import build_default_engine
+from summary_memory import build_summary_memory
 
 API_KEY_FILE = ".openai_key"
+DEFAULT_ASSET = "a812dpt"
 
 
 def load_api_key():
@@ -28,7 +41,6 @@ def load_api_key():
 
 
 load_api_key()
-USE_OPENAI = os.getenv("OPENAI_API_KEY") is not None
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -37,61 +49,58 @@ if not logger.handlers:
         format="%(asctime)s %(levelname)s %(name)s %(message)s"
     )
 
-class HistoryStore:
-    """챗봇 히스토리 기반 검색 Stub"""
-
-    def __init__(self):
-        # 실제로는 Redis/PG 등에 저장된 벡터 RAG를 권장
-        self._history_texts = []
-
-    def add_qa(self, question: str, answer: str):
-        self._history_texts.append(f"Q: {question}\nA: {answer}")
-
-    def search_history(self, query: str):
-        # TODO: 실제로는 벡터 검색으로 교체
-        hits = [h for h in self._history_texts if query.lower() in h.lower()]
-        return hits[:3]
-
-
-store = {}
-
-
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
-    if session_id not in store:
-        store[session_id] = ChatMessageHistory()
-    return store[session_id]
+    return PersistentChatMessageHistory(session_id, get_history_store())
 
 
-class AIOpsOrchestrator:
-    """여러 데이터소스를 LLM 기반으로 오케스트레이션하는 역할"""
+class SharedResources:
+    """모든 세션이 공유하는 무거운 객체 (LLM 클라이언트, 컴파일된 체인, 데이터소스).
+
+    각 객체는 상태가 없거나 내부적으로 스레드 안전하므로 프로세스당 한 번만 만든다.
+    세션별로는 session_id 만 들고 있으면 된다.
+    """
 
     def __init__(self):
         self.config_ds = ConfigDataSource()
         self.metric_ds = MetricDataSource()
         self.graph_ds = GraphDataSource()
+        self.event_ds = EventDataSource()
         self.manual_ds = ManualVectorSource()
-        self.history_store = HistoryStore()
-        self.session_id = str(uuid.uuid4())
-
-        if USE_OPENAI:
-            # 여기선 작은 모델 사용, 나중에 solar/로컬 LLM 교체 가능
-            self.llm = ChatOpenAI(temperature=0, model="gpt-4o-mini")
+        self.history_store = get_history_store()
+        # 이력 검색 범위: 기본은 자기 세션만, 전체 세션 검색은 설정으로만 허용
+        self.history_all_sessions = bool(_load_settings().get("history", {}).get("search_all_sessions", False))
+        self.recognizer = get_asset_recognizer()
+        self.planner_store = get_planner_store()
+
+        ctx_cfg = _load_settings().get("context", {})
+        self.token_counter = TokenCounter()
+        self.context_builder = ContextBuilder(int(ctx_cfg.get("budget_tokens", 1500)), counter=self.token_counter)
+
+        # llm.backend: auto(OPENAI_API_KEY 있으면 openai) / openai / local(OpenAI 호환 서버) / fake / none
+        self.llm = build_llm()
+        if self.llm:
+            # 이전 대화(history)만 자르고, 이번 질문+컨텍스트는 ContextBuilder 예산으로 관리
             self.trimmer = trim_messages(
-                max_tokens=500,
+                max_tokens=int(ctx_cfg.get("history_tokens", 500)),
                 strategy="last",
-                token_counter=self.llm,
-                include_system=True
+                token_counter=self._count_message_tokens,
+                include_system=True,  # 세션 요약(SystemMessage)은 항상 유지
+                start_on="human",
             )
         else:
-            self.llm = None
             self.trimmer = None
 
+        self.summary_memory = build_summary_memory(self.history_store, self.llm)
+
+        llm_fallback = _load_settings().get("router", {}).get("llm_fallback", False)
+        self.router = build_default_engine(llm=self.llm if llm_fallback else None)
+
         # 기본 프롬프트 템플릿(페르소나 설명 + 히스토리)
         self.base_prompt = ChatPromptTemplate.from_messages([
             ("system",
              "당신은 전산/전력 장비 운영을 도와주는 AIOps 어시스턴트입니다. "
              "질문을 분석해서 구성정보(Postgres), 시계열(Timescale), 연결성(Neo4j), 매뉴얼(pgvector), "
-             "이전 대화 이력 중 어디를 봐야 할지 결정하고, "
+             "이전 대화 이력, 프로젝트 플래너 집계 중 어디를 봐야 할지 결정하고, "
              "결과를 11px UI에 맞춰 핵심만 짚게 한국어로 답변하세요. "
              "항상 가능한 한 근거 링크를 함께 제시하세요."
              ),
@@ -99,31 +108,87 @@ class AIOpsOrchestrator:
             ("human", "{input}")
         ])
 
+        # session_id 는 호출 시 config 로 전달되므로 체인은 한 번만 구성
+        self.chain = None
+        self.chain_with_history = None
+        if self.llm:
+            self.chain = (
+                RunnablePassthrough.assign(history=itemgetter("history") | self.trimmer)
+                | self.base_prompt
+                | self.llm
+            )
+            self.chain_with_history = RunnableWithMessageHistory(
+                self.chain, get_session_history, input_messages_key="input", history_messages_key="history"
+            )
+
+    def _count_message_tokens(self, messages) -> int:
+        # 메시지당 역할/구분자 오버헤드 4토큰
+        return sum(self.token_counter(str(m.content)) + 4 for m in messages)
+
+
+_shared: Optional[SharedResources] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_resources() -> SharedResources:
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SharedResources()
+    return _shared
+
+
+class AIOpsOrchestrator:
+    """여러 데이터소스를 LLM 기반으로 오케스트레이션하는 역할
+
+    무거운 객체는 SharedResources 를 참조하고, 세션별 상태는 session_id 뿐이다.
+    """
+
+    def __init__(self, shared: Optional[SharedResources] = None):
+        shared = shared or get_shared_resources()
+        self.shared = shared
+        self.config_ds = shared.config_ds
+        self.metric_ds = shared.metric_ds
+        self.graph_ds = shared.graph_ds
+        self.event_ds = shared.event_ds
+        self.manual_ds = shared.manual_ds
+        self.history_store = shared.history_store
+        self.recognizer = shared.recognizer
+        self.planner_store = shared.planner_store
+        self.router = shared.router
+        self.llm = shared.llm
+        self.trimmer = shared.trimmer
+        self.base_prompt = shared.base_prompt
+        self.context_builder = shared.context_builder
+        self.session_id = str(uuid.uuid4())
+
     def reset_session(self):
         self.session_id = str(uuid.uuid4())
 
-    # --- 간단한 라우팅 heuristic: 실제로는 LLM/Router 로 교체 가능---
-    def _decide_modes(self, query: str):
-        q = query.lower()
-        modes = []
-        if any(k in q for k in ["구성", "config", "ip", "os", "서버", "장비"]):
-            modes.append("config")
-        if any(k in q for k in ["추세", "trend", "시계열", "그래프", "cpu", "latency", "사용률"]):
-            modes.append("metric")
-        if any(k in q for k in ["연결", "구성도", "topology", "토폴로지", "path"]):
-            modes.append("graph")
-        if any(k in q for k in ["매뉴얼", "manual", "설명서", "가이드"]):
-            modes.append("manual")
-        if any(k in q for k in ["이력에서", "이전에", "지난 대화", "지난 질의"]):
-            modes.append("history")
-
-        if not modes:
-            # 기본값 config + manual 정도
-            modes = ["config", "manual"]
-        return modes
+    # --- 라우팅: 중심 벡터 분류기(+선택적 LLM) -> 키워드, 정규화 질의 단위 캐시 ---
+    def _decide_modes(self, query: str, assets=()):
+        return self.router.route(query, entities=assets)
+
+    def _extract_assets(self, query: str):
+        """질의에 언급된 자산명 목록. 인식 사전이 비어 있는(데모/오프라인) 경우에만 기본 자산 사용."""
+        assets = self.recognizer.extract(query)
+        if not assets and not len(self.recognizer):
+            assets = [DEFAULT_ASSET]
+        return assets
+
+    def _query_planner(self, query: str):
+        """질문에서 범위/상태/담당/지연 조건을 뽑아 플래너 집계. 실패하면 None."""
+        try:
+            params = parse_planner_question(self.planner_store, query)
+            return query_planner(self.planner_store, **params)
+        except Exception as e:
+            logger.warning("planner 집계 실패 (%s)", e)
+            return None
 
     def route_and_answer(self, user_query: str):
-        modes = self._decide_modes(user_query)
+        assets = self._extract_assets(user_query)
+        modes = self._decide_modes(user_query, assets)
         logger.info("Orchestrator query: '%s' modes=%s session=%s", user_query, modes, self.session_id)
 
         config_info = None
@@ -131,55 +196,61 @@ class AIOpsOrchestrator:
         graph_info = None
         manuals = []
         history_hits = []
-
-        asset_name = None
-        for token in user_query.replace(",", " ").split():
-            if "." in token or "-" in token or token.lower().startswith("a"):
-                asset_name = token.strip()
-                break
-        if not asset_name:
-            asset_name = "a812dpt"
-
-        if "config" in modes:
-            config_info = self.config_ds.get_asset_config(asset_name)
-        if "metric" in modes:
+        planner_info = None
+
+        asset_name = assets[0] if assets else None
+
+        if "config" in modes and assets:
+            configs = self.config_ds.get_asset_configs(assets)
+            found = [configs[a.lower()] for a in assets if a.lower() in configs]
+            if len(found) == 1:
+                config_info = found[0]
+            elif found:
+                config_info = found
+        if "metric" in modes and asset_name:
             metric_info = self.metric_ds.get_metric_timeseries(asset_name, metric="cpu_usage", period="1h")
-        if "graph" in modes:
+        if "graph" in modes and asset_name:
             graph_info = self.graph_ds.get_topology_for_asset(asset_name)
         if "manual" in modes:
             manuals = self.manual_ds.search_manuals(user_query, top_k=3)
         if "history" in modes:
-            history_hits = self.history_store.search_history(user_query)
+            history_hits = self.history_store.search_history(
+                user_query, session_id=None if self.shared.history_all_sessions else self.session_id)
+        if "planner" in modes:
+            planner_info = self._query_planner(user_query)
 
+        context_report = None
         if not self.llm:
             answer_text = f"[MOCK] 질의: {user_query}\n\n- 구성정보: {config_info}\n- 시계열: {metric_info}\n- 매뉴얼 hits: {len(manuals)}건\n- 이력 hits: {len(history_hits)}건"
+            if planner_info:
+                answer_text += "\n- 플래너:\n" + "\n".join(summarize_planner_result(planner_info))
         else:
-            chain = self.base_prompt | self.trimmer | self.llm
-            chain_with_history = RunnableWithMessageHistory(
-                chain, get_session_history, input_messages_key="input", history_messages_key="history"
+            chain_with_history = self.shared.chain_with_history
+
+            context_text, context_report = self.context_builder.build(
+                config=config_info, metric=metric_info, manuals=manuals, history_hits=history_hits,
+                planner=planner_info,
             )
+            logger.info("LLM context tokens: %s", context_report)
 
-            context_parts = []
-            if config_info: context_parts.append(f"[구성정보]\n{config_info}")
-            if metric_info: context_parts.append(f"[시계열]\n{metric_info}")
-            if manuals:
-                mtext = "\n".join(f"- {m['title']}: {m['snippet']} (link: {m['link']})" for m in manuals)
-                context_parts.append(f"[매뉴얼 검색 결과]\n{mtext}")
-            if history_hits:
-                htext = "\n".join(history_hits)
-                context_parts.append(f"[이전 대화 히스토리]\n{htext}")
-            context_text = "\n\n".join(context_parts) if context_parts else "관련 데이터 없음"
-
-            prompt_input = f"사용자 질문: {user_query}\n\n아래는 구성/시계열/매뉴얼/히스토리에서 가져온 예시 데이터입니다. 이 데이터를 참고해서 답변을 작성하세요.\n\n[Context]\n{context_text}"
+            prompt_input = f"사용자 질문: {user_query}\n\n아래는 구성/시계열/매뉴얼/히스토리/플래너에서 가져온 예시 데이터입니다. 이 데이터를 참고해서 답변을 작성하세요.\n\n[Context]\n{context_text}"
             logger.info("LLM prompt (truncated): %s", prompt_input[:300])
-            result = chain_with_history.invoke({"input": prompt_input}, config={"configurable": {"session_id": self.session_id}})
-            answer_text = result.content if hasattr(result, "content") else str(result)
-            logger.info("LLM answer (truncated): %s", str(answer_text)[:300])
+            try:
+                result = chain_with_history.invoke({"input": prompt_input}, config={"configurable": {"session_id": self.session_id}})
+                answer_text = result.content if hasattr(result, "content") else str(result)
+                logger.info("LLM answer (truncated): %s", str(answer_text)[:300])
+                self.shared.summary_memory.schedule(self.session_id)
+            except Exception as e:
+                # deadline 초과/서킷 open 등: 조회 결과만으로 답변
+                logger.warning("LLM 호출 실패, MOCK 답변 사용 (%s)", e)
+                answer_text = (f"[MOCK] LLM 응답 불가({type(e).__name__}). 조회된 데이터만 표시합니다.\n\n"
+                               f"질의: {user_query}\n\n{context_text}")
 
         if isinstance(answer_text, str):
-            self.history_store.add_qa(user_query, answer_text)
+            self.history_store.add_qa(user_query, answer_text, session_id=self.session_id)
 
         return {
             "answer_text": answer_text, "config": config_info, "metric": metric_info,
             "graph": graph_info, "manuals": manuals, "history_hits": history_hits,
+            "planner": planner_info, "assets": assets, "context_tokens": context_report,
         }
@@ -0,0 +1,440 @@
+import json
+import logging
+import os
+import select
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from data_sources import _LABEL_RE, _load_settings, _pg_conn, _pg_pooled
+from project_planner import DEFAULT_DATA, BasePlannerStore, PlannerConflictError, PlannerStore
+
+logger = logging.getLogger(__name__)
+
+# "order" 는 SQL 예약어라 sort_order 컬럼에 저장
+_COLUMNS = ("id", "parent_id", "title", "type", "status", "owner", "due", "notes", "sort_order", "version")
+_SELECT = "SELECT " + ", ".join(_COLUMNS) + " FROM planner_items"
+_EDITABLE = {"parent_id": "parent_id", "title": "title", "type": "type", "status": "status",
+             "owner": "owner", "due": "due", "notes": "notes", "order": "sort_order"}
+
+_SUBTREE_CTE = """
+WITH RECURSIVE subtree(id) AS (
+    SELECT id FROM planner_items WHERE id = ?
+    UNION ALL
+    SELECT c.id FROM planner_items c JOIN subtree s ON c.parent_id = s.id
+)
+"""
+
+SQLITE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS planner_items (
+    id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    title TEXT NOT NULL,
+    type TEXT,
+    status TEXT,
+    owner TEXT,
+    due TEXT,
+    notes TEXT,
+    sort_order TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS planner_items_parent ON planner_items (parent_id);
+CREATE TABLE IF NOT EXISTS planner_changes (
+    rev INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id TEXT NOT NULL,
+    op TEXT NOT NULL
+);
+"""
+
+POSTGRES_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS planner_items (
+    id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    title TEXT NOT NULL,
+    type TEXT,
+    status TEXT,
+    owner TEXT,
+    due TEXT,
+    notes TEXT,
+    sort_order TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_at DOUBLE PRECISION NOT NULL
+);
+CREATE INDEX IF NOT EXISTS planner_items_parent ON planner_items (parent_id);
+CREATE TABLE IF NOT EXISTS planner_changes (
+    rev BIGSERIAL PRIMARY KEY,
+    item_id TEXT NOT NULL,
+    op TEXT NOT NULL
+);
+"""
+
+
+def _row_to_item(row: Sequence[Any]) -> Dict[str, Any]:
+    item = dict(zip(_COLUMNS, row))
+    item["order"] = item.pop("sort_order") or ""
+    return item
+
+
+class SQLPlannerStore(BasePlannerStore):
+    """planner_items 테이블 기반 PlannerStore (SQLite/Postgres 공통 로직).
+
+    - 행 단위 INSERT/UPDATE/DELETE, 수정은 version 컬럼으로 낙관적 동시성 제어
+      (expected_version 이 다르면 PlannerConflictError)
+    - 서브트리 조회/삭제와 부모 변경 시 순환 검사는 재귀 CTE
+    - 모든 변경은 planner_changes(rev 증가) 에 기록. 메모리 인덱스는 마지막으로 본 rev 이후
+      변경분만 다시 읽어 갱신하고, 반영된 변경을 add_listener 구독자(열린 세션)에게 알린다
+    - 프로세스 안에서는 인스턴스 하나를 모든 세션이 공유 (get_planner_store)
+    하위 클래스는 _connect / _insert_change / _watch 와 스키마를 제공한다.
+    """
+
+    SCHEMA_SQL = ""
+
+    def __init__(self, poll_interval: float = 2.0, change_retention: int = 10000):
+        super().__init__()
+        self.poll_interval = poll_interval
+        self.change_retention = change_retention
+        self._rev = 0
+        self._synced_at = 0.0
+        self._writes = 0
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    # --- 하위 클래스 구현 ---
+    @contextmanager
+    def _connect(self, write: bool = True) -> Iterator[Any]:
+        """트랜잭션 하나를 여는 커서 컨텍스트. 정상 종료 시 commit, 예외 시 rollback.
+
+        write=True 면 쓰기 트랜잭션끼리 직렬화해 rev 순서와 커밋 순서를 일치시킨다
+        (그래야 rev > 마지막 rev 조회로 변경을 빠뜨리지 않음).
+        """
+        raise NotImplementedError
+
+    def _sql(self, query: str) -> str:
+        return query
+
+    def _insert_change(self, cur, item_id: str, op: str) -> int:
+        raise NotImplementedError
+
+    def _watch(self):
+        """다른 프로세스의 변경을 감지해 refresh() 를 부르는 백그라운드 루프."""
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    # --- 적재/동기화 ---
+    def _exec(self, cur, query: str, args: Sequence[Any] = ()):
+        cur.execute(self._sql(query), tuple(args))
+        return cur
+
+    def ensure_schema(self):
+        with self._connect() as cur:
+            for statement in self.SCHEMA_SQL.split(";"):
+                if statement.strip():
+                    cur.execute(statement)
+            count = self._exec(cur, "SELECT COUNT(*) FROM planner_items").fetchone()[0]
+        if not count:
+            self.import_items(self._seed_items())
+
+    @staticmethod
+    def _seed_items() -> List[Dict[str, Any]]:
+        """빈 테이블이면 기존 JSON 플래너(있으면) 또는 기본 데이터로 채움."""
+        path = os.path.join("assets", "planner.json")
+        if os.path.exists(path):
+            try:
+                return PlannerStore(path).list_items()
+            except Exception as e:
+                logger.warning("planner.json 가져오기 실패, 기본 데이터 사용 (%s)", e)
+        return [dict(item) for item in DEFAULT_DATA]
+
+    def import_items(self, items: Sequence[Dict[str, Any]]):
+        now = time.time()
+        with self._connect() as cur:
+            for item in items:
+                self._exec(cur,
+                           "INSERT INTO planner_items (id, parent_id, title, type, status, owner, due, notes, "
+                           "sort_order, version, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (item["id"], self._normalize_parent_id(item.get("parent_id")), item.get("title") or "Untitled",
+                            item.get("type"), item.get("status"), item.get("owner"), item.get("due"),
+                            item.get("notes"), str(item.get("order") or ""), int(item.get("version", 1)), now))
+                self._insert_change(cur, item["id"], "put")
+        self.reload()
+
+    def reload(self):
+        """전체 재적재."""
+        with self._connect(write=False) as cur:
+            rev = self._exec(cur, "SELECT COALESCE(MAX(rev), 0) FROM planner_changes").fetchone()[0]
+            rows = self._exec(cur, _SELECT).fetchall()
+        with self._lock:
+            self._reindex([_row_to_item(r) for r in rows])
+            self._rev = rev
+            self._synced_at = time.monotonic()
+
+    def refresh(self, force: bool = False) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """마지막으로 본 rev 이후 변경분만 읽어 반영. 조회 경로에서는 poll_interval 마다 최대 1회."""
+        if not force and time.monotonic() - self._synced_at < self.poll_interval:
+            return [], []
+        since = self._rev
+        with self._connect(write=False) as cur:
+            changes = self._exec(cur, "SELECT rev, item_id, op FROM planner_changes WHERE rev > ? ORDER BY rev",
+                                 (since,)).fetchall()
+            if changes and since:
+                oldest = self._exec(cur, "SELECT MIN(rev) FROM planner_changes").fetchone()[0]
+                if oldest > since + 1:
+                    changes = None  # 보존 기간이 지난 변경이 있음: 전체 재적재
+            rows = []
+            if changes:
+                put_ids = list(dict.fromkeys(item_id for _, item_id, op in changes if op == "put"))
+                for i in range(0, len(put_ids), 500):
+                    chunk = put_ids[i:i + 500]
+                    rows += self._exec(cur, f"{_SELECT} WHERE id IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+        if changes is None:
+            self.reload()
+            self._notify(self.list_items(), [])
+            return [], []
+        self._synced_at = time.monotonic()
+        if not changes:
+            return [], []
+        changed = [_row_to_item(r) for r in rows]
+        found = {item["id"] for item in changed}
+        removed = list(dict.fromkeys(item_id for _, item_id, _ in changes if item_id not in found))
+        with self._lock:
+            if self._rev != since:
+                # 그 사이 다른 스레드가 먼저 반영함
+                return [], []
+            for item in changed:
+                self._apply({"op": "put", "item": item})
+            self._apply({"op": "del", "ids": removed})
+            self._rev = changes[-1][0]
+        self._notify(changed, removed)
+        return changed, removed
+
+    def _applied(self, revs: List[int], changed: List[Dict[str, Any]], removed: List[str]):
+        """자기 변경을 메모리에 반영. rev 가 이어지면 다음 refresh 에서 다시 읽지 않음."""
+        with self._lock:
+            for item in changed:
+                self._apply({"op": "put", "item": item})
+            self._apply({"op": "del", "ids": removed})
+            if revs and revs[0] == self._rev + 1 and revs == list(range(revs[0], revs[0] + len(revs))):
+                self._rev = revs[-1]
+        self._notify(changed, removed)
+        self._writes += 1
+        if self._writes % 200 == 0:
+            self._prune_changes()
+
+    def _prune_changes(self):
+        try:
+            with self._connect() as cur:
+                self._exec(cur, "DELETE FROM planner_changes WHERE rev <= "
+                                "(SELECT COALESCE(MAX(rev), 0) FROM planner_changes) - ?",
+                           (self.change_retention,))
+        except Exception as e:
+            logger.warning("planner_changes 정리 실패 (%s)", e)
+
+    # --- 변경 ---
+    def add_item(self, parent_id: Optional[str], title: str, item_type: str,
+                 status: str, owner: str, due: str, notes: str, order: str = "") -> Dict[str, Any]:
+        item = self._new_item(parent_id, title, item_type, status, owner, due, notes, order)
+        with self._connect() as cur:
+            self._exec(cur,
+                       "INSERT INTO planner_items (id, parent_id, title, type, status, owner, due, notes, "
+                       "sort_order, version, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)",
+                       (item["id"], item["parent_id"], item["title"], item["type"], item["status"],
+                        item["owner"], item["due"], item["notes"], item["order"], time.time()))
+            rev = self._insert_change(cur, item["id"], "put")
+        self._applied([rev], [dict(item)], [])
+        return item
+
+    def update_item(self, item_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None) -> bool:
+        """expected_version 을 주면 그 사이 다른 세션이 수정한 경우 PlannerConflictError, 없으면 무조건 갱신.
+
+        충돌/순환 오류는 아무것도 쓰지 않은 트랜잭션을 끝내 커넥션을 돌려준 뒤 with 블록 밖에서 올린다.
+        """
+        normalized = self._normalize_updates(updates)
+        fields = [(col, normalized[key]) for key, col in _EDITABLE.items() if key in normalized]
+        error: Optional[Exception] = None
+        with self._connect() as cur:
+            new_parent = normalized.get("parent_id")
+            if new_parent is not None:
+                cycle = self._exec(cur, _SUBTREE_CTE + "SELECT 1 FROM subtree WHERE id = ?",
+                                   (item_id, new_parent)).fetchone()
+                if cycle:
+                    error = ValueError("자신이나 하위 노드를 부모로 지정할 수 없습니다.")
+            if error is None:
+                assignments = ", ".join(f"{col} = ?" for col, _ in fields)
+                query = (f"UPDATE planner_items SET {assignments + ', ' if assignments else ''}"
+                         "version = version + 1, updated_at = ? WHERE id = ?")
+                args = [v for _, v in fields] + [time.time(), item_id]
+                if expected_version is not None:
+                    query += " AND version = ?"
+                    args.append(int(expected_version))
+                if self._exec(cur, query, args).rowcount == 0:
+                    row = self._exec(cur, "SELECT version FROM planner_items WHERE id = ?", (item_id,)).fetchone()
+                    if row is None:
+                        return False
+                    error = PlannerConflictError(
+                        f"{item_id} 는 다른 세션에서 수정되었습니다 (v{expected_version} -> v{row[0]})")
+            if error is None:
+                rev = self._insert_change(cur, item_id, "put")
+                row = self._exec(cur, f"{_SELECT} WHERE id = ?", (item_id,)).fetchone()
+        if error is not None:
+            raise error
+        self._applied([rev], [_row_to_item(row)], [])
+        return True
+
+    def subtree_ids(self, item_id: str) -> List[str]:
+        """item_id 와 모든 자손 id (재귀 CTE)."""
+        with self._connect(write=False) as cur:
+            return [r[0] for r in self._exec(cur, _SUBTREE_CTE + "SELECT id FROM subtree", (item_id,)).fetchall()]
+
+    def delete_item(self, item_id: str):
+        with self._connect() as cur:
+            ids = [r[0] for r in self._exec(cur, _SUBTREE_CTE + "SELECT id FROM subtree", (item_id,)).fetchall()]
+            if not ids:
+                return
+            self._exec(cur, _SUBTREE_CTE + "DELETE FROM planner_items WHERE id IN (SELECT id FROM subtree)",
+                       (item_id,))
+            revs = [self._insert_change(cur, did, "del") for did in ids]
+        self._applied(revs, [], ids)
+
+    # --- 변경 알림 ---
+    def add_listener(self, callback):
+        super().add_listener(callback)
+        self.start()
+
+    def start(self):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="planner-watch", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class SQLitePlannerStore(SQLPlannerStore):
+    """로컬 SQLite 파일 (WAL). 다른 프로세스의 변경은 poll_interval 주기로 감지."""
+
+    SCHEMA_SQL = SQLITE_SCHEMA_SQL
+
+    def __init__(self, path: str = os.path.join("data", "planner.db"), **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._db_lock = threading.Lock()
+        self.ensure_schema()
+        self.reload()
+
+    @contextmanager
+    def _connect(self, write: bool = True):
+        with self._db_lock:
+            cur = self._conn.cursor()
+            # 쓰기 락을 먼저 잡아 CTE 조회와 변경 사이에 다른 프로세스가 끼어들지 못하게 함
+            cur.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield cur
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                cur.close()
+
+    def _insert_change(self, cur, item_id: str, op: str) -> int:
+        cur.execute("INSERT INTO planner_changes (item_id, op) VALUES (?, ?)", (item_id, op))
+        return cur.lastrowid
+
+
+PLANNER_WRITE_LOCK_KEY = 74160047
+
+
+class PostgresPlannerStore(SQLPlannerStore):
+    """Postgres (data_sources 커넥션 풀). 커밋 시 pg_notify 로 다른 프로세스에 즉시 알린다.
+
+    쓰기 트랜잭션은 advisory lock 으로 직렬화 (시퀀스 할당 순서와 커밋 순서가 어긋나지 않게).
+    """
+
+    SCHEMA_SQL = POSTGRES_SCHEMA_SQL
+
+    def __init__(self, channel: str = "planner_changed", **kwargs):
+        super().__init__(**kwargs)
+        if not _LABEL_RE.match(channel):
+            raise ValueError(f"잘못된 NOTIFY 채널: {channel!r}")
+        self.channel = channel
+        self.ensure_schema()
+        self.reload()
+
+    @contextmanager
+    def _connect(self, write: bool = True):
+        with _pg_pooled() as conn, conn.cursor() as cur:
+            if write:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (PLANNER_WRITE_LOCK_KEY,))
+            yield cur
+
+    def _sql(self, query: str) -> str:
+        return query.replace("?", "%s")
+
+    def _insert_change(self, cur, item_id: str, op: str) -> int:
+        cur.execute("INSERT INTO planner_changes (item_id, op) VALUES (%s, %s) RETURNING rev", (item_id, op))
+        rev = cur.fetchone()[0]
+        cur.execute("SELECT pg_notify(%s, %s)", (self.channel, json.dumps({"rev": rev})))
+        return rev
+
+    def _watch(self):
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = _pg_conn()
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.refresh(force=True)
+            except Exception as e:
+                logger.warning("planner LISTEN 실패, 재시도 예정 (%s)", e)
+                self._stop.wait(self.poll_interval * 5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+_planner_store: Optional[BasePlannerStore] = None
+_planner_store_lock = threading.Lock()
+
+
+def _create_planner_store(cfg: Dict[str, Any]) -> BasePlannerStore:
+    backend = (cfg.get("backend") or "json").lower()
+    common = {"poll_interval": float(cfg.get("poll_interval", 2)),
+              "change_retention": int(cfg.get("change_retention", 10000))}
+    try:
+        if backend == "postgres":
+            return PostgresPlannerStore(channel=cfg.get("notify_channel", "planner_changed"), **common)
+        if backend == "sqlite":
+            return SQLitePlannerStore(cfg.get("sqlite_path", os.path.join("data", "planner.db")), **common)
+    except Exception as e:
+        logger.warning("planner %s 백엔드 사용 불가, JSON 저장소로 대체 (%s)", backend, e)
+    return PlannerStore(cfg.get("path", os.path.join("assets", "planner.json")),
+                        compact_every=int(cfg.get("compact_every", 500)))
+
+
+def get_planner_store() -> BasePlannerStore:
+    """모든 세션이 공유하는 planner 저장소 (settings planner.backend: json | sqlite | postgres)."""
+    global _planner_store
+    if _planner_store is None:
+        with _planner_store_lock:
+            if _planner_store is None:
+                _planner_store = _create_planner_store(_load_settings().get("planner", {}))
+    return _planner_store
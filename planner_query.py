@@ -0,0 +1,251 @@
+import datetime
+import heapq
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from project_planner import BasePlannerStore
+
+DONE_STATUSES = {"done"}
+UNASSIGNED = "(미지정)"
+DEFAULT_LIMIT = 50
+
+# 자연어 질의 -> 필터 (orchestrator planner 모드)
+_STATUS_WORDS = {
+    "Done": ["완료된", "완료한", "완료 항목", "끝난", "done"],
+    "In Progress": ["진행중", "진행 중", "in progress", "작업중"],
+    "Planned": ["예정", "계획된", "planned"],
+    "Hold": ["보류", "hold", "중단"],
+}
+_OVERDUE_WORDS = ["지연", "마감 지난", "마감지난", "기한 지난", "기한지난", "overdue", "늦어진", "밀린"]
+_BY_OWNER_WORDS = ["담당자별", "담당별", "per owner", "by owner", "owner별"]
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _as_set(value: Union[None, str, Iterable[str]]) -> Optional[Set[str]]:
+    """'Done,Hold' 또는 목록 -> 소문자 집합. 비어 있으면 None(필터 없음)."""
+    if value is None:
+        return None
+    parts = value.split(",") if isinstance(value, str) else value
+    values = {str(v).strip().lower() for v in parts if str(v).strip()}
+    return values or None
+
+
+def _percent(done: int, total: int) -> float:
+    return round(done * 100.0 / total, 1) if total else 0.0
+
+
+def _new_bucket() -> Dict[str, Any]:
+    return {"total": 0, "done": 0, "overdue": 0}
+
+
+def _close_bucket(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    bucket["percent_done"] = _percent(bucket["done"], bucket["total"])
+    return bucket
+
+
+def resolve_scope(store: BasePlannerStore, scope: Optional[str]) -> Optional[Dict[str, Any]]:
+    """id -> 제목(대소문자 무시, 얕은 항목 우선) -> 구분(type)이 같은 최상위 항목 순으로 찾음.
+
+    찾지 못하면 LookupError.
+    """
+    if not scope:
+        return None
+    item = store.get_item(scope)
+    if item:
+        return item
+    key = scope.strip().lower()
+    # 제목 단어 색인으로 후보만 추린 뒤 제목 전체가 같은지 확인
+    candidates = [store.get_item(i) for i in store.search_ids(" ".join(f"title:{w}" for w in key.split()))]
+    exact = [it for it in candidates if it and it["title"].strip().lower() == key]
+    if exact:
+        return min(exact, key=lambda it: (len(store.ancestors(it["id"])), it["title"], it["id"]))
+    roots = [it for it in store.children_of(None) if str(it.get("type", "")).lower() == key]
+    if roots:
+        return dict(roots[0])
+    raise LookupError(f"'{scope}' 에 해당하는 플래너 항목이 없습니다.")
+
+
+def query_planner(store: BasePlannerStore, scope: Optional[str] = None,
+                  status: Union[None, str, Iterable[str]] = None,
+                  owner: Union[None, str, Iterable[str]] = None,
+                  item_type: Union[None, str, Iterable[str]] = None,
+                  due_before: Optional[str] = None, due_after: Optional[str] = None,
+                  overdue: Optional[bool] = None, text: Optional[str] = None,
+                  today: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+    """필터 + 서브트리 범위 + 집계를 한 번의 순회로 계산.
+
+    scope 를 주면 그 항목의 하위(자신 제외)만 본다. 저장소의 전위 순회 구간 인덱스
+    (subtree_index) 로 범위를 목록 조각으로 바꾸고, 같은 순회에서 상태별/담당자별 건수,
+    직계 하위 서브트리별 완료율, 마감 지난(미완료) 항목을 함께 모은다.
+    due 는 'YYYY-MM-DD' 문자열 비교이며 today 기본값은 오늘 날짜 (형식이 틀리면 ValueError).
+    결과는 저장소 generation 단위로 캐시되므로 반환값을 수정하지 말 것.
+    """
+    today = today or datetime.date.today().isoformat()
+    for name, value in (("today", today), ("due_before", due_before), ("due_after", due_after)):
+        if value and not _DATE_RE.fullmatch(value):
+            raise ValueError(f"{name} 는 YYYY-MM-DD 형식이어야 합니다: {value}")
+    scope_item = resolve_scope(store, scope)
+    filters = {
+        "status": _as_set(status), "owner": _as_set(owner), "type": _as_set(item_type),
+        "due_before": due_before or None, "due_after": due_after or None,
+        "overdue": overdue, "text": (text or "").strip() or None,
+    }
+    key = ("planner_query", scope_item["id"] if scope_item else None, today, limit,
+           tuple((k, tuple(sorted(v)) if isinstance(v, set) else v) for k, v in filters.items()))
+    return store.memoize(key, lambda: _run_query(store, scope_item, filters, today, limit))
+
+
+def _run_query(store: BasePlannerStore, scope_item: Optional[Dict[str, Any]], filters: Dict[str, Any],
+               today: str, limit: int) -> Dict[str, Any]:
+    order, spans = store.subtree_index()
+    if scope_item is not None:
+        start, end = spans.get(scope_item["id"], (0, 0))
+        start += 1
+        tops = store.children_of(scope_item["id"])
+    else:
+        start, end = 0, len(order)
+        tops = store.children_of(None)
+    # 직계 하위 서브트리는 전위 순회에서 연속 구간 -> 시작 위치만 알면 순회 중 버킷 전환
+    top_at = {spans[t["id"]][0]: t for t in tops if t["id"] in spans}
+    subtrees: Dict[str, Dict[str, Any]] = {}
+
+    text_ids = store.search_ids(filters["text"]) if filters["text"] else None
+    statuses, owners, types = filters["status"], filters["owner"], filters["type"]
+    due_before, due_after, want_overdue = filters["due_before"], filters["due_after"], filters["overdue"]
+
+    total = done = 0
+    by_status: Dict[str, int] = {}
+    by_owner: Dict[str, Dict[str, Any]] = {}
+    overdue_keys: List[tuple] = []
+    matched_items: List[Dict[str, Any]] = []
+    bucket = None
+    for idx in range(start, end):
+        item = order[idx]
+        top = top_at.get(idx)
+        if top is not None:
+            bucket = subtrees[top["id"]] = dict(_new_bucket(), id=top["id"], title=top["title"])
+        status_value = str(item.get("status") or "")
+        due = str(item.get("due") or "")
+        if statuses and status_value.lower() not in statuses:
+            continue
+        if owners and str(item.get("owner") or "").lower() not in owners:
+            continue
+        if types and str(item.get("type") or "").lower() not in types:
+            continue
+        if text_ids is not None and item["id"] not in text_ids:
+            continue
+        if due_before and not (due and due < due_before):
+            continue
+        if due_after and not (due and due > due_after):
+            continue
+        is_done = status_value.lower() in DONE_STATUSES
+        is_overdue = bool(due) and due < today and not is_done
+        if want_overdue is not None and is_overdue != bool(want_overdue):
+            continue
+
+        total += 1
+        done += is_done
+        by_status[status_value] = by_status.get(status_value, 0) + 1
+        owner_bucket = by_owner.setdefault(item.get("owner") or UNASSIGNED, _new_bucket())
+        for b in (owner_bucket, bucket):
+            if b is not None:
+                b["total"] += 1
+                b["done"] += is_done
+                b["overdue"] += is_overdue
+        if is_overdue:
+            overdue_keys.append((due, idx))
+        if len(matched_items) < limit:
+            matched_items.append(item)
+
+    def brief(item):
+        return {"id": item["id"], "title": item["title"], "path": store.path_of(item["id"]),
+                "type": item.get("type"), "status": item.get("status"), "owner": item.get("owner"),
+                "due": item.get("due") or ""}
+
+    overdue_items = []
+    for due, idx in heapq.nsmallest(limit, overdue_keys):
+        entry = brief(order[idx])
+        try:
+            entry["days_overdue"] = (datetime.date.fromisoformat(today) - datetime.date.fromisoformat(due)).days
+        except ValueError:
+            entry["days_overdue"] = None
+        overdue_items.append(entry)
+
+    return {
+        "scope": brief(scope_item) if scope_item else None,
+        "today": today,
+        "filters": {k: sorted(v) if isinstance(v, set) else v for k, v in filters.items() if v is not None},
+        "total": total,
+        "done": done,
+        "percent_done": _percent(done, total),
+        "overdue": len(overdue_keys),
+        "by_status": dict(sorted(by_status.items(), key=lambda kv: -kv[1])),
+        "by_owner": {k: _close_bucket(v) for k, v in sorted(by_owner.items(), key=lambda kv: -kv[1]["total"])},
+        "subtrees": [_close_bucket(subtrees[t["id"]]) for t in tops if t["id"] in subtrees],
+        "overdue_items": overdue_items,
+        "items": [brief(it) for it in matched_items],
+    }
+
+
+def _vocabulary(store: BasePlannerStore):
+    """(담당자 목록, 긴 것부터 정렬한 제목 목록) - generation 단위 캐시."""
+    items = store.list_items()
+    owners = sorted({str(it.get("owner") or "") for it in items} - {""})
+    titles = sorted({it["title"] for it in items if len(it["title"]) >= 2}, key=len, reverse=True)
+    return owners, titles
+
+
+def _mentions(question: str, name: str) -> bool:
+    """단어 앞 경계만 확인 (한국어 조사가 붙어도 일치: 'infra팀', '아키텍처에서')."""
+    return re.search(rf"(?<!\w){re.escape(name.lower())}", question) is not None
+
+
+def parse_planner_question(store: BasePlannerStore, question: str) -> Dict[str, Any]:
+    """자연어 질문에서 query_planner 인자를 추림 (상태/지연/담당자/범위/날짜 단어 매칭)."""
+    q = question.lower()
+    params: Dict[str, Any] = {}
+    statuses = [status for status, words in _STATUS_WORDS.items() if any(w in q for w in words)]
+    if any(w in q for w in _OVERDUE_WORDS):
+        params["overdue"] = True
+    elif statuses:
+        params["status"] = statuses
+
+    owners, titles = store.memoize("planner_query_vocab", lambda: _vocabulary(store))
+    # 담당자 이름이 질문에 그대로 나오면 필터 ('담당자별' 은 필터가 아니라 그룹 요청)
+    mentioned = [o for o in owners if _mentions(q, o)]
+    if mentioned and not any(w in q for w in _BY_OWNER_WORDS):
+        params["owner"] = mentioned
+
+    # 범위: 질문에 나온 가장 긴 항목 제목, 없으면 최상위 구분(type)
+    scope = next((t for t in titles if _mentions(q, t)), None)
+    if scope is None:
+        scope = next((str(it.get("type")) for it in store.children_of(None)
+                      if it.get("type") and _mentions(q, str(it["type"]))), None)
+    if scope:
+        params["scope"] = scope
+
+    dates = _DATE_RE.findall(question)
+    if dates and any(w in q for w in ("까지", "이전", "before")):
+        params["due_before"] = dates[0]
+    return params
+
+
+def summarize_planner_result(result: Dict[str, Any], max_lines: int = 8) -> List[str]:
+    """LLM 컨텍스트/MOCK 답변용 요약 줄 목록."""
+    scope = result["scope"]["path"] if result.get("scope") else "전체"
+    lines = [f"- 범위: {scope}, 조건: {result['filters'] or '없음'}, 기준일 {result['today']}",
+             f"- 항목 {result['total']}건, 완료 {result['done']}건 ({result['percent_done']}%), "
+             f"마감 지남(미완료) {result['overdue']}건"]
+    if result["by_status"]:
+        lines.append("- 상태별: " + ", ".join(f"{k or '-'} {v}" for k, v in result["by_status"].items()))
+    if result["by_owner"]:
+        lines.append("- 담당자별: " + ", ".join(
+            f"{k} {v['done']}/{v['total']}({v['percent_done']}%, 지연 {v['overdue']})"
+            for k, v in list(result["by_owner"].items())[:max_lines]))
+    subtrees = [s for s in result["subtrees"] if s["total"]]
+    if subtrees:
+        lines.append("- 하위 진행률: " + ", ".join(
+            f"{s['title']} {s['percent_done']}%({s['done']}/{s['total']})" for s in subtrees[:max_lines]))
+    for it in result["overdue_items"][:max_lines]:
+        lines.append(f"- 지연: {it['path']} (due {it['due']}, {it['owner'] or UNASSIGNED}, {it['status']})")
+    return lines
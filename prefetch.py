@@ -0,0 +1,123 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from data_sources import _compute_embedding, _load_settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """모든 세션이 공유하는 프리페치 워커 풀 (DB 부하 상한)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(_load_settings().get("prefetch", {}).get("workers", 4))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+    return _executor
+
+
+class Prefetcher:
+    """입력 중인 질의로 데이터소스 캐시를 미리 데우는 세션별 프리페처.
+
+    - on_text() 가 불릴 때마다 debounce 타이머를 다시 걸고, 입력이 멈추면 한 번만 실행
+    - 자산 인식 + 라우팅을 부분 질의에 적용해 필요한 소스만 조회
+      (구성: AssetCatalog, 시계열/연결성: TTL 캐시, 매뉴얼: 임베딩 캐시)
+    - 새 입력이 들어오면 이전 작업은 대기 중이면 취소, 실행 중이면 다음 단계에서 중단
+    """
+
+    def __init__(self, orchestrator, debounce_ms: float = 400, min_chars: int = 4):
+        self.orchestrator = orchestrator
+        self.debounce = debounce_ms / 1000
+        self.min_chars = min_chars
+        self._timer: Optional[threading.Timer] = None
+        self._future: Optional[Future] = None
+        self._generation = 0
+        self._last_text = ""
+        self._lock = threading.Lock()
+        self.stats = {"scheduled": 0, "completed": 0, "cancelled": 0, "errors": 0}
+
+    def on_text(self, text: str):
+        text = (text or "").strip()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if len(text) < self.min_chars or text == self._last_text:
+                return
+            self._timer = threading.Timer(self.debounce, self._submit, args=(text,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _submit(self, text: str):
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._last_text = text
+            if self._future is not None and self._future.cancel():
+                self.stats["cancelled"] += 1
+            self.stats["scheduled"] += 1
+            self._future = _get_executor().submit(self._run, text, generation)
+
+    def _stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _plan(self, text: str) -> List[Tuple[str, Callable[[], object]]]:
+        orch = self.orchestrator
+        assets = orch._extract_assets(text)
+        modes = orch._decide_modes(text, assets)
+        asset = assets[0] if assets else None
+        steps: List[Tuple[str, Callable[[], object]]] = []
+        if "config" in modes and assets:
+            steps.append(("config", lambda: orch.config_ds.get_asset_configs(assets)))
+        if "metric" in modes and asset:
+            steps.append(("metric", lambda: orch.metric_ds.get_metric_timeseries(asset, metric="cpu_usage", period="1h")))
+        if "graph" in modes and asset:
+            steps.append(("graph", lambda: orch.graph_ds.get_topology_for_asset(asset)))
+        # 매뉴얼 검색과 근거 검색(chat_search) 모두 질의 임베딩을 쓰므로 항상 데움
+        steps.append(("embedding", lambda: _compute_embedding(text)))
+        return steps
+
+    def _run(self, text: str, generation: int):
+        try:
+            for name, step in self._plan(text):
+                if self._stale(generation):
+                    self.stats["cancelled"] += 1
+                    return
+                logger.debug("prefetch %s '%s'", name, text[:40])
+                step()
+            self.stats["completed"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("prefetch 실패 '%s' (%s)", text[:40], e)
+
+    def cancel(self):
+        """전송 시 호출: 대기 중인 타이머만 취소 (이미 실행 중인 조회는 캐시를 채우도록 둠)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._last_text = ""
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._generation += 1
+            if self._future is not None:
+                self._future.cancel()
+            self._future = None
+
+
+def build_prefetcher(orchestrator) -> Optional[Prefetcher]:
+    cfg = _load_settings().get("prefetch", {})
+    if not cfg.get("enabled", True):
+        return None
+    return Prefetcher(orchestrator, debounce_ms=float(cfg.get("debounce_ms", 400)),
+                      min_chars=int(cfg.get("min_chars", 4)))
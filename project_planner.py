@@ -1,7 +1,24 @@
+import bisect
+import heapq
 import json
+import logging
 import os
+import re
+import threading
 import uuid
-from typing import List, Optional, Dict, Any
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+logger = logging.getLogger(__name__)
 
 
 DEFAULT_DATA = [
@@ -68,13 +85,102 @@ DEFAULT_DATA = [
 ]
 
 
-class PlannerStore:
-    """간단한 JSON 기반 CRUD 저장소"""
+_path_locks: Dict[str, threading.RLock] = {}
+_path_locks_guard = threading.Lock()
 
-    def __init__(self, path: str = os.path.join("assets", "planner.json")):
-        self.path = path
-        self._data: List[Dict[str, Any]] = []
-        self._load()
+
+def _thread_lock_for(path: str) -> threading.RLock:
+    """같은 파일을 쓰는 PlannerStore 인스턴스(세션)끼리 공유하는 프로세스 내 락."""
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.RLock()
+        return lock
+
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """프로세스 간 배타 락 (POSIX: flock, Windows: msvcrt.locking)."""
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _fsync_dir(path: str):
+    # rename 자체를 디스크에 반영 (Windows 는 디렉터리 fsync 미지원)
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PlannerConflictError(RuntimeError):
+    """다른 세션이 먼저 수정한 항목을 이전 version 기준으로 수정하려 할 때."""
+
+
+SEARCH_FIELDS = ("title", "owner", "status")
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(text: Any) -> Set[str]:
+    return set(_TERM_RE.findall(str(text or "").lower()))
+
+
+def _order_key(item: Dict[str, Any]):
+    """정렬: order(숫자 우선) -> title"""
+    val = item.get("order", "")
+    try:
+        return (0, int(val)), item.get("title", "")
+    except Exception:
+        return (1, str(val)), item.get("title", "")
+
+
+class BasePlannerStore:
+    """저장 방식과 무관한 planner 메모리 인덱스 + 트리/옵션 구성.
+
+    id -> item(_items), parent_id -> {id: item}(_children) 인덱스를 모든 변경 시 함께 갱신해
+    조회/수정은 O(1), 트리 구성은 한 번의 순회(O(n) + 형제 정렬)로 처리한다.
+    하위 클래스는 _load / add_item / update_item / delete_item / refresh 를 구현하고,
+    변경이 반영되면 _notify(changed, removed) 로 구독자(열린 세션)에게 알린다.
+
+    generation 은 인덱스가 바뀔 때마다 증가한다. 옵션 목록/표 행처럼 전체를 훑는 계산은
+    memoize() 로 generation 단위 캐시해, 여러 세션이 같은 상태를 다시 계산하지 않게 한다.
+    """
+
+    def __init__(self):
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._children: Dict[Optional[str], Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[List[Dict[str, Any]], List[str]], None]] = []
+        self.generation = 0
+        self._memo: Dict[Any, Any] = {}
+        self._memo_generation = -1
+        # 검색 색인: field -> 단어 -> {id}, 접두 검색용 field -> 정렬된 단어 목록
+        self._search_index: Dict[str, Dict[str, Set[str]]] = {f: {} for f in SEARCH_FIELDS}
+        self._sorted_terms: Dict[str, List[str]] = {f: [] for f in SEARCH_FIELDS}
 
     @staticmethod
     def _normalize_parent_id(value):
@@ -87,202 +193,572 @@ class PlannerStore:
             return None
         return value
 
-    def _load(self):
-        if os.path.exists(self.path):
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    self._data = json.load(f)
-                # 부모 ID를 항상 스칼라로 정규화해 dict/set 키 에러 방지
-                changed = False
-                ids = {item.get("id") for item in self._data}
-                for item in self._data:
-                    normalized = self._normalize_parent_id(item.get("parent_id"))
-                    if normalized and normalized not in ids:
-                        normalized = None
-                    if normalized != item.get("parent_id"):
-                        item["parent_id"] = normalized
-                        changed = True
-                    # ensure order field exists
-                    if "order" not in item:
-                        item["order"] = ""
-                        changed = True
-                if changed:
-                    self._save()
-            except Exception:
-                self._data = DEFAULT_DATA.copy()
-        else:
-            self._data = DEFAULT_DATA.copy()
-            # ensure order in defaults
-            for item in self._data:
-                item.setdefault("order", "")
-            self._save()
+    def _normalize_updates(self, updates: Dict[str, Any]) -> Dict[str, Any]:
+        normalized = {
+            k: (self._normalize_parent_id(v) if k == "parent_id" else (str(v).strip() if k == "order" else v))
+            for k, v in updates.items()
+            if v is not None
+        }
+        # id/version 은 저장소가 관리
+        normalized.pop("id", None)
+        normalized.pop("version", None)
+        return normalized
+
+    def _reindex(self, data: List[Dict[str, Any]]):
+        self.generation += 1
+        self._items = {item["id"]: item for item in data}
+        self._children = {}
+        self._search_index = {f: {} for f in SEARCH_FIELDS}
+        for item in self._items.values():
+            # version 이 없는 예전 데이터/DEFAULT_DATA 는 1 부터
+            item.setdefault("version", 1)
+            self._children.setdefault(item.get("parent_id"), {})[item["id"]] = item
+            self._index_terms(item, add=True, keep_sorted=False)
+        self._sorted_terms = {f: sorted(postings) for f, postings in self._search_index.items()}
+
+    def _index_terms(self, item: Dict[str, Any], add: bool, keep_sorted: bool = True):
+        for field in SEARCH_FIELDS:
+            postings = self._search_index[field]
+            terms = self._sorted_terms[field]
+            for term in _terms(item.get(field)):
+                if add:
+                    ids = postings.get(term)
+                    if ids is None:
+                        ids = postings[term] = set()
+                        if keep_sorted:
+                            bisect.insort(terms, term)
+                    ids.add(item["id"])
+                else:
+                    ids = postings.get(term)
+                    if ids is not None:
+                        ids.discard(item["id"])
+                        if not ids:
+                            del postings[term]
+                            pos = bisect.bisect_left(terms, term)
+                            if pos < len(terms) and terms[pos] == term:
+                                del terms[pos]
+
+    def _link(self, item: Dict[str, Any]):
+        self.generation += 1
+        item.setdefault("version", 1)
+        self._items[item["id"]] = item
+        self._children.setdefault(item.get("parent_id"), {})[item["id"]] = item
+        self._index_terms(item, add=True)
+
+    def _unlink(self, item: Dict[str, Any]):
+        self.generation += 1
+        self._index_terms(item, add=False)
+        self._items.pop(item["id"], None)
+        siblings = self._children.get(item.get("parent_id"))
+        if siblings is not None:
+            siblings.pop(item["id"], None)
+            if not siblings:
+                del self._children[item.get("parent_id")]
 
-    def _save(self):
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, ensure_ascii=False, indent=2)
+    def _apply(self, record: Dict[str, Any]):
+        if record.get("op") == "put":
+            item = dict(record["item"])
+            old = self._items.get(item["id"])
+            if old is not None:
+                self._unlink(old)
+            self._link(item)
+        elif record.get("op") == "del":
+            for item_id in record.get("ids", []):
+                item = self._items.get(item_id)
+                if item is not None:
+                    self._unlink(item)
+                self._children.pop(item_id, None)
 
+    def refresh(self):
+        """다른 세션/프로세스의 변경을 메모리 인덱스에 반영 (하위 클래스 구현)."""
+
+    def memoize(self, key: Any, build: Callable[[], Any]) -> Any:
+        """현재 generation 에서 key 로 계산한 값을 재사용 (반환값은 공유되므로 수정 금지)."""
+        self.refresh()
+        with self._lock:
+            if self._memo_generation != self.generation:
+                self._memo.clear()
+                self._memo_generation = self.generation
+            if key not in self._memo:
+                self._memo[key] = build()
+            return self._memo[key]
+
+    # --- 변경 구독 ---
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]], List[str]], None]):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[List[Dict[str, Any]], List[str]], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, changed: List[Dict[str, Any]], removed: List[str]):
+        for cb in list(self._listeners):
+            try:
+                cb(changed, removed)
+            except Exception as e:
+                logger.warning("planner listener 오류 (%s)", e)
+
+    # --- 조회 ---
     def list_items(self) -> List[Dict[str, Any]]:
-        return list(self._data)
+        self.refresh()
+        with self._lock:
+            return list(self._items.values())
 
     def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
-        for item in self._data:
-            if item["id"] == item_id:
-                return dict(item)
-        return None
+        self.refresh()
+        with self._lock:
+            item = self._items.get(item_id)
+            return dict(item) if item is not None else None
 
-    def add_item(self, parent_id: Optional[str], title: str, item_type: str,
-                 status: str, owner: str, due: str, notes: str, order: str = "") -> Dict[str, Any]:
-        new_item = {
-            "id": uuid.uuid4().hex[:8],
-            "parent_id": self._normalize_parent_id(parent_id),
-            "title": title.strip() or "Untitled",
-            "type": item_type,
-            "status": status,
-            "owner": owner,
-            "due": due,
-            "notes": notes,
-            "order": str(order or "").strip(),
-        }
-        self._data.append(new_item)
-        self._save()
-        return new_item
+    def __len__(self):
+        return len(self._items)
 
-    def update_item(self, item_id: str, updates: Dict[str, Any]) -> bool:
-        for item in self._data:
-            if item["id"] == item_id:
-                normalized_updates = {
-                    k: (self._normalize_parent_id(v) if k == "parent_id" else (str(v).strip() if k == "order" else v))
-                    for k, v in updates.items()
-                    if v is not None
-                }
-                item.update(normalized_updates)
-                self._save()
-                return True
-        return False
+    def children_of(self, parent_id: Optional[str]) -> List[Dict[str, Any]]:
+        """정렬된 직계 자식 목록."""
+        return sorted(self._children.get(parent_id, {}).values(), key=_order_key)
 
-    def delete_item(self, item_id: str):
-        # 자식도 함께 제거
-        to_delete = {item_id}
-        changed = True
-        while changed:
-            changed = False
-            for item in list(self._data):
-                if item["parent_id"] in to_delete and item["id"] not in to_delete:
-                    to_delete.add(item["id"])
-                    changed = True
-        self._data = [i for i in self._data if i["id"] not in to_delete]
-        self._save()
+    # --- 지연 트리 ---
+    def child_count(self, item_id: Optional[str]) -> int:
+        return len(self._children.get(item_id, ()))
+
+    def lazy_children(self, parent_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """직계 자식만 (각각 _child_count 포함). 펼칠 때 해당 노드만 조회하는 용도."""
+        self.refresh()
+        with self._lock:
+            return [dict(item, _child_count=self.child_count(item["id"])) for item in self.children_of(parent_id)]
+
+    def expanded_rows(self, expanded: Set[str], parent_id: Optional[str] = None
+                      ) -> List[Tuple[Dict[str, Any], int, int, bool, Tuple[bool, ...]]]:
+        """펼친 노드 아래만 내려가는 깊이 우선 순회.
+
+        (item, depth, child_count, is_last, ancestors_last) 목록. 비용은 전체 크기가 아니라
+        화면에 보이는 행 수에 비례한다.
+        """
+        self.refresh()
+        rows = []
+        with self._lock:
+            stack = [(child, 0, idx == 0, ()) for idx, child in enumerate(reversed(self.children_of(parent_id)))]
+            while stack:
+                item, depth, is_last, ancestors_last = stack.pop()
+                count = self.child_count(item["id"])
+                rows.append((item, depth, count, is_last, ancestors_last))
+                if count and item["id"] in expanded:
+                    children = self.children_of(item["id"])
+                    next_ancestors = ancestors_last + (is_last,)
+                    stack.extend((c, depth + 1, idx == 0, next_ancestors) for idx, c in enumerate(reversed(children)))
+        return rows
+
+    def ancestors(self, item_id: Optional[str]) -> List[str]:
+        """루트부터 부모까지의 id (자기 자신 제외)."""
+        chain = []
+        with self._lock:
+            seen = {item_id}
+            cur = self._items.get(item_id, {}).get("parent_id")
+            while cur is not None and cur in self._items and cur not in seen:
+                chain.append(cur)
+                seen.add(cur)
+                cur = self._items[cur].get("parent_id")
+        return list(reversed(chain))
+
+    def path_of(self, item_id: str, sep: str = " / ") -> str:
+        with self._lock:
+            ids = self.ancestors(item_id) + [item_id]
+            return sep.join(self._items[i]["title"] for i in ids if i in self._items)
+
+    # --- 검색 ---
+    def _match_term(self, fields, term: str) -> Set[str]:
+        """term 으로 시작하는 단어를 가진 항목 id (접두 일치).
+
+        정렬된 단어 목록에서 접두 구간을 bisect 로 찾으므로 전체 어휘를 훑지 않는다.
+        """
+        ids: Set[str] = set()
+        for field in fields:
+            postings = self._search_index[field]
+            terms = self._sorted_terms[field]
+            start = bisect.bisect_left(terms, term)
+            end = bisect.bisect_left(terms, term + "\U0010ffff", start)
+            for word in terms[start:end]:
+                ids |= postings[word]
+        return ids
+
+    def search(self, query: str, limit: int = 200) -> Tuple[List[Dict[str, Any]], int]:
+        """제목/담당/상태 색인 검색. 모든 단어가 맞는 항목(AND), 'owner:infra' 처럼 필드 지정 가능.
+
+        (제목순 상위 limit 건, 전체 일치 수) 를 반환한다.
+        """
+        self.refresh()
+        with self._lock:
+            matched = self.search_ids(query)
+            if not matched:
+                return [], 0
+            items = self._items
+            top = heapq.nsmallest(limit, matched, key=lambda i: (items[i]["title"].lower(), i))
+            return [dict(items[i]) for i in top], len(matched)
+
+    def search_ids(self, query: str) -> Set[str]:
+        """search() 와 같은 규칙으로 일치하는 id 전체 (정렬/복사 없음)."""
+        clauses = []
+        for token in (query or "").split():
+            field, _, value = token.partition(":")
+            if value and field.lower() in SEARCH_FIELDS:
+                clauses += [((field.lower(),), t) for t in _terms(value)]
+            else:
+                clauses += [(SEARCH_FIELDS, t) for t in _terms(token)]
+        matched: Set[str] = set()
+        with self._lock:
+            # 긴 단어(보통 일치가 적음)부터 교집합해 후보를 빨리 줄임
+            for idx, (fields, term) in enumerate(sorted(clauses, key=lambda c: len(c[1]), reverse=True)):
+                ids = self._match_term(fields, term)
+                matched = ids if idx == 0 else matched & ids
+                if not matched:
+                    break
+        return matched
+
+    def _iter_descendants(self, parent_id: str):
+        stack = list(self._children.get(parent_id, {}))
+        while stack:
+            cid = stack.pop()
+            yield cid
+            stack.extend(self._children.get(cid, {}))
 
     def _build_tree(self, parent_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        nodes = []
-        for item in self._data:
-            if item.get("parent_id") == parent_id:
-                child = dict(item)
-                children = self._build_tree(child["id"])
-                if children:
-                    child["_children"] = children
-            nodes.append(child)
-        # 정렬: order(숫자 우선) -> title
-        def _order_key(item):
-            val = item.get("order", "")
-            try:
-                return (0, int(val))
-            except Exception:
-                return (1, str(val))
-        nodes.sort(key=lambda x: (_order_key(x), x.get("title", "")))
-        return nodes
+        """parent_id 아래 서브트리를 _children 중첩 형태로 구성 (각 노드를 한 번만 방문)."""
+        roots: List[Dict[str, Any]] = []
+        stack = [(parent_id, roots)]
+        while stack:
+            pid, out = stack.pop()
+            for item in self.children_of(pid):
+                node = dict(item)
+                out.append(node)
+                if item["id"] in self._children:
+                    node["_children"] = []
+                    stack.append((item["id"], node["_children"]))
+        return roots
 
     def to_tree_rows(self) -> List[Dict[str, Any]]:
         """Tabulator dataTree에서 사용할 형태(_children 포함)로 변환"""
-        return self._build_tree(None)
+        self.refresh()
+        with self._lock:
+            return self._build_tree(None)
+
+    def iter_tree(self, parent_id: Optional[str] = None):
+        """정렬된 깊이 우선 순회. (item, depth, is_last, ancestors_last) 를 낸다 (재귀 없음).
+
+        락을 쥔 채 yield 하지 않도록 순회 결과를 먼저 모은 뒤 내보낸다.
+        """
+        rows = []
+        with self._lock:
+            stack = [(child, 0, idx == 0, ()) for idx, child in enumerate(reversed(self.children_of(parent_id)))]
+            while stack:
+                item, depth, is_last, ancestors_last = stack.pop()
+                rows.append((item, depth, is_last, ancestors_last))
+                children = self.children_of(item["id"])
+                next_ancestors = ancestors_last + (is_last,)
+                stack.extend((c, depth + 1, idx == 0, next_ancestors) for idx, c in enumerate(reversed(children)))
+        yield from rows
+
+    def subtree_index(self) -> Tuple[List[Dict[str, Any]], Dict[str, Tuple[int, int]]]:
+        """정렬된 전위 순회 목록과 id -> [시작, 끝) 구간.
+
+        전위 순회에서 서브트리는 연속 구간이므로, 서브트리 범위 지정/집계는 목록 조각 하나를
+        훑는 것으로 끝난다. generation 단위로 캐시되어 변경이 없으면 다시 만들지 않는다.
+        """
+        return self.memoize("subtree_index", self._subtree_index)
+
+    def _subtree_index(self) -> Tuple[List[Dict[str, Any]], Dict[str, Tuple[int, int]]]:
+        order: List[Dict[str, Any]] = []
+        spans: Dict[str, Tuple[int, int]] = {}
+        stack: List[Tuple[Dict[str, Any], int]] = [(c, -1) for c in reversed(self.children_of(None))]
+        while stack:
+            item, start = stack.pop()
+            if start >= 0:  # 자식까지 모두 방문한 뒤 구간 닫기
+                spans[item["id"]] = (start, len(order))
+                continue
+            stack.append((item, len(order)))
+            order.append(item)
+            stack.extend((c, -1) for c in reversed(self.children_of(item["id"])))
+        return order, spans
+
+    def descendants(self, item_id: Optional[str]) -> set:
+        return self._get_descendants(item_id)
 
     def _get_descendants(self, parent_id: Optional[str]) -> set:
-        """재귀적으로 모든 자손 ID를 찾습니다."""
+        """모든 자손 ID를 찾습니다."""
         # parent_id가 리스트일 수 있는 경우를 대비하여 첫 번째 요소 사용
         if isinstance(parent_id, (list, tuple)):
             parent_id = parent_id[0] if parent_id else None
-        
+
         if not parent_id or not isinstance(parent_id, str):
             return set()
-
-        descendants = set()
-        children_to_check = [item["id"] for item in self._data if item.get("parent_id") == parent_id]
-
-        for child_id in children_to_check:
-            descendants.add(child_id)
-            descendants.update(self._get_descendants(child_id))
-
-        return descendants
+        with self._lock:
+            return set(self._iter_descendants(parent_id))
 
     def parent_options(self, exclude_id: Optional[str] = None) -> List[tuple]:
         """부모로 선택 가능한 옵션을 계층 구조로 반환합니다."""
+        if isinstance(exclude_id, (list, tuple)):
+            exclude_id = exclude_id[0] if exclude_id else None
+        return self.memoize(("parent_options", exclude_id), lambda: self._parent_options(exclude_id))
+
+    def _parent_options(self, exclude_id: Optional[str]) -> List[tuple]:
         opts = [("최상위 (Root)", None)]
-        
-        items_to_render = self._data
-        if exclude_id:
-            if isinstance(exclude_id, (list, tuple)):
-                exclude_id = exclude_id[0] if exclude_id else None
-            exclude_ids = {exclude_id} | self._get_descendants(exclude_id)
-            items_to_render = [item for item in self._data if item["id"] not in exclude_ids]
-
-        def walk(parent_id, depth):
-            children = sorted([i for i in items_to_render if i.get("parent_id") == parent_id], key=lambda x: (x.get("type", ""), x.get("title", "")))
-            for item in children:
-                prefix = "· " * depth
-                opts.append((f"{prefix}{item['title']}", item["id"]))
-                walk(item["id"], depth + 1)
-        
-        walk(None, 0)
+        exclude_ids = {exclude_id} | self._get_descendants(exclude_id) if exclude_id else set()
+        stack = [(None, -1)]
+        while stack:
+            parent_id, depth = stack.pop()
+            if parent_id is not None:
+                item = self._items[parent_id]
+                opts.append((f"{'· ' * depth}{item['title']}", parent_id))
+            children = sorted(self._children.get(parent_id, {}).values(),
+                              key=lambda x: (x.get("type", ""), x.get("title", "")))
+            stack.extend((c["id"], depth + 1) for c in reversed(children) if c["id"] not in exclude_ids)
         return opts
 
     def build_table_rows(self) -> List[Dict[str, Any]]:
         """Tabulator에 표시할 수 있도록 계층 구조를 평탄화하고 텍스트 트리를 만듭니다."""
+        return self.memoize("table_rows", self._build_table_rows)
+
+    def _build_table_rows(self) -> List[Dict[str, Any]]:
         rows = []
-        
-        def _children_map(items):
-            cmap = {}
-            for it in items:
-                cmap.setdefault(it.get("parent_id"), []).append(it)
-            def _order_key(item):
-                val = item.get("order", "")
-                try:
-                    return (0, int(val))
-                except Exception:
-                    return (1, str(val))
-            for v in cmap.values():
-                v.sort(key=lambda x: (_order_key(x), x.get("title", "")))
-            return cmap
-
-        cmap = _children_map(self._data)
-
-        def walk(parent_id, prefix_stack):
-            children = cmap.get(parent_id, [])
-            total = len(children)
-            for idx, child in enumerate(children):
-                is_last = idx == total - 1
-                branch = "└─ " if is_last else "├─ "
-                # widen indent so children sit visibly inside their parent
-                indent = "".join(("        " if p else "│       ") for p in prefix_stack)
-                if prefix_stack:
-                    indent += "        "
-                rows.append({
-                    "id": child["id"],
-                    "title": indent + branch + child["title"],
-                    "order": child.get("order", ""),
-                    "type": child.get("type"),
-                    "status": child.get("status"),
-                    "owner": child.get("owner"),
-                    "due": child.get("due"),
-                })
-                walk(child["id"], prefix_stack + [is_last])
-
-        walk(None, [])
+        for child, _, is_last, prefix_stack in self.iter_tree(None):
+            branch = "└─ " if is_last else "├─ "
+            # widen indent so children sit visibly inside their parent
+            indent = "".join(("        " if p else "│       ") for p in prefix_stack)
+            if prefix_stack:
+                indent += "        "
+            rows.append({
+                "id": child["id"],
+                "title": indent + branch + child["title"],
+                "order": child.get("order", ""),
+                "type": child.get("type"),
+                "status": child.get("status"),
+                "owner": child.get("owner"),
+                "due": child.get("due"),
+            })
         return rows
 
     def build_flat_options(self) -> Dict[str, str]:
         """'선택/수정 대상' 드롭다운을 위한 계층 구조 옵션을 생성합니다."""
-        rows = self.build_table_rows()
         # build_table_rows가 이미 title에 prefix를 적용했으므로 그대로 사용.
-        # 반환 타입을 Dict에서 List[tuple]로 변경하여 unhashable 오류 방지
-        return {row['title']: row['id'] for row in rows}
+        return self.memoize("flat_options", lambda: {row['title']: row['id'] for row in self.build_table_rows()})
+
+    @staticmethod
+    def _new_item(parent_id: Optional[str], title: str, item_type: str, status: str, owner: str,
+                  due: str, notes: str, order: str = "") -> Dict[str, Any]:
+        return {
+            "id": uuid.uuid4().hex[:8],
+            "parent_id": BasePlannerStore._normalize_parent_id(parent_id),
+            "title": title.strip() or "Untitled",
+            "type": item_type,
+            "status": status,
+            "owner": owner,
+            "due": due,
+            "notes": notes,
+            "order": str(order or "").strip(),
+            "version": 1,
+        }
+
+
+class PlannerStore(BasePlannerStore):
+    """JSON 스냅샷 + 추가 전용 저널 기반 CRUD 저장소
+
+    저장은 변경 1건당 저널(<path>.journal)에 JSON 한 줄을 추가하고 fsync 한다.
+    저널이 compact_every 건을 넘으면 스냅샷(<path>)을 임시 파일에 쓰고 원자적으로 교체한 뒤
+    저널을 비운다. 저널 레코드(put/del)는 멱등이라, 교체 직후 저널을 비우기 전에 죽어도
+    재시작 시 스냅샷 + 저널 재생 결과가 같다. 마지막 줄이 잘린 저널은 그 줄만 버린다.
+
+    같은 파일을 여러 세션/프로세스가 열어도 되도록 변경은 파일 락 아래에서
+    다른 쪽이 추가한 저널을 먼저 따라잡은 뒤 적용하고, 조회 전에도 새 저널을 반영한다.
+    """
+
+    def __init__(self, path: str = os.path.join("assets", "planner.json"), compact_every: int = 500):
+        super().__init__()
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self.compact_every = compact_every
+        self._lock = _thread_lock_for(path)
+        self._snapshot_id = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._locked():
+            self._load()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, _file_lock(self.lock_path):
+            yield
+
+    def _stat_snapshot(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        """스냅샷 로드 + 저널 재생 (락 보유 상태에서 호출)."""
+        self._snapshot_id = self._stat_snapshot()
+        self._journal_offset = self._journal_records = 0
+        if self._snapshot_id is None:
+            # ensure order in defaults
+            self._reindex([dict(item, order=item.get("order", "")) for item in DEFAULT_DATA])
+            self._replay_journal(truncate_torn=True)
+            self._compact()
+            return
+        changed = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # 부모 ID를 항상 스칼라로 정규화해 dict/set 키 에러 방지
+            ids = {item.get("id") for item in data}
+            for item in data:
+                normalized = self._normalize_parent_id(item.get("parent_id"))
+                if normalized and normalized not in ids:
+                    normalized = None
+                if normalized != item.get("parent_id"):
+                    item["parent_id"] = normalized
+                    changed = True
+                # ensure order field exists
+                if "order" not in item:
+                    item["order"] = ""
+                    changed = True
+            self._reindex(data)
+        except Exception as e:
+            logger.warning("planner 스냅샷 로드 실패, 기본 데이터 사용 (%s)", e)
+            self._reindex([dict(item) for item in DEFAULT_DATA])
+        self._replay_journal(truncate_torn=True)
+        if changed:
+            self._compact()
+
+    def _replay_journal(self, truncate_torn: bool = False):
+        """저널의 _journal_offset 이후 완결된 줄을 적용."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._journal_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+                self._journal_records += 1
+            except Exception as e:
+                logger.warning("planner 저널 레코드 무시 (%s)", e)
+        self._journal_offset += end
+        if end < len(chunk) and truncate_torn:
+            # 락을 쥔 상태에서 남은 조각은 쓰다 죽은 레코드: 잘라내서 다음 append 와 붙지 않게 함
+            logger.warning("planner 저널 끝의 불완전한 레코드 %d바이트 제거", len(chunk) - end)
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(self._journal_offset)
+                os.fsync(f.fileno())
+
+    def _catch_up(self):
+        """다른 세션/프로세스의 변경 반영 (락 보유 상태에서 호출)."""
+        if self._stat_snapshot() != self._snapshot_id:
+            self._load()
+            return
+        try:
+            size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            size = 0
+        if size < self._journal_offset:
+            self._load()
+        elif size > self._journal_offset:
+            self._replay_journal(truncate_torn=True)
+
+    def refresh(self):
+        """조회 전 호출: 새 저널/스냅샷이 없으면 stat 두 번으로 끝난다."""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.journal_path)
+            except FileNotFoundError:
+                size = 0
+            if size == self._journal_offset and self._stat_snapshot() == self._snapshot_id:
+                return
+        with self._locked():
+            self._catch_up()
+
+    def _append(self, *records: Dict[str, Any]):
+        payload = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        data = payload.encode("utf-8")
+        with open(self.journal_path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_offset += len(data)
+        self._journal_records += len(records)
+
+    def _maybe_compact(self):
+        if self._journal_records >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """스냅샷 원자적 교체 후 저널 비우기 (락 보유 상태에서 호출)."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(list(self._items.values()), ensure_ascii=False, separators=(",", ":")))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
+        with open(self.journal_path, "wb") as f:
+            os.fsync(f.fileno())
+        self._snapshot_id = self._stat_snapshot()
+        self._journal_offset = self._journal_records = 0
+
+    def compact(self):
+        with self._locked():
+            self._catch_up()
+            self._compact()
+
+    def add_item(self, parent_id: Optional[str], title: str, item_type: str,
+                 status: str, owner: str, due: str, notes: str, order: str = "") -> Dict[str, Any]:
+        new_item = self._new_item(parent_id, title, item_type, status, owner, due, notes, order)
+        with self._locked():
+            self._catch_up()
+            self._append({"op": "put", "item": new_item})
+            self._link(new_item)
+            self._maybe_compact()
+        self._notify([dict(new_item)], [])
+        return new_item
+
+    def update_item(self, item_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None) -> bool:
+        """expected_version 을 주면 그 사이 다른 세션이 수정한 경우 PlannerConflictError."""
+        normalized_updates = self._normalize_updates(updates)
+        with self._locked():
+            self._catch_up()
+            item = self._items.get(item_id)
+            if item is None:
+                return False
+            version = int(item.get("version", 1))
+            if expected_version is not None and int(expected_version) != version:
+                raise PlannerConflictError(f"{item_id} 는 다른 세션에서 수정되었습니다 (v{expected_version} -> v{version})")
+            new_parent = normalized_updates.get("parent_id")
+            if new_parent is not None and (new_parent == item_id or new_parent in set(self._iter_descendants(item_id))):
+                raise ValueError("자신이나 하위 노드를 부모로 지정할 수 없습니다.")
+            normalized_updates["version"] = version + 1
+            updated = dict(item, **normalized_updates)
+            self._append({"op": "put", "item": updated})
+            # parent 변경 시 children 인덱스도 옮김
+            self._unlink(item)
+            item.update(normalized_updates)
+            self._link(item)
+            self._maybe_compact()
+        self._notify([updated], [])
+        return True
+
+    def delete_item(self, item_id: str):
+        # 자식도 함께 제거 (children 인덱스로 서브트리만 순회)
+        with self._locked():
+            self._catch_up()
+            if item_id not in self._items:
+                return
+            ids = [item_id] + list(self._iter_descendants(item_id))
+            self._append({"op": "del", "ids": ids})
+            self._apply({"op": "del", "ids": ids})
+            self._maybe_compact()
+        self._notify([], ids)
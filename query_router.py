@@ -0,0 +1,196 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MODES = ("config", "metric", "graph", "manual", "history", "planner")
+DEFAULT_MODES = ["config", "manual"]
+EXAMPLES_PATH = os.path.join("assets", "router_examples.json")
+ASSET_PLACEHOLDER = "{asset}"
+
+_KEYWORDS = {
+    "config": ["구성", "config", "ip", "os", "서버", "장비"],
+    "metric": ["추세", "trend", "시계열", "그래프", "cpu", "latency", "사용률"],
+    "graph": ["연결", "구성도", "topology", "토폴로지", "path"],
+    "manual": ["매뉴얼", "manual", "설명서", "가이드"],
+    "history": ["이력에서", "이전에", "지난 대화", "지난 질의"],
+    "planner": ["플래너", "planner", "진행률", "완료율", "마감", "overdue", "담당자별"],
+}
+
+_PUNCT_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+_DIGIT_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 정규화: 소문자, 숫자 -> 0, 구두점 제거, 공백 정리."""
+    q = _PUNCT_RE.sub(" ", query.lower())
+    q = _DIGIT_RE.sub("0", q)
+    return _SPACE_RE.sub(" ", q).strip()
+
+
+def mask_entities(query: str, entities: Sequence[str] = ()) -> str:
+    """인식된 자산명을 자리표시자로 바꿔 라우팅/캐시가 자산명에 좌우되지 않게 함."""
+    for name in sorted(entities, key=len, reverse=True):
+        query = re.sub(re.escape(name), ASSET_PLACEHOLDER, query, flags=re.IGNORECASE)
+    return query
+
+
+def embed_text(text: str, dim: int = 2048) -> Dict[int, float]:
+    """토큰 단위 문자 2~3-gram 을 해싱한 희소 벡터(L2 정규화). 외부 모델 없이 한글/영문 모두 동작."""
+    vec: Dict[int, float] = {}
+    # 자산 자리표시자는 모드 판단에 정보가 없으므로 제외
+    for token in normalize_query(text.replace(ASSET_PLACEHOLDER, " ")).split():
+        padded = f"<{token}>"
+        grams = [padded[i:i + n] for n in (2, 3) for i in range(len(padded) - n + 1)]
+        grams.append(padded)
+        for g in grams:
+            h = zlib.crc32(g.encode("utf-8")) % dim
+            vec[h] = vec.get(h, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    return {k: v / norm for k, v in vec.items()} if norm else vec
+
+
+def _dot(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class KeywordRouter:
+    """기존 키워드 목록 기반 라우터."""
+
+    def route(self, query: str) -> Optional[List[str]]:
+        q = query.lower()
+        modes = [m for m in MODES if any(k in q for k in _KEYWORDS[m])]
+        return modes or None
+
+
+class CentroidRouter:
+    """라벨된 예시 질의로 모드별 중심 벡터를 만들고, 가까운 중심의 모드를 선택.
+
+    예시 질의의 자산명은 {asset} 자리표시자로 적는다.
+    최고 유사도가 min_score 미만이면 판단을 보류(None)해 다음 라우터로 넘긴다.
+    """
+
+    def __init__(self, examples: Sequence[dict], min_score: float = 0.2, relative: float = 0.85):
+        self.min_score = min_score
+        self.relative = relative
+        sums: Dict[str, Dict[int, float]] = {}
+        for ex in examples:
+            vec = embed_text(ex["query"])
+            for mode in ex["modes"]:
+                acc = sums.setdefault(mode, {})
+                for k, v in vec.items():
+                    acc[k] = acc.get(k, 0.0) + v
+        self.centroids: Dict[str, Dict[int, float]] = {}
+        for mode, acc in sums.items():
+            norm = math.sqrt(sum(v * v for v in acc.values()))
+            self.centroids[mode] = {k: v / norm for k, v in acc.items()} if norm else acc
+
+    @classmethod
+    def from_file(cls, path: str = EXAMPLES_PATH, **kwargs) -> "CentroidRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def scores(self, query: str) -> Dict[str, float]:
+        vec = embed_text(query)
+        return {mode: _dot(vec, c) for mode, c in self.centroids.items()}
+
+    def route(self, query: str) -> Optional[List[str]]:
+        scores = self.scores(query)
+        if not scores:
+            return None
+        best = max(scores.values())
+        if best < self.min_score:
+            return None
+        return [m for m in MODES if scores.get(m, 0.0) >= best * self.relative]
+
+
+class LLMRouter:
+    """LLM 에게 모드 목록(JSON 배열)을 묻는 라우터. 파싱 실패 시 보류."""
+
+    PROMPT = (
+        "다음 질문에 답하려면 어떤 데이터소스가 필요한지 JSON 배열로만 답하세요. "
+        "가능한 값: config(구성정보), metric(시계열), graph(연결성), manual(매뉴얼), history(이전 대화), "
+        "planner(프로젝트 계획 항목의 진행률/담당/마감).\n"
+        "질문: {query}"
+    )
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def route(self, query: str) -> Optional[List[str]]:
+        try:
+            result = self.llm.invoke(self.PROMPT.format(query=query))
+            text = getattr(result, "content", str(result))
+            parsed = json.loads(text[text.index("["):text.rindex("]") + 1])
+            modes = [m for m in MODES if m in parsed]
+            return modes or None
+        except Exception as e:
+            logger.warning("LLMRouter 실패 (%s)", e)
+            return None
+
+
+class RoutingEngine:
+    """라우터 체인 + 정규화 질의 단위 결정 캐시.
+
+    routers 를 순서대로 시도해 처음으로 판단을 내린 결과를 쓰고, 모두 보류하면 DEFAULT_MODES.
+    entities(인식된 자산명)는 자리표시자로 바꾼 뒤 라우팅하므로 자산만 다른 질의는 캐시를 공유한다.
+    """
+
+    def __init__(self, routers: Sequence, normalize: Callable[[str], str] = normalize_query,
+                 cache_size: int = 4096):
+        self.routers = list(routers)
+        self.normalize = normalize
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def route(self, query: str, entities: Sequence[str] = ()) -> List[str]:
+        query = mask_entities(query, entities)
+        key = self.normalize(query)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+        modes = None
+        for router in self.routers:
+            modes = router.route(query)
+            if modes:
+                break
+        modes = modes or list(DEFAULT_MODES)
+        with self._lock:
+            self._cache[key] = modes
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(modes)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def build_default_engine(llm=None, examples_path: str = EXAMPLES_PATH) -> RoutingEngine:
+    """중심 벡터 분류기 -> (LLM) -> 키워드 순서의 기본 라우팅 엔진."""
+    routers: List = []
+    try:
+        routers.append(CentroidRouter.from_file(examples_path))
+    except Exception as e:
+        logger.warning("CentroidRouter 예시 로드 실패, 키워드 라우팅 사용 (%s)", e)
+    if llm is not None:
+        routers.append(LLMRouter(llm))
+    routers.append(KeywordRouter())
+    return RoutingEngine(routers)
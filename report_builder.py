@@ -0,0 +1,221 @@
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORT_SECTIONS = 30
+
+# 섹션 spec 예시
+#   {"kind": "chart", "title": "...", "spec": metric_info(축약)}
+#   {"kind": "topology", "title": "...", "spec": {"graph": graph_info, "positions": {id: [x, y]}}}
+#   {"kind": "table", "title": "...", "spec": {"columns": [...], "rows": [[...], ...]}}
+
+
+def spec_hash(obj: Any) -> str:
+    """섹션(또는 섹션 목록)의 내용 해시. 같은 내용이면 같은 PDF/이미지를 재사용."""
+    payload = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _LRUBytes:
+    """바이트 값 LRU (항목 수 + 총 바이트 상한)."""
+
+    def __init__(self, maxsize: int, max_bytes: int):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = value
+            self._bytes += len(value)
+            while self._items and (len(self._items) > self.maxsize or self._bytes > self.max_bytes):
+                _, dropped = self._items.popitem(last=False)
+                self._bytes -= len(dropped)
+
+
+def render_topology_png(spec: Dict[str, Any], dpi: int = 100) -> io.BytesIO:
+    """채팅의 인터랙티브 뷰와 같은 좌표로 토폴로지 PNG 렌더링."""
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    from topology_layout import build_nx_graph, layout_service
+
+    graph_info = spec["graph"]
+    pos = spec.get("positions") or layout_service.positions(graph_info)
+    pos = {node: tuple(xy) for node, xy in pos.items()}
+    G = build_nx_graph(graph_info)
+    fig = plt.figure(figsize=(6, 4))
+    try:
+        nx.draw(G, pos, with_labels=True, node_color='lightblue', node_size=1200, font_size=8, edge_color='gray')
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi)
+    finally:
+        plt.close(fig)
+    buffer.seek(0)
+    return buffer
+
+
+def _render_image(section: Dict[str, Any], image_cache: Optional[_LRUBytes]) -> bytes:
+    key = spec_hash([section["kind"], section["spec"]])
+    if image_cache is not None:
+        cached = image_cache.get(key)
+        if cached is not None:
+            return cached
+    if section["kind"] == "chart":
+        from metric_chart import render_metric_png
+        data = render_metric_png(section["spec"]).getvalue()
+    else:
+        data = render_topology_png(section["spec"]).getvalue()
+    if image_cache is not None:
+        image_cache.set(key, data)
+    return data
+
+
+def render_report_pdf(sections: Sequence[Dict[str, Any]], image_cache: Optional[_LRUBytes] = None,
+                      generated_at: Optional[str] = None) -> bytes:
+    """섹션 spec 목록으로 PDF 바이트 생성 (이미지는 이 시점에만 렌더링).
+
+    대화 중 만들어진 토폴로지/차트/표가 순서대로 한 섹션씩 들어간다 (최근 이벤트 표는 호출 측이 마지막에 추가).
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Image as PDFImage, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                            rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
+    story = []
+    styles = getSampleStyleSheet()
+
+    story.append(Paragraph("<b>SPA System Report</b>", styles['Title']))
+    story.append(Spacer(1, 20))
+    # Paragraph 는 마크업을 해석하므로 데이터에서 온 문자열은 escape
+    story.append(Paragraph(f"Date: {escape(str(generated_at or time.strftime('%Y-%m-%d %H:%M:%S')))}",
+                           styles['Normal']))
+    story.append(Spacer(1, 20))
+
+    story.append(Paragraph("<b>1. Executive Summary</b>", styles['Heading2']))
+    story.append(Paragraph("Integrated analysis report including topology status, performance trends, and incident logs.", styles['Normal']))
+    story.append(Spacer(1, 20))
+
+    def table_flowable(spec):
+        widths = [80, 100, 120, 80] if len(spec["columns"]) == 4 else None
+        table = Table([spec["columns"]] + spec["rows"], colWidths=widths)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ]))
+        return table
+
+    number = 2
+    kinds = {s["kind"] for s in sections}
+    placeholders = [("topology", "Network Topology", "(No topology generated)"),
+                    ("chart", "Performance Trends", "(No trend chart generated)")]
+    for kind, heading, text in placeholders:
+        if kind not in kinds:
+            story.append(Paragraph(f"<b>{number}. {heading}</b>", styles['Heading2']))
+            story.append(Paragraph(text, styles['Italic']))
+            story.append(Spacer(1, 20))
+            number += 1
+
+    for section in sections:
+        story.append(Paragraph(f"<b>{number}. {escape(str(section['title']))}</b>", styles['Heading2']))
+        story.append(Spacer(1, 10))
+        try:
+            if section["kind"] == "table":
+                story.append(table_flowable(section["spec"]))
+            else:
+                height = 200 if section["kind"] == "chart" else 250
+                story.append(PDFImage(io.BytesIO(_render_image(section, image_cache)), width=400, height=height))
+        except Exception as e:
+            logger.warning("report section 렌더링 실패 %s (%s)", section.get("title"), e)
+            story.append(Paragraph("(Image Error)", styles['Normal']))
+        story.append(Spacer(1, 20))
+        number += 1
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+class ReportRenderer:
+    """PDF 를 요청 시점에만 만들고, 섹션 내용 해시 단위로 PDF/이미지를 캐시.
+
+    같은 대화 내용으로 다시 받으면 캐시된 PDF 를, 섹션이 하나 늘었으면
+    기존 섹션 이미지는 캐시에서 꺼내 새 섹션만 렌더링한다.
+    """
+
+    def __init__(self, max_reports: int = 32, max_report_bytes: int = 64 * 1024 * 1024,
+                 max_images: int = 256, max_image_bytes: int = 64 * 1024 * 1024):
+        self.pdf_cache = _LRUBytes(max_reports, max_report_bytes)
+        self.image_cache = _LRUBytes(max_images, max_image_bytes)
+
+    def render(self, sections: Sequence[Dict[str, Any]]) -> io.BytesIO:
+        key = spec_hash(list(sections))
+        data = self.pdf_cache.get(key)
+        if data is None:
+            start = time.perf_counter()
+            data = render_report_pdf(sections, self.image_cache)
+            self.pdf_cache.set(key, data)
+            logger.info("report rendered: %d sections, %d bytes, %.0fms",
+                        len(sections), len(data), (time.perf_counter() - start) * 1000)
+        return io.BytesIO(data)
+
+
+class ReportSections:
+    """세션 대화에서 만들어진 리포트 섹션 spec 목록 (최근 max_sections 개)."""
+
+    def __init__(self, max_sections: int = MAX_REPORT_SECTIONS):
+        self.max_sections = max_sections
+        self._sections: List[Dict[str, Any]] = []
+        self._last_hash: Optional[str] = None
+
+    def add(self, kind: str, title: str, spec: Dict[str, Any]):
+        section = {"kind": kind, "title": title, "spec": spec}
+        digest = spec_hash([kind, spec])
+        if digest == self._last_hash:  # 같은 그림을 연달아 요청한 경우
+            return
+        self._last_hash = digest
+        self._sections.append(section)
+        del self._sections[:-self.max_sections]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return list(self._sections)
+
+    def clear(self):
+        self._sections = []
+        self._last_hash = None
+
+    def __len__(self):
+        return len(self._sections)
+
+
+report_renderer = ReportRenderer()
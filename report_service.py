@@ -0,0 +1,214 @@
+import io
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from report_builder import report_renderer, spec_hash
+
+logger = logging.getLogger(__name__)
+
+
+class ReportLimitError(RuntimeError):
+    """사용자별 동시 리포트 생성 한도 초과."""
+
+
+def _init_worker(rc: Dict[str, Any]):
+    # spawn 된 워커: GUI 없는 백엔드 + 메인 프로세스와 같은 폰트 설정
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.rcParams.update(rc)
+
+
+def _render_in_worker(sections: List[Dict[str, Any]]) -> bytes:
+    """워커 프로세스에서 실행. 워커마다 report_renderer 이미지 캐시가 유지된다."""
+    from report_builder import render_report_pdf
+    return render_report_pdf(sections, report_renderer.image_cache)
+
+
+class ReportJob:
+    """UI 가 폴링하는 리포트 작업 핸들."""
+
+    QUEUED, RUNNING, DONE, ERROR = "queued", "running", "done", "error"
+
+    def __init__(self, user: str, key: str, sections: int):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.key = key
+        self.sections = sections
+        self.status = self.QUEUED
+        self.submitted = time.time()
+        self.finished: Optional[float] = None
+        self.data: Optional[bytes] = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (self.DONE, self.ERROR)
+
+    def result(self) -> io.BytesIO:
+        if self.status != self.DONE:
+            raise RuntimeError(f"report {self.id} 는 아직 완료되지 않음 ({self.status})")
+        return io.BytesIO(self.data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "user": self.user, "status": self.status, "sections": self.sections,
+            "elapsed": round((self.finished or time.time()) - self.submitted, 3),
+            "bytes": len(self.data) if self.data else 0, "error": self.error,
+        }
+
+
+class ReportService:
+    """PDF 리포트를 서버 프로세스 밖(프로세스 풀)에서 렌더링하는 서비스.
+
+    - submit() 은 바로 ReportJob 을 돌려주고, UI 는 status 를 폴링하다 완료되면 result() 로 받는다
+    - 같은 내용의 리포트는 report_renderer.pdf_cache 에서 즉시 완료
+    - 사용자별 진행 중 작업 수를 per_user_limit 으로 제한
+    - 완료된 작업은 job_ttl 초 뒤 정리
+    프로세스 풀을 만들 수 없는 환경에서는 스레드 풀로 대체한다.
+    """
+
+    def __init__(self, workers: int = 2, per_user_limit: int = 1, job_ttl: float = 600,
+                 use_processes: bool = True, rc: Optional[Dict[str, Any]] = None):
+        self.workers = workers
+        self.per_user_limit = per_user_limit
+        self.job_ttl = job_ttl
+        self.use_processes = use_processes
+        self.rc = rc or {}
+        self._pool: Optional[Executor] = None
+        self._jobs: Dict[str, ReportJob] = {}
+        self._inflight: Dict[str, ReportJob] = {}  # 같은 내용 동시 요청은 한 번만 렌더링
+        self._lock = threading.Lock()
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self._create_pool()
+        return self._pool
+
+    def _create_pool(self) -> Executor:
+        if self.use_processes:
+            try:
+                # Panel 서버는 다중 스레드라 fork 대신 spawn
+                return ProcessPoolExecutor(max_workers=self.workers,
+                                           mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=_init_worker, initargs=(self.rc,))
+            except Exception as e:
+                logger.warning("리포트 프로세스 풀 생성 실패, 스레드 풀 사용 (%s)", e)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report")
+
+    def active_jobs(self, user: str) -> List[ReportJob]:
+        with self._lock:
+            return [j for j in self._jobs.values() if j.user == user and not j.done]
+
+    def submit(self, user: str, sections: Sequence[Dict[str, Any]]) -> ReportJob:
+        self._purge()
+        sections = list(sections)
+        key = spec_hash(sections)
+        job = ReportJob(user, key, len(sections))
+        cached = report_renderer.pdf_cache.get(key)
+        if cached is not None:
+            job.status, job.data, job.finished = ReportJob.DONE, cached, time.time()
+            with self._lock:
+                self._jobs[job.id] = job
+            return job
+
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j.user == user and not j.done)
+            if active >= self.per_user_limit:
+                raise ReportLimitError(f"진행 중인 리포트가 {active}건 있습니다 (최대 {self.per_user_limit}건)")
+            self._jobs[job.id] = job
+            leader = self._inflight.get(key)
+            if leader is None:
+                self._inflight[key] = job
+        if leader is not None:
+            # 같은 내용을 렌더링 중인 작업이 있으면 그 결과를 함께 받음
+            threading.Thread(target=self._follow, args=(leader, job), daemon=True).start()
+            return job
+
+        job.status = ReportJob.RUNNING
+        try:
+            future = self._executor().submit(_render_in_worker, sections)
+        except Exception as e:  # BrokenProcessPool 등
+            logger.warning("리포트 프로세스 풀 사용 불가, 스레드 풀로 전환 (%s)", e)
+            with self._lock:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report")
+            future = self._pool.submit(_render_in_worker, sections)
+        future.add_done_callback(lambda f: self._complete(job, f))
+        return job
+
+    def _complete(self, job: ReportJob, future):
+        try:
+            job.data = future.result()
+            report_renderer.pdf_cache.set(job.key, job.data)
+            job.status = ReportJob.DONE
+        except Exception as e:
+            logger.warning("report 렌더링 실패 %s (%s)", job.id, e)
+            job.error = str(e)
+            job.status = ReportJob.ERROR
+        job.finished = time.time()
+        with self._lock:
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+        logger.info("report %s %s: %d sections in %.2fs", job.id, job.status, job.sections,
+                    job.finished - job.submitted)
+
+    def _follow(self, leader: ReportJob, job: ReportJob, poll: float = 0.05):
+        job.status = ReportJob.RUNNING
+        while not leader.done:
+            time.sleep(poll)
+        job.data, job.error, job.status = leader.data, leader.error, leader.status
+        job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _purge(self):
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.done and j.finished < cutoff]:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts: Dict[str, int] = {}
+        for j in jobs:
+            counts[j.status] = counts.get(j.status, 0) + 1
+        return {"workers": self.workers, "processes": isinstance(self._pool, ProcessPoolExecutor),
+                "jobs": counts, "pdf_cache_hits": report_renderer.pdf_cache.hits}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_report_service: Optional[ReportService] = None
+_report_service_lock = threading.Lock()
+
+
+def get_report_service() -> ReportService:
+    global _report_service
+    if _report_service is None:
+        with _report_service_lock:
+            if _report_service is None:
+                # 워커 프로세스가 이 모듈을 import 할 때 DB 드라이버까지 끌어오지 않도록 지연 import
+                from data_sources import _load_settings
+                cfg = _load_settings().get("report", {})
+                rc = {"font.family": cfg.get("font_family", "Malgun Gothic"), "axes.unicode_minus": False}
+                _report_service = ReportService(
+                    workers=int(cfg.get("workers", 2)),
+                    per_user_limit=int(cfg.get("per_user_limit", 1)),
+                    job_ttl=float(cfg.get("job_ttl", 600)),
+                    use_processes=bool(cfg.get("use_processes", True)),
+                    rc=rc,
+                )
+    return _report_service
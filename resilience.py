@@ -0,0 +1,238 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷이 열려 있어 호출을 시도하지 않고 바로 실패."""
+
+
+class CallTimeoutError(TimeoutError):
+    """호출이 deadline 안에 끝나지 않음."""
+
+
+class CircuitBreaker:
+    """연속 실패 failure_threshold 회면 open, reset_timeout 후 half_open 에서 한 번 시험 호출.
+
+    시험 호출이 성공하면 closed, 실패하면 다시 open.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe = False
+            if self.state == self.HALF_OPEN and not self._probe:
+                self._probe = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    logger.warning("circuit open (연속 실패 %d회)", self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe = False
+
+
+class _LatencyWindow:
+    """최근 성공 호출 지연(초)의 이동 창. 헤지 기준 백분위 계산용."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class ResiliencePolicy:
+    """LLM/임베딩 같은 외부 호출에 공통으로 적용하는 보호 정책.
+
+    - timeout: 시도당 deadline (초). 넘으면 CallTimeoutError
+    - retries: 추가 재시도 횟수, backoff_base * 2^n 상한 backoff_max 의 full jitter 대기
+    - hedge_percentile: 최근 지연의 해당 백분위를 넘기면 같은 호출을 하나 더 보내 먼저 끝난 결과 사용
+    - 서킷 브레이커가 열려 있으면 CircuitOpenError 로 즉시 실패 → 호출 측이 fallback 처리
+
+    deadline 은 풀에 제출한 시점부터 잰다 (풀 대기 시간 포함). deadline 까지 시작하지 못한 시도는
+    취소하고 CallTimeoutError 로 실패하므로, 풀이 밀린 시도로 가득 차도 호출자가 무한정 기다리지 않는다.
+    지연 통계(헤지 기준)는 실제 실행 시작부터 잰다.
+    max_workers 는 동시에 들어올 수 있는 호출 수(예: 배처의 max_concurrency * max_batch_size) 이상으로 둘 것.
+    파이썬 스레드는 강제 종료할 수 없으므로 deadline 을 넘긴 시도는 백그라운드에서 끝날 때까지 돌지만,
+    호출자는 기다리지 않는다. 하위 클라이언트 자체 timeout 도 함께 설정할 것.
+    """
+
+    def __init__(self, name: str, timeout: float = 30.0, retries: int = 1, backoff_base: float = 0.2,
+                 backoff_max: float = 2.0, hedge_percentile: Optional[float] = None,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, max_workers: int = 16):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = _LatencyWindow()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"resilience-{name}")
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0,
+                         "retries": 0, "hedges": 0, "hedge_wins": 0, "rejected": 0}
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.counters[key] += n
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self._count("calls")
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError(f"{self.name} circuit open") from last_error
+            if attempt:
+                self._count("retries")
+                cap = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+                time.sleep(random.uniform(0, cap))
+            try:
+                result = self._attempt(fn, args, kwargs)
+            except Exception as e:
+                last_error = e
+                if isinstance(e, CallTimeoutError):
+                    self._count("timeouts")
+                self.breaker.record_failure()
+                logger.warning("%s 호출 실패 (시도 %d/%d): %s", self.name, attempt + 1, self.retries + 1, e)
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+        self._count("failures")
+        raise last_error
+
+    def _submit(self, fn, args, kwargs):
+        """풀에 제출하고, 작업 스레드가 실행을 시작한 시각(monotonic)을 담을 목록을 함께 돌려줌."""
+        started = threading.Event()
+        started_at = []
+
+        def run():
+            started_at.append(time.monotonic())
+            started.set()
+            return fn(*args, **kwargs)
+
+        return self._executor.submit(run), started, started_at
+
+    def _timeout(self, futures, detail: str = "") -> CallTimeoutError:
+        # 아직 풀에서 기다리는 시도는 취소 (이미 실행 중이면 백그라운드에서 끝남)
+        for fut in futures:
+            fut.cancel()
+        return CallTimeoutError(f"{self.name} {self.timeout:.1f}s 초과{detail}")
+
+    def _attempt(self, fn, args, kwargs):
+        deadline = time.monotonic() + self.timeout
+        primary, started, started_at = self._submit(fn, args, kwargs)
+        if not started.wait(self.timeout):
+            raise self._timeout([primary], " (작업 풀 대기)")
+        hedge_after = self.latency.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        if hedge_after is None or started_at[0] + hedge_after >= deadline:
+            try:
+                result = primary.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                raise self._timeout([primary]) from None
+            self.latency.add(time.monotonic() - started_at[0])
+            return result
+
+        done, _ = wait([primary], timeout=max(0.0, started_at[0] + hedge_after - time.monotonic()))
+        if done:
+            result = primary.result()
+            self.latency.add(time.monotonic() - started_at[0])
+            return result
+        self._count("hedges")
+        hedge, _, hedge_started = self._submit(fn, args, kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise self._timeout(pending, " (hedged)")
+            for fut in done:
+                if fut.exception() is None:
+                    if fut is hedge:
+                        self._count("hedge_wins")
+                    began = hedge_started[0] if fut is hedge else started_at[0]
+                    self.latency.add(time.monotonic() - began)
+                    return fut.result()
+            error = next(iter(done)).exception()
+        raise error
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        p50 = self.latency.percentile(50, min_samples=1)
+        p95 = self.latency.percentile(95, min_samples=1)
+        return {
+            **counters,
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "trips": self.breaker.trips,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+_policies: Dict[str, ResiliencePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(name: str, **defaults) -> ResiliencePolicy:
+    """이름별 프로세스 공용 정책. 최초 호출 시 인자로 생성."""
+    policy = _policies.get(name)
+    if policy is None:
+        with _policies_lock:
+            policy = _policies.get(name)
+            if policy is None:
+                policy = _policies[name] = ResiliencePolicy(name, **defaults)
+    return policy
+
+
+def resilience_metrics() -> Dict[str, Dict[str, Any]]:
+    with _policies_lock:
+        policies = list(_policies.values())
+    return {p.name: p.snapshot() for p in policies}
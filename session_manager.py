@@ -0,0 +1,154 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """컨테이너를 따라가며 대략적인 메모리 사용량(byte)을 계산."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if hasattr(obj, "getbuffer"):  # BytesIO
+        try:
+            return sys.getsizeof(obj) + obj.getbuffer().nbytes
+        except Exception:
+            return sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    return size
+
+
+class _SessionEntry:
+    __slots__ = ("key", "bot", "created", "last_active", "spilled", "cleanups")
+
+    def __init__(self, key: str, bot):
+        self.key = key
+        self.bot = bot
+        self.created = self.last_active = time.time()
+        self.spilled = False
+        self.cleanups: List[Callable[[], None]] = []
+
+
+class SessionManager:
+    """Panel 세션별 상태(AIOpsChatbot 등)의 수명 주기 관리.
+
+    - touch() 로 마지막 활동 시각을 갱신
+    - idle_timeout 동안 활동이 없으면 로그를 디스크로 내보내고 PNG 버퍼 등을 해제
+    - Panel on_session_destroyed 에서 destroy() 를 호출해 모든 참조를 정리
+    - report() 로 세션별/전체 메모리 사용량 확인
+    """
+
+    def __init__(self, spill_dir: str = os.path.join("data", "sessions"),
+                 idle_timeout: float = 1800, sweep_interval: float = 60):
+        self.spill_dir = spill_dir
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._sessions: Dict[str, _SessionEntry] = {}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, key: str, bot) -> _SessionEntry:
+        entry = _SessionEntry(key, bot)
+        with self._lock:
+            self._sessions[key] = entry
+        self._start_sweeper()
+        return entry
+
+    def add_cleanup(self, key: str, fn: Callable[[], None]):
+        """세션 종료 시 함께 호출할 정리 함수 (UI 위젯 목록 비우기 등)."""
+        with self._lock:
+            entry = self._sessions.get(key)
+        if entry:
+            entry.cleanups.append(fn)
+
+    def touch(self, key: str):
+        with self._lock:
+            entry = self._sessions.get(key)
+        if entry is None:
+            return
+        entry.last_active = time.time()
+        if entry.spilled:
+            entry.bot.restore_logs()
+            entry.spilled = False
+
+    def spill(self, key: str):
+        """세션 상태를 디스크로 내보내 메모리를 비움 (다음 touch 시 복원)."""
+        with self._lock:
+            entry = self._sessions.get(key)
+        if entry is None or entry.spilled:
+            return
+        try:
+            entry.bot.spill_logs(os.path.join(self.spill_dir, f"{key}.json"))
+            entry.spilled = True
+        except Exception as e:
+            logger.warning("session spill 실패 %s (%s)", key, e)
+
+    def destroy(self, key: str):
+        with self._lock:
+            entry = self._sessions.pop(key, None)
+        if entry is None:
+            return
+        for fn in entry.cleanups:
+            try:
+                fn()
+            except Exception as e:
+                logger.warning("session cleanup 실패 %s (%s)", key, e)
+        try:
+            entry.bot.close()
+        except Exception as e:
+            logger.warning("session close 실패 %s (%s)", key, e)
+        logger.info("session destroyed %s", key)
+
+    def sweep(self):
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            idle = [k for k, e in self._sessions.items() if e.last_active < cutoff and not e.spilled]
+        for key in idle:
+            self.spill(key)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._sessions.values())
+        now = time.time()
+        sessions = []
+        for e in entries:
+            sessions.append({
+                "session": e.key,
+                "bytes": e.bot.memory_usage(),
+                "idle_seconds": round(now - e.last_active, 1),
+                "age_seconds": round(now - e.created, 1),
+                "spilled": e.spilled,
+            })
+        sessions.sort(key=lambda s: s["bytes"], reverse=True)
+        return {
+            "sessions": sessions,
+            "count": len(sessions),
+            "total_bytes": sum(s["bytes"] for s in sessions),
+        }
+
+    def _start_sweeper(self):
+        if self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+
+            def loop():
+                while not self._stop.wait(self.sweep_interval):
+                    self.sweep()
+
+            self._sweeper = threading.Thread(target=loop, name="session-sweeper", daemon=True)
+            self._sweeper.start()
+
+
+session_manager = SessionManager()
@@ -0,0 +1,135 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+
+from data_sources import _load_settings
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "다음은 AIOps 장애 조사 대화의 이전 요약과 이어지는 대화입니다. "
+    "자산명, 수치, 원인 가설, 확인된 사실, 남은 조치를 중심으로 {max_chars}자 이내의 한국어 요약으로 갱신하세요.\n\n"
+    "[이전 요약]\n{previous}\n\n[이어지는 대화]\n{dialogue}"
+)
+
+
+def _format_dialogue(messages: Sequence[BaseMessage], per_message_chars: int = 600) -> str:
+    lines = []
+    for m in messages:
+        role = "사용자" if m.type == "human" else "어시스턴트"
+        text = " ".join(str(m.content).split())
+        lines.append(f"{role}: {text[:per_message_chars]}")
+    return "\n".join(lines)
+
+
+def extractive_summary(previous: str, messages: Sequence[BaseMessage], max_chars: int = 1500) -> str:
+    """LLM 없이 쓰는 요약: 사용자 질문과 답변 첫 문장을 이어 붙이고 오래된 쪽부터 잘라냄."""
+    lines = [previous] if previous else []
+    for m in messages:
+        text = " ".join(str(m.content).split())
+        if m.type == "human":
+            lines.append(f"- Q: {text[:200]}")
+        elif text:
+            lines.append(f"  A: {text.split('. ')[0][:200]}")
+    summary = "\n".join(lines)
+    return summary[-max_chars:]
+
+
+class LLMSummarizer:
+    """LLM 으로 이전 요약 + 새 대화를 하나의 요약으로 접음. 실패 시 추출 요약으로 대체."""
+
+    def __init__(self, llm, max_chars: int = 1500):
+        self.llm = llm
+        self.max_chars = max_chars
+
+    def __call__(self, previous: str, messages: Sequence[BaseMessage]) -> str:
+        prompt = SUMMARY_PROMPT.format(max_chars=self.max_chars, previous=previous or "(없음)",
+                                       dialogue=_format_dialogue(messages))
+        try:
+            result = self.llm.invoke(prompt)
+            text = getattr(result, "content", str(result)).strip()
+            if text:
+                return text[:self.max_chars]
+        except Exception as e:
+            logger.warning("대화 요약 LLM 호출 실패, 추출 요약 사용 (%s)", e)
+        return extractive_summary(previous, messages, self.max_chars)
+
+
+class SummaryMemory:
+    """세션별 롤링 요약.
+
+    요약 이후 쌓인 메시지가 summarize_after 건을 넘으면, 최근 keep_recent 건을 남기고
+    나머지를 기존 요약에 접어 넣는다. 요약은 백그라운드 스레드에서 수행되어 응답 지연에 영향이 없고,
+    프롬프트에는 PersistentChatMessageHistory 가 [요약] + 요약 이후 메시지만 넣으므로
+    세션이 길어져도 프롬프트 크기가 일정하게 유지된다.
+    """
+
+    def __init__(self, store, summarize_fn: Optional[Callable[[str, List[BaseMessage]], str]] = None,
+                 summarize_after: int = 12, keep_recent: int = 6, max_summary_chars: int = 1500):
+        self.store = store
+        self.max_summary_chars = max_summary_chars
+        self.summarize_fn = summarize_fn or (
+            lambda previous, messages: extractive_summary(previous, messages, max_summary_chars)
+        )
+        self.summarize_after = summarize_after
+        self.keep_recent = keep_recent
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary-memory")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, session_id: str):
+        """필요하면 요약 작업을 백그라운드에 예약 (세션당 동시에 하나만)."""
+        with self._lock:
+            if session_id in self._pending:
+                return
+            self._pending.add(session_id)
+        try:
+            self._executor.submit(self._run, session_id)
+        except RuntimeError:  # 종료된 executor
+            with self._lock:
+                self._pending.discard(session_id)
+
+    def _run(self, session_id: str):
+        try:
+            self.summarize(session_id)
+        except Exception as e:
+            logger.warning("세션 요약 실패 %s (%s)", session_id, e)
+        finally:
+            with self._lock:
+                self._pending.discard(session_id)
+
+    def summarize(self, session_id: str) -> bool:
+        """요약 조건을 만족하면 요약을 갱신하고 True 반환."""
+        previous, upto_id = self.store.get_summary(session_id)
+        pending = self.store.count_messages(session_id, after_id=upto_id)
+        if pending <= self.summarize_after:
+            return False
+        rows = self.store.load_messages_with_ids(session_id, limit=pending, after_id=upto_id)
+        fold = rows[:len(rows) - self.keep_recent]
+        # 질문/답변 쌍이 갈리지 않도록 남기는 구간은 사용자 메시지로 시작
+        while fold and fold[-1][1].type == "human":
+            fold.pop()
+        if not fold:
+            return False
+        summary = self.summarize_fn(previous, [m for _, m in fold])
+        self.store.set_summary(session_id, summary, fold[-1][0])
+        logger.info("session %s 요약 갱신: %d건 반영 (%d자)", session_id, len(fold), len(summary))
+        return True
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def build_summary_memory(store, llm=None) -> SummaryMemory:
+    cfg = _load_settings().get("history", {})
+    max_chars = int(cfg.get("max_summary_chars", 1500))
+    return SummaryMemory(
+        store,
+        summarize_fn=LLMSummarizer(llm, max_chars) if llm is not None else None,
+        summarize_after=int(cfg.get("summarize_after", 12)),
+        keep_recent=int(cfg.get("keep_recent", 6)),
+        max_summary_chars=max_chars,
+    )
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import networkx as nx
+
+Positions = Dict[str, Tuple[float, float]]
+
+
+def graph_hash(graph_info) -> str:
+    """노드/엣지 구성이 같으면 같은 값을 주는 토폴로지 해시."""
+    nodes = sorted(str(n["id"]) for n in graph_info.get("nodes", []))
+    edges = sorted((str(e[0]), str(e[1])) for e in graph_info.get("edges", []))
+    payload = json.dumps([nodes, edges], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def build_nx_graph(graph_info) -> nx.DiGraph:
+    G = nx.DiGraph()
+    for node in graph_info.get("nodes", []):
+        G.add_node(node["id"])
+    for edge in graph_info.get("edges", []):
+        G.add_edge(edge[0], edge[1])
+    return G
+
+
+class TopologyLayoutService:
+    """토폴로지별 노드 좌표를 한 번만 계산해 캐시.
+
+    좌표는 [-1, 1] 범위로 정규화되며, 인터랙티브 뷰(physics off)와 PDF 렌더가
+    같은 좌표를 사용해 동일한 그림을 그립니다.
+
+    힘 기반 배치(spring/forceatlas2)는 반복마다 모든 노드 쌍을 계산하는 O(n²) 이므로
+    large_graph_threshold 를 넘으면 반복 횟수를 pair_budget / n² 으로 줄이고,
+    max_force_nodes 를 넘으면 힘 기반 배치 대신 스펙트럴(희소 고유벡터) 배치를 쓴다.
+    """
+
+    def __init__(self, maxsize: int = 256, large_graph_threshold: int = 500, seed: int = 42,
+                 max_force_nodes: int = 3000, pair_budget: float = 2e8):
+        self.maxsize = maxsize
+        self.large_graph_threshold = large_graph_threshold
+        self.max_force_nodes = max_force_nodes
+        self.pair_budget = pair_budget
+        self.seed = seed
+        self._cache: "OrderedDict[str, Positions]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _compute(self, G: nx.DiGraph) -> Positions:
+        n = G.number_of_nodes()
+        if n == 0:
+            return {}
+        if n == 1:
+            return {next(iter(G.nodes)): (0.0, 0.0)}
+        U = G.to_undirected(as_view=True)
+        if n <= self.large_graph_threshold:
+            pos = nx.spring_layout(U, seed=self.seed, iterations=50)
+        elif n > self.max_force_nodes:
+            pos = self._spectral(U)
+        else:
+            # 반복당 O(n²) 이므로 전체 연산량이 pair_budget 안에 들도록 반복 횟수 제한
+            iterations = int(max(5, min(60, self.pair_budget // (n * n))))
+            if hasattr(nx, "forceatlas2_layout"):  # networkx>=3.4 (밀집 O(n²) 구현)
+                pos = nx.forceatlas2_layout(U, seed=self.seed, max_iter=iterations, dissuade_hubs=True)
+                pos = nx.rescale_layout_dict(pos)
+            else:
+                pos = nx.spring_layout(U, seed=self.seed, iterations=iterations, threshold=1e-3)
+        return {node: (float(xy[0]), float(xy[1])) for node, xy in pos.items()}
+
+    @staticmethod
+    def _spectral(U) -> Dict:
+        """반복 없는 배치. scipy 가 없거나 그래프가 끊겨 있어 실패하면 원형 배치."""
+        try:
+            return nx.spectral_layout(U)
+        except Exception:
+            return nx.circular_layout(U)
+
+    def positions(self, graph_info) -> Positions:
+        key = graph_hash(graph_info)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        pos = self._compute(build_nx_graph(graph_info))
+        with self._lock:
+            self._cache[key] = pos
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return pos
+
+    @staticmethod
+    def to_pixels(pos: Positions, scale: float = 300.0) -> Dict[str, Tuple[int, int]]:
+        """vis-network 용 픽셀 좌표 (화면 좌표계라 y 를 뒤집음)."""
+        return {node: (int(x * scale), int(-y * scale)) for node, (x, y) in pos.items()}
+
+
+layout_service = TopologyLayoutService()
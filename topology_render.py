@@ -0,0 +1,90 @@
+import html
+import json
+import logging
+import os
+from string import Template
+
+logger = logging.getLogger(__name__)
+
+# vis-network 는 static_dirs 의 assets 로 한 번만 서빙되고 브라우저 캐시를 탄다.
+# 로드에 실패하면 onerror 로 CDN 을 사용. 파일은 저장소에 없으므로 README 의 받는 방법 참고.
+VIS_NETWORK_LOCAL = os.path.join("assets", "vendor", "vis-network.min.js")
+VIS_NETWORK_JS = os.getenv("VIS_NETWORK_JS", "/assets/vendor/vis-network.min.js")
+VIS_NETWORK_CDN = "https://unpkg.com/vis-network@9.1.9/standalone/umd/vis-network.min.js"
+
+
+def check_vis_network() -> bool:
+    """서버 시작 시 1회: 로컬 vis-network 파일 확인.
+
+    없으면 경고를 남기고 CDN 을 직접 쓰도록 바꿔, 토폴로지마다 404 후 fallback 하지 않게 한다.
+    VIS_NETWORK_JS 를 지정한 경우는 그대로 둔다.
+    """
+    global VIS_NETWORK_JS
+    if os.getenv("VIS_NETWORK_JS") or os.path.isfile(VIS_NETWORK_LOCAL):
+        return True
+    logger.warning("%s 없음: 토폴로지 뷰가 CDN(%s)에서 vis-network 를 받음 "
+                   "(오프라인 환경에서는 표시 안 됨, README 'Topology View' 참고)", VIS_NETWORK_LOCAL, VIS_NETWORK_CDN)
+    VIS_NETWORK_JS = VIS_NETWORK_CDN
+    return False
+FONT_AWESOME_CSS = "/assets/font-awesome.min.css"
+
+_TOPOLOGY_TEMPLATE = Template("""<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<link rel="stylesheet" href="$fa_css">
+<style>html,body{margin:0;height:100%;}#net{width:100%;height:${height}px;}</style>
+</head><body><div id="net"></div>
+<script>
+function draw(){
+  var data = {nodes: new vis.DataSet($nodes), edges: new vis.DataSet($edges)};
+  new vis.Network(document.getElementById("net"), data, {
+    physics: false,
+    interaction: {hover: true},
+    edges: {color: "#999", smooth: false}
+  });
+}
+function fallback(){
+  var s = document.createElement("script");
+  s.src = "$vis_cdn"; s.onload = draw; document.head.appendChild(s);
+}
+</script>
+<script src="$vis_js" onload="draw()" onerror="fallback()"></script>
+</body></html>""")
+
+
+def _script_json(value) -> str:
+    # </script> 종료 방지
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+
+def topology_payload(graph_info, pixel_pos):
+    """vis-network DataSet 에 그대로 넣을 노드/엣지 목록."""
+    nodes = []
+    for node in graph_info["nodes"]:
+        x, y = pixel_pos[node["id"]]
+        nodes.append({
+            "id": node["id"],
+            "label": node["label"],
+            "title": node["label"],
+            "shape": "icon",
+            "icon": {"face": "Font Awesome 5 Free", "code": chr(int(node["icon"], 16)),
+                     "weight": "bold", "color": node["color"]},
+            "x": x,
+            "y": y,
+        })
+    edges = [{"from": e[0], "to": e[1]} for e in graph_info["edges"]]
+    return nodes, edges
+
+
+def render_topology_iframe(graph_info, pixel_pos, height: int = 350) -> str:
+    """임시 파일 없이 메모리에서 iframe HTML 을 생성 (노드/엣지 JSON 만 포함)."""
+    nodes, edges = topology_payload(graph_info, pixel_pos)
+    doc = _TOPOLOGY_TEMPLATE.substitute(
+        fa_css=FONT_AWESOME_CSS,
+        vis_js=VIS_NETWORK_JS,
+        vis_cdn=VIS_NETWORK_CDN,
+        height=height,
+        nodes=_script_json(nodes),
+        edges=_script_json(edges),
+    )
+    return (f'<iframe srcdoc="{html.escape(doc)}" '
+            f'style="width:100%; height:{height}px; border:1px solid #ddd;"></iframe>')
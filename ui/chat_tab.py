@@ -3,6 +3,8 @@ import html
 import panel as pn
 
 from api import chat_search
+from chatbot import MAX_LOGGED_SESSIONS
+from prefetch import build_prefetcher
 
 
 USER_BUBBLE_STYLE = (
@@ -18,9 +20,15 @@ BOT_BUBBLE_STYLE = (
 )
 
 
-def build_chat_ui(bot):
-    """Chat UI (sidebar + chat tab)."""
+def build_chat_ui(bot, on_activity=None, register_cleanup=None):
+    """Chat UI (sidebar + chat tab).
+
+    on_activity: 메시지 전송/이력 로드 시 호출 (세션 idle 추적용)
+    register_cleanup: 세션 종료 시 위젯 참조를 정리할 함수를 등록받는 콜백
+    """
     history_buttons = []
+    # 입력 중 데이터소스 캐시를 미리 데움 (prefetch.enabled=false 면 None)
+    prefetcher = build_prefetcher(bot.orchestrator)
 
     chat_log = pn.Column(
         sizing_mode='stretch_both',
@@ -48,7 +56,11 @@ def build_chat_ui(bot):
         text = chat_input.value.strip()
         if not text:
             return
+        if on_activity:
+            on_activity()
 
+        if prefetcher:
+            prefetcher.cancel()
         chat_log.append(make_user_bubble(text))
         chat_input.value = ""
 
@@ -63,6 +75,8 @@ def build_chat_ui(bot):
         try:
             llm_result = bot.orchestrator.route_and_answer(text)
             answer_text = llm_result.get("answer_text", "")
+            # 세션 로그(사이드바 복원, 유휴 세션 spill 대상)에 기록
+            bot.record_exchange(text, llm_result)
 
             resp = chat_search(text)
             sources = resp.get("sources", []) or []
@@ -73,6 +87,9 @@ def build_chat_ui(bot):
                 margin=0,
                 styles={'padding': '0'}
             )
+            # 시계열(LTTB 축약 Bokeh 차트)/토폴로지/이벤트 표
+            for view in bot.build_result_views(text, llm_result):
+                chat_log.append(view)
 
             if sources:
                 from urllib.parse import quote
@@ -124,6 +141,8 @@ def build_chat_ui(bot):
 
     chat_send.on_click(send_message)
     chat_input.param.watch(lambda e: send_message() if e.new else None, 'enter_pressed')
+    if prefetcher:
+        chat_input.param.watch(lambda e: prefetcher.on_text(e.new), 'value_input')
 
     chat_box = pn.Column(
         chat_log,
@@ -157,9 +176,10 @@ def build_chat_ui(bot):
     inp_search.param.watch(update_history_view, 'value')
 
     def save_history():
-        if not bot.logs.get(bot.session_id):
+        logs = bot.get_logs(bot.session_id)
+        if not logs:
             return
-        title = bot.logs[bot.session_id][0]['content'][:20] + "..."
+        title = logs[0]['content'][:20] + "..."
         sid = bot.session_id
         btn = pn.widgets.Button(
             name=title, button_type='light',
@@ -168,8 +188,10 @@ def build_chat_ui(bot):
         )
 
         def load_hist(e):
+            if on_activity:
+                on_activity()
             chat_log.objects = []
-            for log in bot.logs.get(sid, []):
+            for log in bot.get_logs(sid):
                 if log['role'] == 'user':
                     chat_log.append(make_user_bubble(log['content']))
                 else:
@@ -185,6 +207,9 @@ def build_chat_ui(bot):
 
         btn.on_click(load_hist)
         history_buttons.append(btn)
+        # 오래된 버튼은 버려 세션당 위젯 수를 제한. reset_memory 가 남기는 로그 수와 같은 상수를 써서
+        # 로그가 지워진 대화의 버튼(눌러도 빈 화면)이 남지 않게 함
+        del history_buttons[:-MAX_LOGGED_SESSIONS]
         update_history_view()
 
     def reset_chat(e=None):
@@ -212,5 +237,14 @@ def build_chat_ui(bot):
         margin=0
     )
 
+    def cleanup():
+        if prefetcher:
+            prefetcher.close()
+        history_buttons.clear()
+        hist_col.objects = []
+        chat_log.objects = []
+
+    if register_cleanup:
+        register_cleanup(cleanup)
     return sidebar, chat_box
 
@@ -0,0 +1,83 @@
+import pandas as pd
+import panel as pn
+
+from data_sources import EventDataSource
+
+COLUMNS = ["Time", "Device", "Event", "Severity"]
+SEVERITY_ICONS = {"CRITICAL": "🚨 Critical", "WARNING": "⚠️ Warning", "INFO": "ℹ️ Info", "NORMAL": "✅ Normal"}
+WINDOWS = {"1시간": 1, "24시간": 24, "7일": 168, "전체": 0}
+
+
+def events_to_frame(rows):
+    return pd.DataFrame(
+        [[r["ts"][5:16].replace("T", " "), r["device"], r["event"], SEVERITY_ICONS.get(r["severity"], r["severity"])]
+         for r in rows],
+        columns=COLUMNS,
+    )
+
+
+def build_event_table(event_ds: EventDataSource, asset=None, page_size: int = 25, on_page=None):
+    """이벤트 표 (서버측 필터 + keyset 페이지 이동).
+
+    브라우저로는 현재 페이지 page_size 건만 보내고, 서버도 그 페이지만 조회한다.
+    on_page(rows): 페이지가 바뀔 때마다 현재 페이지 원본 행을 전달 (리포트 섹션 기록용)
+    """
+    inp_asset = pn.widgets.TextInput(value=asset or "", placeholder="장비", width=110, height=30)
+    sel_severity = pn.widgets.MultiChoice(options=list(EventDataSource.SEVERITIES), placeholder="심각도",
+                                          width=180, height=30)
+    sel_window = pn.widgets.Select(options=WINDOWS, value=24, width=80, height=30)
+    inp_search = pn.widgets.TextInput(placeholder="이벤트 검색", width=140, height=30)
+    btn_prev = pn.widgets.Button(name="◀", width=36, height=26, disabled=True)
+    btn_next = pn.widgets.Button(name="▶", width=36, height=26, disabled=True)
+    page_info = pn.pane.Markdown("", styles={'font-size': '11px', 'color': 'gray', 'margin': '4px'})
+    table = pn.widgets.Tabulator(
+        events_to_frame([]), show_index=False, disabled=True, sizing_mode='stretch_width',
+        theme='site', height=min(40 + page_size * 28, 320),
+    )
+    state = {"page": None, "number": 1}
+
+    def load(cursor=None, direction="next"):
+        page = event_ds.get_events(
+            asset=inp_asset.value.strip() or None,
+            severities=sel_severity.value or None,
+            window_hours=sel_window.value or None,
+            search=inp_search.value.strip() or None,
+            page_size=page_size, cursor=cursor, direction=direction,
+        )
+        state["page"] = page
+        table.value = events_to_frame(page["rows"])
+        btn_prev.disabled = page["prev"] is None
+        btn_next.disabled = page["next"] is None
+        start = (state["number"] - 1) * page_size
+        page_info.object = f"{start + 1 if page['rows'] else 0}–{start + len(page['rows'])}"
+        if on_page:
+            on_page(page["rows"])
+
+    def first_page(event=None):
+        state["number"] = 1
+        load()
+
+    def next_page(event=None):
+        if state["page"] and state["page"]["next"]:
+            state["number"] += 1
+            load(state["page"]["next"], "next")
+
+    def prev_page(event=None):
+        if state["page"] and state["page"]["prev"]:
+            state["number"] = max(1, state["number"] - 1)
+            load(state["page"]["prev"], "prev")
+
+    btn_next.on_click(next_page)
+    btn_prev.on_click(prev_page)
+    for w in (sel_severity, sel_window):
+        w.param.watch(first_page, 'value')
+    for w in (inp_asset, inp_search):
+        w.param.watch(first_page, 'enter_pressed')
+
+    first_page()
+    return pn.Column(
+        pn.Row(inp_asset, sel_severity, sel_window, inp_search, sizing_mode='stretch_width'),
+        table,
+        pn.Row(btn_prev, page_info, btn_next),
+        sizing_mode='stretch_width',
+    )
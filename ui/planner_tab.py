@@ -3,7 +3,15 @@ import datetime
 import pandas as pd
 import panel as pn
 
-from project_planner import PlannerStore
+from project_planner import BasePlannerStore, PlannerConflictError
+
+
+TABLE_COLUMNS = ["title", "order", "type", "status", "owner", "due", "path", "id"]
+# 평면 표는 서버측 페이지네이션: 값이 바뀌어도 브라우저에는 현재 페이지만 전송
+PLANNER_PAGE_SIZE = 200
+# 이보다 큰 플랜은 최상위만 펼친 지연 트리로 시작하고, 드롭다운도 화면에 보이는 항목만 담는다
+LAZY_TREE_THRESHOLD = 500
+SEARCH_LIMIT = 200
 
 
 def _normalize_id(value):
@@ -29,116 +37,139 @@ def _parse_date(value):
         return None
 
 
-def build_planner_tab(planner_store: PlannerStore):
+def build_planner_tab(planner_store: BasePlannerStore, register_cleanup=None):
+    """register_cleanup(fn): 세션 종료 시 저장소 변경 구독을 해제하도록 등록."""
     selected_ids = []
+    loaded = {"version": None}
+    local_edit = {"active": False, "pending": False}
 
-    def _children_map(items):
-        cmap = {}
-        for it in items:
-            cmap.setdefault(it["parent_id"], []).append(it)
-        for v in cmap.values():
-            v.sort(key=lambda x: (x["type"], x["title"]))
-        return cmap
+    # 펼친 노드(세션별)와 검색어. version 은 표에 보일 행 구성이 바뀔 때마다 증가
+    view = {"expanded": set(), "touched": False, "query": "", "total": 0, "version": 0}
 
-    def _descendants(item_id, items):
-        item_id = _normalize_id(item_id)
-        if not item_id:
-            return set()
-        desc = set()
-        changed = True
-        while changed:
-            changed = False
-            for it in items:
-                if it["parent_id"] in (desc | {item_id}) and it["id"] not in desc:
-                    desc.add(it["id"])
-                    changed = True
-        return desc
+    def _big():
+        return len(planner_store) > LAZY_TREE_THRESHOLD
+
+    # 전체를 훑는 계산은 저장소 generation 단위로 캐시 (모든 세션 공유, 변경이 없으면 재계산 없음)
+    def _descendants(item_id):
+        return planner_store.descendants(_normalize_id(item_id))
 
     def build_parent_options(current_id=None):
         current_id = _normalize_id(current_id)
-        items = planner_store.list_items()
-        blocked = set()
-        if current_id:
-            blocked |= {current_id}
-            blocked |= _descendants(current_id, items)
-        opts = [("", None)]
-        for it in items:
-            if it["id"] in blocked:
-                continue
-            opts.append((f"{it['title']} ({it['type']})", it["id"]))
-        return {label: value for label, value in opts}
+        if _big():
+            # 큰 플랜: 화면에 보이는 행 + 현재 부모만
+            blocked = {current_id} | _descendants(current_id) if current_id else set()
+            ids = [r["id"] for r in view_rows() if r["id"] not in blocked]
+            parent = (planner_store.get_item(current_id) or {}).get("parent_id") if current_id else None
+            if parent and parent not in ids:
+                ids.insert(0, parent)
+            opts = {"": None}
+            for item_id in ids:
+                it = planner_store.get_item(item_id)
+                if it:
+                    opts[f"{it['title']} ({it['type']})"] = item_id
+            return opts
+
+        def build():
+            blocked = {current_id} | _descendants(current_id) if current_id else set()
+            opts = [("", None)]
+            for it in planner_store.list_items():
+                if it["id"] in blocked:
+                    continue
+                opts.append((f"{it['title']} ({it['type']})", it["id"]))
+            return {label: value for label, value in opts}
+
+        return planner_store.memoize(("tab_parent_options", current_id), build)
 
     def build_flat_options():
-        items = planner_store.list_items()
-        cmap = _children_map(items)
-        options = []
-
-        def walk(parent_id, depth):
-            for item in cmap.get(parent_id, []):
-                prefix = "· " * depth
-                options.append((f"{prefix}{item['title']} ({item['type']})", item["id"]))
-                walk(item["id"], depth + 1)
-
-        walk(None, 0)
-        return {label: value for label, value in [("", None)] + options}
-
-    def build_table_rows():
-        items = planner_store.list_items()
-        cmap = _children_map(items)
-        parent_of = {it["id"]: it["parent_id"] for it in items}
-
-        def path_of(item_id):
-            parts = []
-            cur = item_id
-            while cur:
-                itm = next((i for i in items if i["id"] == cur), None)
-                if not itm:
-                    break
-                parts.append(itm["title"])
-                cur = parent_of.get(cur)
-            return "/".join(reversed(parts))
-
-        rows = []
-
-        def walk(parent_id, prefix_stack):
-            children = cmap.get(parent_id, [])
-            def _order_key(item):
-                val = item.get("order", "")
-                try:
-                    return (0, int(val))
-                except Exception:
-                    return (1, str(val))
-            children = sorted(children, key=lambda x: (_order_key(x), x["title"]))
-            total = len(children)
-            for idx, child in enumerate(children):
-                is_last = idx == total - 1
+        if _big():
+            opts = {"": None}
+            for r in view_rows():
+                opts[f"{'· ' * r['_depth']}{r['_title']} ({r['type']})"] = r["id"]
+            for sid in selected_ids:
+                it = planner_store.get_item(sid)
+                if it and sid not in opts.values():
+                    opts[f"{planner_store.path_of(sid)} ({it['type']})"] = sid
+            return opts
+
+        def build():
+            cmap = {}
+            for it in planner_store.list_items():
+                cmap.setdefault(it["parent_id"], []).append(it)
+            for v in cmap.values():
+                v.sort(key=lambda x: (x["type"], x["title"]))
+            options = []
+            stack = [(item, 0) for item in reversed(cmap.get(None, []))]
+            while stack:
+                item, depth = stack.pop()
+                options.append((f"{'· ' * depth}{item['title']} ({item['type']})", item["id"]))
+                stack.extend((child, depth + 1) for child in reversed(cmap.get(item["id"], [])))
+            return {label: value for label, value in [("", None)] + options}
+
+        return planner_store.memoize("tab_flat_options", build)
+
+    def view_rows():
+        """표에 보일 행: 검색 중이면 검색 결과, 아니면 펼친 노드까지만 내려간 트리."""
+        key = (planner_store.generation, view["version"])
+        if view.get("key") == key:
+            return view["rows"]
+        if view["query"]:
+            hits, view["total"] = planner_store.search(view["query"], limit=SEARCH_LIMIT)
+            rows = []
+            for it in hits:
+                path = planner_store.path_of(it["id"])
+                rows.append({"id": it["id"], "title": path, "order": it.get("order", ""), "type": it["type"],
+                             "status": it["status"], "owner": it["owner"], "due": it["due"], "path": path,
+                             "_depth": 0, "_title": path})
+        else:
+            if not view["touched"] and not _big():
+                # 작은 플랜은 전부 펼쳐서 시작 (사용자가 접기 전까지)
+                view["expanded"] = {it["parent_id"] for it in planner_store.list_items() if it["parent_id"]}
+            rows = []
+            paths = {}
+            positions = {}
+            for child, depth, count, is_last, prefix_stack in planner_store.expanded_rows(view["expanded"]):
+                # 같은 부모 아래 몇 번째인지 (정렬값이 비어 있을 때 표시)
+                idx = positions[child.get("parent_id")] = positions.get(child.get("parent_id"), 0) + 1
                 branch = "└─ " if is_last else "├─ "
-                indent = "".join("│  " for _ in prefix_stack)
+                indent = "│  " * len(prefix_stack)
+                is_open = child["id"] in view["expanded"]
+                marker = ("▾ " if is_open else "▸ ") if count else ""
+                label = child["title"] if is_open or not count else f"{child['title']} ({count})"
+                # 경로는 부모 경로에 이어 붙여 한 번에 계산 (조상마다 선형 탐색하지 않음)
+                parent_path = paths.get(child.get("parent_id"))
+                paths[child["id"]] = f"{parent_path}/{child['title']}" if parent_path else child["title"]
                 rows.append({
                     "id": child["id"],
-                    "title": indent + branch + child["title"],
-                    "order": child.get("order", "") or idx + 1,
+                    "title": indent + branch + marker + label,
+                    "order": child.get("order", "") or idx,
                     "type": child["type"],
                     "status": child["status"],
                     "owner": child["owner"],
                     "due": child["due"],
-                    "path": path_of(child["id"]),
+                    "path": paths[child["id"]],
+                    "_depth": depth,
+                    "_title": child["title"],
                 })
-                walk(child["id"], prefix_stack + [is_last])
-
-        walk(None, [])
+        view["key"], view["rows"] = key, rows
         return rows
 
+    def _changed_view():
+        view["version"] += 1
+
+    def build_table_rows():
+        return view_rows()
+
     def build_tabulator(value, config=None):
         for selectable_opt in (True, 'checkbox', 1):
             try:
-                kwargs = dict(show_index=False, selectable=selectable_opt, sizing_mode='stretch_both')
+                kwargs = dict(show_index=False, selectable=selectable_opt, sizing_mode='stretch_both',
+                              pagination='remote', page_size=PLANNER_PAGE_SIZE)
                 if config:
                     kwargs["configuration"] = config
                 return pn.widgets.Tabulator(value, **kwargs)
             except Exception:
                 continue
-        kwargs = dict(show_index=False, sizing_mode='stretch_both')
+        kwargs = dict(show_index=False, sizing_mode='stretch_both', pagination='remote', page_size=PLANNER_PAGE_SIZE)
         if config:
             kwargs["configuration"] = config
         return pn.widgets.Tabulator(value, **kwargs)
@@ -169,6 +200,12 @@ def build_planner_tab(planner_store: PlannerStore):
             if "_children" in n:
                 _annotate_order(n["_children"])
 
+    def build_tree_rows():
+        rows = planner_store.to_tree_rows()
+        _strip_path(rows)
+        _annotate_order(rows)
+        return rows
+
     planner_columns_tree = [
         {"title": "제목", "field": "title", "formatter": "tree", "editor": False},
         {"title": "정렬", "field": "order", "hozAlign": "center", "width": 70, "editor": False},
@@ -183,9 +220,10 @@ def build_planner_tab(planner_store: PlannerStore):
     ]
 
     try:
-        tree_rows = planner_store.to_tree_rows()
-        _strip_path(tree_rows)
-        _annotate_order(tree_rows)
+        if _big():
+            # 큰 플랜은 중첩 트리 전체를 보내지 않고 지연 트리(펼친 노드만)로 표시
+            raise ValueError("lazy tree")
+        tree_rows = build_tree_rows()
         planner_table = build_tree_grid(
             tree_rows,
             config={
@@ -203,7 +241,7 @@ def build_planner_tab(planner_store: PlannerStore):
     except Exception:
         tree_supported = False
         planner_table = build_tabulator(
-            pd.DataFrame(build_table_rows(), columns=["title", "order", "type", "status", "owner", "due", "path", "id"]),
+            pd.DataFrame(build_table_rows(), columns=TABLE_COLUMNS),
             config={
                 "layout": "fitColumns",
                 "columnDefaults": {"headerSort": False, "editor": False},
@@ -212,7 +250,7 @@ def build_planner_tab(planner_store: PlannerStore):
         )
 
     try:
-        planner_table.hidden_columns = ["id", "parent_id", "_children", "path"]
+        planner_table.hidden_columns = ["id", "parent_id", "_children", "path", "version"]
     except Exception:
         pass
     sel_target = pn.widgets.Select(name="선택/수정 대상", options=build_flat_options(), value=None, sizing_mode='stretch_width')
@@ -245,35 +283,105 @@ def build_planner_tab(planner_store: PlannerStore):
 
     def _label_for_id(item_id):
         item_id = _normalize_id(item_id)
-        opts = build_flat_options()
-        for label, val in opts.items():
-            if val == item_id:
+        if item_id is None:
+            return ""
+        if not _big():
+            labels = planner_store.memoize("tab_flat_labels", lambda: {v: k for k, v in build_flat_options().items()})
+            return labels.get(item_id, "")
+        for label, value in sel_target.options.items():
+            if value == item_id:
                 return label
         return ""
 
+    def _exists(item_id):
+        return item_id is not None and planner_store.get_item(item_id) is not None
+
+    def _view_key():
+        return planner_store.generation, view["version"]
+
+    # 이 세션 표/옵션이 반영한 (저장소 generation, 보기 version) 과 표에 올라가 있는 행
+    # (트리 모드에서는 rows 대신 tree 에 최상위 노드 목록)
+    shown = {"key": _view_key(), "rows": build_table_rows() if not tree_supported else None,
+             "tree": tree_rows if tree_supported else None, "options": _view_key()}
+
+    def refresh_tree(tree):
+        """트리 모드: 최상위 행 단위로 diff 해 바뀐 최상위 행(그 _children 포함)만 patch.
+
+        Tabulator.patch 는 DataFrame 의 최상위 행만 가리킬 수 있어 중첩 행을 id 로 직접 고칠 수 없다.
+        그래서 깊은 노드 하나가 바뀌면 그 노드가 속한 최상위 서브트리 하나를 다시 보내고,
+        최상위 행이 추가/삭제/재정렬되었거나 patch 가 실패하면 전체를 교체한다.
+        """
+        old = shown["tree"]
+        shown["tree"] = tree
+        if old is None or len(old) != len(tree) or any(o["id"] != n["id"] for o, n in zip(old, tree)):
+            planner_table.value = tree
+            return
+        patch = {}
+        for idx, (o, n) in enumerate(zip(old, tree)):
+            if o == n:
+                continue
+            for col in set(o) | set(n):
+                if o.get(col) != n.get(col):
+                    patch.setdefault(col, []).append((idx, n.get(col)))
+        if not patch:
+            return
+        try:
+            if set(patch) - set(planner_table.value.columns):
+                raise KeyError("new column")
+            planner_table.patch(patch)
+        except Exception:
+            planner_table.value = tree
+
+    def refresh_table():
+        """변경된 행만 patch, 끝에 붙은 행은 stream, 순서가 바뀐 경우에만 전체 교체."""
+        rows = build_table_rows() if not tree_supported else None
+        if shown["key"] == _view_key():
+            return
+        shown["key"] = _view_key()
+        if tree_supported:
+            if view["query"]:
+                shown["tree"] = None
+                planner_table.value = [{c: r[c] for c in TABLE_COLUMNS} for r in view_rows()]
+            else:
+                refresh_tree(build_tree_rows())
+            return
+        old = shown["rows"] or []
+        shown["rows"] = rows
+        if len(rows) < len(old) or any(o["id"] != n["id"] for o, n in zip(old, rows)):
+            planner_table.value = pd.DataFrame(rows, columns=TABLE_COLUMNS)
+            return
+        patch = {}
+        for idx, (o, n) in enumerate(zip(old, rows)):
+            if o is n or o == n:
+                continue
+            for col in TABLE_COLUMNS:
+                if o.get(col) != n.get(col):
+                    patch.setdefault(col, []).append((idx, n.get(col)))
+        if patch:
+            planner_table.patch(patch)
+        if len(rows) > len(old):
+            planner_table.stream(pd.DataFrame(rows[len(old):], columns=TABLE_COLUMNS), follow=False)
+
     def refresh_planner(message=""):
         current = [_normalize_id(v) for v in selected_ids]
-        if tree_supported:
-            planner_table.value = planner_store.to_tree_rows()
-        else:
-            planner_table.value = pd.DataFrame(build_table_rows(),
-                                               columns=["title", "order", "type", "status", "owner", "due", "path", "id"])
+        refresh_table()
 
-        flat_options = build_flat_options()
-        sel_target.options = flat_options
+        if shown["options"] != _view_key():
+            shown["options"] = _view_key()
+            sel_target.options = build_flat_options()
         sel_target_display.value = _label_for_id(sel_target.value or (selected_ids[0] if selected_ids else None))
 
-        existing_ids = set(_normalize_id(v) for v in flat_options.values())
-        updated_sel = [sid for sid in current if sid in existing_ids]
+        updated_sel = [sid for sid in current if _exists(sid)]
         selected_ids.clear()
         selected_ids.extend(updated_sel)
 
         sel_parent.options = build_parent_options(_normalize_id(sel_target.value))
         cur_val = _normalize_id(sel_target.value)
-        if cur_val not in existing_ids:
+        if not _exists(cur_val):
             sel_target.value = selected_ids[0] if selected_ids else None
             sel_target_display.value = _label_for_id(sel_target.value)
-        if sel_parent.value and sel_parent.value not in sel_parent.options.values():
+        if sel_parent.value and (sel_parent.value == cur_val or sel_parent.value in _descendants(cur_val)
+                                 or not _exists(sel_parent.value)):
             sel_parent.value = None
         if not selected_ids and not sel_target.value:
             try:
@@ -306,6 +414,7 @@ def build_planner_tab(planner_store: PlannerStore):
             inp_notes.value = ""
             sel_parent.value = None
             return
+        loaded["version"] = item.get("version")
         inp_title.value = item.get("title", "")
         sel_type.value = item.get("type", "Architecture")
         sel_status.value = item.get("status", "Planned")
@@ -349,23 +458,67 @@ def build_planner_tab(planner_store: PlannerStore):
                 elif isinstance(idx, str):
                     selected_ids.append(idx)
 
-        selected_ids[:] = [sid for sid in selected_ids if sid in sel_target.options.values()]
+        selected_ids[:] = [sid for sid in selected_ids if _exists(sid)]
         sel_target.value = selected_ids[0] if selected_ids else None
         sel_target_display.value = _label_for_id(sel_target.value)
 
     planner_table.param.watch(sync_selection_from_table, 'selection')
 
+    class _local_edit:
+        """이 세션이 일으킨 변경은 구독 알림으로 다시 새로고침하지 않음."""
+
+        def __enter__(self):
+            local_edit["active"] = True
+
+        def __exit__(self, *exc):
+            local_edit["active"] = False
+
+    def on_search(event=None):
+        view["query"] = inp_search.value.strip()
+        _changed_view()
+        if not view["query"]:
+            refresh_planner("")
+            return
+        shown_count = len(view_rows())
+        refresh_planner(f"검색 결과 {view['total']}건" + (f" (상위 {shown_count}건 표시)" if view["total"] > shown_count else ""))
+
+    def on_title_click(event):
+        """지연 트리: 자식이 있는 행의 제목을 누르면 그 노드만 펼치거나 접는다."""
+        if view["query"] or not isinstance(event.row, int) or event.row >= len(shown["rows"] or []):
+            return
+        item_id = shown["rows"][event.row]["id"]
+        if not planner_store.child_count(item_id):
+            return
+        view["expanded"] ^= {item_id}
+        view["touched"] = True
+        _changed_view()
+        refresh_planner()
+        idx = next((i for i, r in enumerate(shown["rows"]) if r["id"] == item_id), None)
+        if idx is not None:
+            try:
+                planner_table.selection = [idx]
+            except Exception:
+                pass
+
+    def _reveal(item_id):
+        """추가/수정한 항목이 접힌 노드 아래에 숨지 않도록 조상을 펼침."""
+        if item_id and not view["query"]:
+            view["expanded"].update(planner_store.ancestors(item_id))
+            _changed_view()
+
     def on_add(event):
-        planner_store.add_item(
-            parent_id=_normalize_id(sel_parent.value),
-            title=inp_title.value,
-            item_type=sel_type.value,
-            status=sel_status.value,
-            owner=inp_owner.value,
-            due=str(inp_due.value) if inp_due.value else "",
-            notes=inp_notes.value,
-            order=inp_order.value,
-        )
+        with _local_edit():
+            new_item = planner_store.add_item(
+                parent_id=_normalize_id(sel_parent.value),
+                title=inp_title.value,
+                item_type=sel_type.value,
+                status=sel_status.value,
+                owner=inp_owner.value,
+                due=str(inp_due.value) if inp_due.value else "",
+                notes=inp_notes.value,
+                order=inp_order.value,
+            )
+        _reveal((new_item or {}).get("id"))
         refresh_planner("새 항목이 추가되었습니다.")
 
     def on_update(event):
@@ -374,24 +527,35 @@ def build_planner_tab(planner_store: PlannerStore):
         if not target_id:
             planner_msg.object = "수정할 항목을 선택하세요."
             return
-        items = planner_store.list_items()
-        blocked = {target_id} | _descendants(target_id, items)
+        blocked = {target_id} | _descendants(target_id)
         if parent_id in blocked:
             planner_msg.object = "자신이나 하위 노드를 부모로 지정할 수 없습니다."
             return
-        planner_store.update_item(
-            target_id,
-            {
-                "title": inp_title.value,
-                "type": sel_type.value,
-                "status": sel_status.value,
-                "owner": inp_owner.value,
-                "due": str(inp_due.value) if inp_due.value else None,
-                "notes": inp_notes.value,
-                "order": inp_order.value,
-                "parent_id": parent_id,
-            }
-        )
+        try:
+            with _local_edit():
+                planner_store.update_item(
+                    target_id,
+                    {
+                        "title": inp_title.value,
+                        "type": sel_type.value,
+                        "status": sel_status.value,
+                        "owner": inp_owner.value,
+                        "due": str(inp_due.value) if inp_due.value else None,
+                        "notes": inp_notes.value,
+                        "order": inp_order.value,
+                        "parent_id": parent_id,
+                    },
+                    expected_version=loaded["version"],
+                )
+        except PlannerConflictError:
+            refresh_planner("다른 사용자가 먼저 수정했습니다. 최신 내용을 불러왔으니 다시 저장하세요.")
+            load_selection()
+            return
+        except ValueError as e:
+            planner_msg.object = str(e)
+            return
+        loaded["version"] = (planner_store.get_item(target_id) or {}).get("version")
+        _reveal(target_id)
         refresh_planner("항목이 수정되었습니다.")
 
     def on_delete(event):
@@ -401,8 +565,9 @@ def build_planner_tab(planner_store: PlannerStore):
         if not targets:
             planner_msg.object = "삭제할 항목을 선택하세요."
             return
-        for tid in targets:
-            planner_store.delete_item(tid)
+        with _local_edit():
+            for tid in targets:
+                planner_store.delete_item(tid)
 
         refresh_planner(f"{len(targets)}건 삭제 완료.")
 
@@ -416,8 +581,14 @@ def build_planner_tab(planner_store: PlannerStore):
     btn_delete.on_click(on_delete)
     btn_reload.on_click(lambda e: refresh_planner("새로고침했습니다."))
 
+    inp_search = pn.widgets.TextInput(placeholder="검색 (제목/담당/상태, owner:Infra)", width=220, height=30)
+    inp_search.param.watch(on_search, 'enter_pressed')
+    if not tree_supported:
+        planner_table.on_click(on_title_click, column="title")
+
     planner_left = pn.Column(
-        pn.pane.Markdown("**Tree**", margin=(0, 0, 6, 0)),
+        pn.Row(pn.pane.Markdown("**Tree**", margin=(0, 0, 6, 0)), pn.layout.HSpacer(), inp_search,
+               sizing_mode='stretch_width'),
         pn.Column(
             planner_table,
             sizing_mode='stretch_both',
@@ -495,6 +666,26 @@ def build_planner_tab(planner_store: PlannerStore):
         styles={'padding': '6px', 'height': '100%'}
     )
 
+    doc = pn.state.curdoc
+
+    def _remote_refresh():
+        local_edit["pending"] = False
+        refresh_planner("다른 사용자가 플래너를 수정했습니다.")
+
+    def on_store_change(changed, removed):
+        # 저장소 스레드(다른 세션의 요청 또는 감시 스레드)에서 호출되므로 이 세션 문서의 다음 tick 으로 넘김
+        if local_edit["active"] or local_edit["pending"]:
+            return
+        local_edit["pending"] = True
+        if doc is not None:
+            doc.add_next_tick_callback(_remote_refresh)
+        else:
+            _remote_refresh()
+
+    planner_store.add_listener(on_store_change)
+    if register_cleanup:
+        register_cleanup(lambda: planner_store.remove_listener(on_store_change))
+
     refresh_planner("Planner를 로드했습니다.")
     return planner_panel
 